@@ -0,0 +1,114 @@
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(model):
+    return f'version:{model._meta.label_lower}'
+
+
+def get_model_version(model):
+    """
+    Retorna a versão atual dos dados em cache de um modelo.
+
+    A versão compõe as chaves de cache derivadas do modelo; incrementá-la
+    invalida todas as entradas antigas de uma só vez.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Inicia pelo relógio para não reaproveitar versões antigas caso a
+        # chave tenha sido despejada do cache.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_model(model):
+    """
+    Invalida as entradas de cache derivadas de um modelo.
+    """
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        get_model_version(model)
+
+
+def invalidate_on_commit(invalidate, *args):
+    """
+    Executa uma invalidação agora e de novo após a confirmação da transação.
+
+    Uma leitura concorrente à transação ainda vê os dados antigos e pode
+    guardá-los sob a versão já incrementada; a segunda invalidação descarta
+    essas entradas. Fora de transação, `on_commit` executa na hora.
+    """
+    invalidate(*args)
+    transaction.on_commit(partial(invalidate, *args))
+
+
+def _object_version_key(model, pk):
+    return f'version:{model._meta.label_lower}:{pk}'
+
+
+def get_object_versions(model, pks):
+    """
+    Retorna a versão atual dos dados em cache de cada objeto: `{pk: versão}`.
+
+    Como `get_model_version`, mas por objeto: entradas de cache que dependem
+    de poucos objetos de um modelo alterado com frequência deixam de valer
+    apenas quando um desses objetos muda.
+    """
+    keys = {_object_version_key(model, pk): str(pk) for pk in pks}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        initial = int(time.time() * 1000)
+        for key in missing:
+            cache.add(key, initial, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_objects(model, pks):
+    """
+    Invalida as entradas de cache derivadas de alguns objetos de um modelo.
+    """
+    for pk in pks:
+        key = _object_version_key(model, pk)
+        try:
+            cache.incr(key)
+        except ValueError:
+            get_object_versions(model, [pk])
+
+
+def _stats_key(name, outcome):
+    return f'stats:{name}:{outcome}'
+
+
+def record_cache_access(name, hit):
+    """
+    Contabiliza um acerto ou uma falta no cache identificado por `name`.
+    """
+    key = _stats_key(name, 'hits' if hit else 'misses')
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cache_stats(name):
+    """
+    Retorna os acertos, as faltas e a taxa de acertos do cache `name`.
+    """
+    hits = cache.get(_stats_key(name, 'hits'), 0)
+    misses = cache.get(_stats_key(name, 'misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from apps.cache import get_model_version
+
+
+SQLITE_SAMPLE_SIZE = 1000
+
+
+def estimate_count(queryset):
+    """
+    Estima a quantidade de linhas de um queryset sem percorrê-lo inteiro.
+
+    Retorna `None` quando o banco configurado não oferece estimativa.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return _estimate_postgresql(queryset, connection)
+    if connection.vendor == 'sqlite':
+        return _estimate_sqlite(queryset, connection)
+    return None
+
+
+def _estimate_postgresql(queryset, connection):
+    # Usa a estimativa de linhas do planejador, calculada a partir das
+    # estatísticas da tabela (ANALYZE).
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _estimate_sqlite(queryset, connection):
+    # O maior rowid aproxima o tamanho da tabela; a seletividade dos filtros
+    # é medida numa janela contígua de linhas a partir de um ponto aleatório.
+    model = queryset.model
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MAX(rowid) FROM {table}')
+        total = cursor.fetchone()[0] or 0
+
+    if not queryset.query.has_filters():
+        return total
+
+    start = random.randint(0, max(total - SQLITE_SAMPLE_SIZE, 0))
+    sample = list(
+        model._default_manager.using(queryset.db)
+        .extra(where=[f'{table}.rowid > %s'], params=[start])
+        .values_list('pk', flat=True)[:SQLITE_SAMPLE_SIZE]
+    )
+    if not sample:
+        return 0
+
+    matched = queryset.order_by().filter(pk__in=sample).count()
+    return round(total * matched / len(sample))
+
+
+class CountStrategy:
+    """
+    Decide como obter o total de resultados de uma listagem paginada.
+
+    - Conjuntos pequenos (até `PAGINATION_EXACT_COUNT_THRESHOLD`) são
+      contados com exatidão, com uma contagem limitada.
+    - Conjuntos maiores usam o total guardado em cache para os mesmos
+      filtros, invalidado quando o modelo é alterado.
+    - Sem cache, conjuntos estimados acima de
+      `PAGINATION_ESTIMATE_COUNT_THRESHOLD` recebem um total aproximado.
+    """
+
+    def __init__(self, cache_key=None):
+        self.cache_key = cache_key
+        self.is_estimate = False
+
+    @classmethod
+    def for_request(cls, queryset, request, ignored_params=(), models=None):
+        """
+        Cria a estratégia com a chave de cache dos filtros da requisição.
+
+        A chave reúne as versões de `models`, os modelos dos quais o total
+        depende; por padrão, apenas o modelo do queryset.
+        """
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            if key not in ignored_params
+            for value in values
+        )
+        digest = hashlib.md5(
+            json.dumps([request.path, params]).encode()
+        ).hexdigest()
+
+        model = queryset.model
+        version = '.'.join(
+            str(get_model_version(model)) for model in (models or (model,))
+        )
+        return cls(cache_key=f'count:{model._meta.label_lower}:{version}:{digest}')
+
+    def count(self, queryset):
+        if self.cache_key is not None:
+            cached = cache.get(self.cache_key)
+            if cached is not None:
+                count, self.is_estimate = cached
+                return count
+
+        threshold = settings.PAGINATION_EXACT_COUNT_THRESHOLD
+        count = queryset.order_by()[:threshold + 1].count()
+        if count <= threshold:
+            return count
+
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_COUNT_THRESHOLD:
+            count, self.is_estimate = estimate, True
+        else:
+            count = queryset.count()
+
+        if self.cache_key is not None:
+            cache.set(
+                self.cache_key,
+                (count, self.is_estimate),
+                timeout=settings.PAGINATION_COUNT_CACHE_TIMEOUT
+            )
+        return count
+
+
+class CountingPaginator(Paginator):
+    """
+    Paginador que delega a contagem de resultados a uma `CountStrategy`.
+    """
+
+    def __init__(self, *args, count_strategy=None, **kwargs):
+        self.count_strategy = count_strategy or CountStrategy()
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def count(self):
+        return self.count_strategy.count(self.object_list)
+
+    @property
+    def is_estimate(self):
+        # Garante que a contagem já foi feita antes de consultar a estratégia.
+        return self.count is not None and self.count_strategy.is_estimate
+
+    def validate_number(self, number):
+        if not self.is_estimate:
+            return super().validate_number(number)
+
+        # Com um total aproximado, o número de páginas não é confiável para
+        # recusar páginas além da última.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('O número da página não é um inteiro.')
+        if number < 1:
+            raise EmptyPage('O número da página é menor que 1.')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimate:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+from drf_yasg import openapi
+from drf_yasg.inspectors import NotHandled, PaginatorInspector
+
+from apps.pagination import (
+    COUNT_DESCRIPTION, COUNT_IS_ESTIMATE_DESCRIPTION, NEXT_DESCRIPTION,
+    PREVIOUS_DESCRIPTION, CustomPagination
+)
+
+
+class CustomPaginationInspector(PaginatorInspector):
+    """
+    Esquema da resposta de `CustomPagination` no drf-yasg, que não consulta
+    `get_paginated_response_schema`: `count` e `count_is_estimate` só estão
+    presentes na paginação por número de página.
+    """
+
+    def get_paginated_response(self, paginator, response_schema):
+        if not isinstance(paginator, CustomPagination):
+            return NotHandled
+
+        return openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties=OrderedDict((
+                ('count', openapi.Schema(
+                    type=openapi.TYPE_INTEGER, description=COUNT_DESCRIPTION
+                )),
+                ('count_is_estimate', openapi.Schema(
+                    type=openapi.TYPE_BOOLEAN, description=COUNT_IS_ESTIMATE_DESCRIPTION
+                )),
+                ('next', openapi.Schema(
+                    type=openapi.TYPE_STRING, format=openapi.FORMAT_URI,
+                    x_nullable=True, description=NEXT_DESCRIPTION
+                )),
+                ('previous', openapi.Schema(
+                    type=openapi.TYPE_STRING, format=openapi.FORMAT_URI,
+                    x_nullable=True, description=PREVIOUS_DESCRIPTION
+                )),
+                ('results', response_schema),
+            )),
+            required=['results']
+        )
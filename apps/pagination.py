@@ -1,16 +1,59 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
+from functools import partial
+
+from rest_framework.compat import coreapi, coreschema
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
 from drf_yasg import openapi
 
+from apps.counting import CountingPaginator, CountStrategy
+
+
+# Descrição dos campos da resposta paginada, nos esquemas do DRF e do
+# drf-yasg.
+COUNT_DESCRIPTION = 'Número total de objetos encontrados. Ausente na paginação por cursor.'
+COUNT_IS_ESTIMATE_DESCRIPTION = (
+    'Indica se o total de objetos é aproximado. Ausente na paginação por cursor.'
+)
+NEXT_DESCRIPTION = 'URL para a próxima página de resultados.'
+PREVIOUS_DESCRIPTION = 'URL para a página anterior de resultados.'
+
+
+class CustomCursorPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset) para a API.
+
+    Não executa `COUNT(*)` nem `OFFSET`: cada página é obtida filtrando a
+    partir da posição da última linha da página anterior, com custo constante
+    independente da profundidade da navegação.
+    """
+
+    cursor_query_param = 'pagina'
+    page_size_query_param = 'tamanho'
+    page_size = 10
+
 
 class CustomPagination(PageNumberPagination):
     """
     Paginação personalizada para a API.
+
+    As views que declaram `cursor_ordering` aceitam o parâmetro
+    `paginacao=cursor`, que troca a paginação por número de página pela
+    paginação por cursor (`CustomCursorPagination`).
+
+    Na paginação por número de página, o total de resultados é obtido por uma
+    `CountStrategy`, que pode devolver um total aproximado em listagens
+    grandes; nesse caso a resposta traz `count_is_estimate` verdadeiro.
     """
 
     page_query_param = 'pagina'
     page_size_query_param = 'tamanho'
     page_size = 10
 
+    mode_query_param = 'paginacao'
+    cursor_mode = 'cursor'
+    cursor_paginator = None
+
     page_size_parameter = openapi.Parameter(
         name='tamanho',
         in_=openapi.IN_QUERY,
@@ -19,24 +62,136 @@ class CustomPagination(PageNumberPagination):
         format=openapi.FORMAT_INT32
     )
 
+    mode_parameter = openapi.Parameter(
+        name='paginacao',
+        in_=openapi.IN_QUERY,
+        description=(
+            'Modo de paginação. Use "cursor" para navegar por cursor, '
+            'sem contagem total de resultados.'
+        ),
+        type=openapi.TYPE_STRING,
+        enum=['cursor']
+    )
+
+    def get_cursor_paginator(self, request, view=None):
+        """
+        Retorna o paginador por cursor quando solicitado e suportado pela view.
+        """
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is None:
+            return None
+
+        if request.query_params.get(self.mode_query_param) != self.cursor_mode:
+            return None
+
+        paginator = CustomCursorPagination()
+        paginator.ordering = ordering
+        paginator.page_size = self.page_size
+        paginator.max_page_size = self.max_page_size
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = self.get_cursor_paginator(request, view)
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        # Views com cache de respostas informam os modelos dos quais a
+        # listagem depende, inclusive pelos filtros da requisição.
+        get_cache_models = getattr(view, 'get_cache_models', None)
+        count_strategy = CountStrategy.for_request(
+            queryset,
+            request,
+            ignored_params=(
+                self.page_query_param,
+                self.page_size_query_param,
+                self.mode_query_param,
+            ),
+            models=get_cache_models() if get_cache_models is not None else None
+        )
+        self.django_paginator_class = partial(
+            CountingPaginator, count_strategy=count_strategy
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_estimate', self.page.paginator.is_estimate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_fields(self, view):
+        fields = super().get_schema_fields(view)
+        if getattr(view, 'cursor_ordering', None) is not None:
+            fields.append(
+                coreapi.Field(
+                    name=self.mode_query_param,
+                    required=False,
+                    location='query',
+                    schema=coreschema.Enum(
+                        enum=[self.cursor_mode],
+                        title='Modo de paginação',
+                        description=self.mode_parameter.description
+                    )
+                )
+            )
+        return fields
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, 'cursor_ordering', None) is not None:
+            parameters.append({
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.mode_parameter.description,
+                'schema': {
+                    'type': 'string',
+                    'enum': [self.cursor_mode],
+                },
+            })
+        return parameters
+
     def get_paginated_response_schema(self, schema):
         return {
             'type': 'object',
             'properties': {
                 'count': {
                     'type': 'integer',
-                    'description': 'Número total de objetos encontrados.'
+                    'description': COUNT_DESCRIPTION
+                },
+                'count_is_estimate': {
+                    'type': 'boolean',
+                    'description': COUNT_IS_ESTIMATE_DESCRIPTION
                 },
                 'next': {
                     'type': 'string',
                     'nullable': True,
-                    'description': 'URL para a próxima página de resultados.'
+                    'description': NEXT_DESCRIPTION
                 },
                 'previous': {
                     'type': 'string',
                     'nullable': True,
-                    'description': 'URL para a página anterior de resultados.'
+                    'description': PREVIOUS_DESCRIPTION
                 },
                 'results': schema,
             }
         }
+
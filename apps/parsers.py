@@ -0,0 +1,35 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Interpreta o corpo como JSON delimitado por linhas (NDJSON).
+
+    Retorna um gerador que lê uma linha por vez, permitindo processar cargas
+    grandes em lotes sem carregá-las inteiras na memória. Linhas que não são
+    JSON válido são entregues como texto, para que a validação de cada item
+    as rejeite individualmente.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            raise ParseError('O corpo da requisição está vazio.')
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        return self.iter_lines(stream, encoding)
+
+    def iter_lines(self, stream, encoding):
+        for line in stream:
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line
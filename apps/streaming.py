@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+import zlib
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def csv_stream(header, chunks):
+    """
+    Gera o conteúdo CSV de lotes de linhas (dicionários), um trecho por lote.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=header, lineterminator='\n')
+
+    writer.writeheader()
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def ndjson_stream(chunks):
+    """
+    Gera o conteúdo NDJSON de lotes de linhas, um objeto JSON por linha.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for rows in chunks:
+        yield ''.join(encoder.encode(row) + '\n' for row in rows).encode('utf-8')
+
+
+def gzip_stream(content):
+    """
+    Compacta em gzip, sob demanda, um gerador de bytes.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for data in content:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
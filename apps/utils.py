@@ -0,0 +1,24 @@
+import unicodedata
+from itertools import islice
+
+
+def chunked(iterable, size):
+    """
+    Divide um iterável em listas de até `size` itens, consumindo-o sob demanda.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def normalize_search_key(value):
+    """
+    Normaliza um texto para busca: sem acentos, em minúsculas e com os
+    espaços simplificados.
+    """
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    text = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
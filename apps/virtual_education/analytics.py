@@ -0,0 +1,166 @@
+import bisect
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case, Count, FloatField, IntegerField, Max, Min, Value, When
+)
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from apps.virtual_education.models import CourseStats, Enrollment
+from apps.virtual_education.services.enrollments import PASSING_SCORE
+
+
+# Percentis informados e faixas de 1 ponto do histograma, de 0 a 10.
+PERCENTILES = (25, 50, 75, 90)
+HISTOGRAM_BINS = 10
+
+
+def get_cohort_months(queryset):
+    """
+    Retorna o início de cada mês, no fuso horário atual, entre a primeira e
+    a última matrícula do queryset.
+    """
+    bounds = queryset.aggregate(first=Min('date_enroll'), last=Max('date_enroll'))
+    if bounds['first'] is None:
+        return []
+
+    month = timezone.localtime(bounds['first']).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    months = []
+    while month <= bounds['last']:
+        months.append(month)
+        month = timezone.make_aware(
+            (month.replace(tzinfo=None) + timedelta(days=32)).replace(day=1)
+        )
+    return months
+
+
+def get_score_distributions(course):
+    """
+    Retorna a distribuição das notas do curso por mês de matrícula:
+    `{mês: [(nota, quantidade), ...]}`, em ordem crescente de nota.
+
+    O banco agrupa as matrículas por mês e nota. Como as notas têm duas
+    casas decimais, cada mês tem no máximo algumas centenas de notas
+    distintas, independente da quantidade de matrículas, e as notas chegam
+    como `float`, sem um `Decimal` por linha.
+    """
+    scores = Enrollment.objects.filter(course=course, score__isnull=False)
+    months = get_cohort_months(scores)
+
+    # O mês de cada matrícula é comparado com os inícios dos meses: no
+    # SQLite, TruncMonth executaria uma função Python por linha.
+    month = Case(
+        *[
+            When(date_enroll__gte=start, then=Value(index))
+            for index, start in reversed(list(enumerate(months)))
+        ],
+        output_field=IntegerField()
+    )
+    rows = (
+        scores.annotate(month=month, value=Cast('score', FloatField()))
+        .values_list('month', 'value')
+        .annotate(count=Count('pk'))
+        .order_by('month', 'value')
+    )
+    distributions = {}
+    for index, value, count in rows:
+        distributions.setdefault(months[index].strftime('%Y-%m'), []).append((value, count))
+    return distributions
+
+
+def quantile(distribution, cumulative, q):
+    """
+    Quantil `q` com interpolação linear entre as notas vizinhas, como
+    `statistics.quantiles(method='inclusive')`, a partir da distribuição.
+    """
+    position = (cumulative[-1] - 1) * q
+    lower = int(position)
+
+    def value_at(index):
+        return distribution[bisect.bisect_right(cumulative, index)][0]
+
+    value = value_at(lower)
+    if position > lower:
+        value += (value_at(lower + 1) - value) * (position - lower)
+    return round(value, 2)
+
+
+def summarize(distribution):
+    """
+    Resume uma distribuição de notas: aprovação, média, percentis e histograma.
+    """
+    histogram = [0] * HISTOGRAM_BINS
+    for value, count in distribution:
+        histogram[min(max(int(value), 0), HISTOGRAM_BINS - 1)] += count
+
+    cumulative = list(accumulate(count for _, count in distribution))
+    total = cumulative[-1] if cumulative else 0
+    passed = sum(count for value, count in distribution if value >= PASSING_SCORE)
+    return {
+        'scores': total,
+        'passed': passed,
+        'failed': total - passed,
+        'pass_rate': round(passed / total, 4) if total else None,
+        'mean': (
+            round(sum(value * count for value, count in distribution) / total, 2)
+            if total else None
+        ),
+        'percentiles': {
+            f'p{percentile}': (
+                quantile(distribution, cumulative, percentile / 100) if total else None
+            )
+            for percentile in PERCENTILES
+        },
+        'histogram': [
+            {'min': index, 'max': index + 1, 'count': count}
+            for index, count in enumerate(histogram)
+        ],
+    }
+
+
+def compute_course_analytics(course):
+    """
+    Calcula a análise das notas do curso, sem consultar o cache.
+    """
+    distributions = get_score_distributions(course)
+    overall = Counter()
+    for distribution in distributions.values():
+        overall.update(dict(distribution))
+
+    return {
+        'course': str(course.pk),
+        'passing_score': PASSING_SCORE,
+        'overall': summarize(sorted(overall.items())),
+        'cohorts': [
+            {'month': month, **summarize(distribution)}
+            for month, distribution in distributions.items()
+        ],
+    }
+
+
+def get_course_analytics(course):
+    """
+    Análise das notas do curso, no total e por mês de matrícula.
+
+    O resultado fica em cache sob a data de alteração dos totais do curso
+    (`CourseStats`), que muda a cada matrícula concluída ou lançamento de
+    notas; assim a análise é recalculada apenas quando as notas mudam.
+    """
+    try:
+        version = course.stats.date_updated.timestamp()
+    except CourseStats.DoesNotExist:
+        version = None
+    key = f'analytics:{course.pk}:{version}'
+
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute_course_analytics(course)
+        cache.set(key, analytics, timeout=settings.ANALYTICS_CACHE_TIMEOUT)
+    return analytics
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VirtualEducationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.virtual_education'
+
+    def ready(self):
+        from apps.virtual_education import signals  # noqa: F401
@@ -1,8 +1,27 @@
 from django_filters import rest_framework as filters
 from apps.virtual_education.models import Course
+from apps.virtual_education.search import search_courses
 
 
 class CourseFilter(filters.FilterSet):
+    busca = filters.CharFilter(
+        method='filter_busca',
+        label='Busca no nome e na descrição, ordenada por relevância.'
+    )
+    ordenar = filters.OrderingFilter(
+        fields=(
+            ('name', 'name'),
+            ('duration', 'duration'),
+            ('date_created', 'date_created'),
+            ('stats__in_progress', 'students_in_progress'),
+            ('stats__approved', 'students_approved'),
+            ('stats__failed', 'students_failed'),
+            ('stats__dropped', 'students_dropped'),
+            ('stats__mean_score', 'mean_score'),
+        ),
+        label='Ordenação da listagem; use "-" para ordem decrescente.'
+    )
+
     class Meta:
         model = Course
         fields = {
@@ -10,4 +29,12 @@ class CourseFilter(filters.FilterSet):
             'duration': ['exact', 'gte', 'lte'],
             'date_created': ['exact', 'gte', 'lte'],
             'date_updated': ['exact', 'gte', 'lte'],
+            'stats__in_progress': ['gte', 'lte'],
+            'stats__approved': ['gte', 'lte'],
+            'stats__failed': ['gte', 'lte'],
+            'stats__dropped': ['gte', 'lte'],
+            'stats__mean_score': ['gte', 'lte'],
         }
+
+    def filter_busca(self, queryset, name, value):
+        return search_courses(queryset, value)
@@ -0,0 +1,113 @@
+import random
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.virtual_education.models import Course, Enrollment, Student, User
+
+
+CLOSED_STATUSES = ['Aprovado', 'Reprovado', 'Desistiu']
+
+
+@contextmanager
+def rollback():
+    """
+    Executa o bloco numa transação sempre desfeita ao final, para que os
+    dados semeados pelos benchmarks não permaneçam no banco.
+    """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(func, repeat):
+    """
+    Executa `func` `repeat` vezes e retorna a mediana e o p95 em milissegundos.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95
+
+
+def analyze():
+    """
+    Atualiza as estatísticas usadas pelo planejador de consultas.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def seed(students, courses, enrollments_per_student, with_active=True, batch_size=5000):
+    """
+    Popula alunos, cursos e matrículas em lote.
+
+    Cada aluno recebe `enrollments_per_student` matrículas encerradas e, se
+    `with_active`, a metade dos alunos recebe mais uma matrícula em andamento.
+    """
+    token = uuid.uuid4().hex[:8]
+    now = timezone.now()
+
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=f'bench-{token}-{index}@example.com',
+                email=f'bench-{token}-{index}@example.com',
+                nickname=f'Aluno {index}',
+                first_name=f'Aluno {index}',
+                phone='0000-0000',
+            )
+            for index in range(students)
+        ],
+        batch_size=batch_size
+    )
+    student_objs = [Student(user=user) for user in users]
+    for student in student_objs:
+        student.normalize()
+    Student.objects.bulk_create(student_objs, batch_size=batch_size)
+    course_objs = Course.objects.bulk_create(
+        [
+            Course(name=f'Curso {index}', description='Benchmark', duration=10)
+            for index in range(courses)
+        ],
+        batch_size=batch_size
+    )
+
+    enrollments = []
+    for index, student in enumerate(student_objs):
+        for _ in range(enrollments_per_student):
+            enrollments.append(Enrollment(
+                student=student,
+                course=random.choice(course_objs),
+                status=random.choice(CLOSED_STATUSES),
+                score=random.randint(0, 10),
+                date_close=now - timedelta(days=random.randint(1, 365)),
+            ))
+        if with_active and index % 2 == 0:
+            student.active_enrollment = Enrollment(
+                student=student,
+                course=random.choice(course_objs),
+                date_close=now + timedelta(days=random.randint(1, 60)),
+            )
+            enrollments.append(student.active_enrollment)
+
+        if len(enrollments) >= batch_size:
+            Enrollment.objects.bulk_create(enrollments)
+            enrollments = []
+    Enrollment.objects.bulk_create(enrollments)
+    if with_active:
+        Student.objects.bulk_update(
+            student_objs[::2], ['active_enrollment'], batch_size=batch_size
+        )
+
+    return student_objs, course_objs
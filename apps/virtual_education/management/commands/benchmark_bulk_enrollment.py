@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.virtual_education.management.benchmark import rollback, seed
+from apps.virtual_education.serializers.enrollments import EnrollmentSerializer
+from apps.virtual_education.services.enrollments import EnrollmentService
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a vazão (matrículas/s) da matrícula item a item com a '
+        'matrícula em lote.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enrollments', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=50)
+
+    def enroll_one_by_one(self, items):
+        # Mesmo caminho do POST /enrollments/: validação e inserção por item.
+        for item in items:
+            serializer = EnrollmentSerializer(data=item)
+            serializer.is_valid(raise_exception=True)
+            EnrollmentService.enroll_student(serializer)
+
+    def enroll_in_bulk(self, items):
+        EnrollmentService.bulk_enroll_students(
+            EnrollmentSerializer(many=True), items
+        )
+
+    def run(self, label, func, items):
+        with transaction.atomic():
+            start = time.perf_counter()
+            func(items)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f'{label}: {len(items)} matrículas em {elapsed:.3f} s '
+            f'({len(items) / elapsed:.0f} matrículas/s)'
+        )
+
+    def handle(self, *args, **options):
+        with rollback():
+            students, courses = seed(
+                options['enrollments'], options['courses'], 0, with_active=False
+            )
+            date_close = (timezone.now() + timedelta(days=30)).isoformat()
+            items = [
+                {
+                    'student': str(student.pk),
+                    'course': str(courses[index % len(courses)].pk),
+                    'date_close': date_close,
+                }
+                for index, student in enumerate(students)
+            ]
+
+            self.run('Item a item', self.enroll_one_by_one, items)
+            self.run('Em lote', self.enroll_in_bulk, items)
@@ -0,0 +1,93 @@
+import random
+import statistics
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, F, Q
+from django.db.models.functions import TruncMonth
+
+from apps.virtual_education.analytics import (
+    HISTOGRAM_BINS, PERCENTILES, compute_course_analytics, get_course_analytics
+)
+from apps.virtual_education.management.benchmark import analyze, measure, rollback, seed
+from apps.virtual_education.models import Course, Enrollment
+from apps.virtual_education.services.enrollments import PASSING_SCORE
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a análise das notas de um curso (distribuição agrupada no '
+        'banco) com agregações do ORM por mês e com as notas carregadas '
+        'como Decimal, além da resposta em cache.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--courses', type=int, default=5)
+        parser.add_argument('--enrollments-per-student', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def orm_aggregates(self, course):
+        """
+        A mesma análise com agregações do ORM: uma por mês e uma consulta
+        com OFFSET por percentil.
+        """
+        scores = Enrollment.objects.filter(course=course, score__isnull=False)
+        months = scores.annotate(month=TruncMonth('date_enroll')).values('month').annotate(
+            scores=Count('pk'),
+            passed=Count('pk', filter=Q(score__gte=PASSING_SCORE)),
+            mean=Avg('score'),
+            **{
+                f'bin_{index}': Count('pk', filter=Q(score__gte=index, score__lt=index + 1))
+                for index in range(HISTOGRAM_BINS)
+            },
+        )
+        for row in months:
+            next_month = (row['month'] + timedelta(days=32)).replace(day=1)
+            cohort = scores.filter(
+                date_enroll__gte=row['month'], date_enroll__lt=next_month
+            )
+            for percentile in PERCENTILES:
+                cohort.order_by('score').values_list('score', flat=True)[
+                    (row['scores'] - 1) * percentile // 100
+                ]
+
+    def decimal_rows(self, course):
+        """
+        A mesma análise com uma nota `Decimal` por matrícula, em Python.
+        """
+        cohorts = {}
+        for date_enroll, score in Enrollment.objects.filter(
+            course=course, score__isnull=False
+        ).values_list('date_enroll', 'score'):
+            cohorts.setdefault(date_enroll.strftime('%Y-%m'), []).append(score)
+        for scores in cohorts.values():
+            if len(scores) > 1:
+                statistics.quantiles(scores, n=100, method='inclusive')
+            statistics.mean(scores)
+            sum(1 for score in scores if score >= PASSING_SCORE)
+
+    def handle(self, *args, **options):
+        with rollback():
+            _, courses = seed(
+                options['students'], options['courses'],
+                options['enrollments_per_student']
+            )
+            # Espalha as matrículas pelos meses anteriores ao término.
+            Enrollment.objects.filter(course__in=courses).update(
+                date_enroll=F('date_close') - timedelta(days=30)
+            )
+            analyze()
+
+            course = Course.objects.select_related('stats').get(pk=random.choice(courses).pk)
+            scores = Enrollment.objects.filter(course=course, score__isnull=False).count()
+            self.stdout.write(f'Curso com {scores} notas')
+
+            for label, func in (
+                ('agregações do ORM', lambda: self.orm_aggregates(course)),
+                ('notas como Decimal', lambda: self.decimal_rows(course)),
+                ('distribuição', lambda: compute_course_analytics(course)),
+                ('em cache', lambda: get_course_analytics(course)),
+            ):
+                median, p95 = measure(func, options['repeat'])
+                self.stdout.write(f'{label}: mediana {median:.2f} ms, p95 {p95:.2f} ms')
@@ -0,0 +1,75 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.virtual_education.management.benchmark import analyze, measure, rollback
+from apps.virtual_education.models import Course
+from apps.virtual_education.search import search_courses
+
+
+WORDS = [
+    'programação', 'lógica', 'cálculo', 'física', 'química', 'história',
+    'geografia', 'matemática', 'música', 'português', 'inglês', 'gestão',
+    'finanças', 'marketing', 'design', 'fotografia', 'culinária', 'saúde',
+    'educação', 'tecnologia', 'introdução', 'avançado', 'prático', 'básico',
+    'dados', 'redes', 'segurança', 'análise', 'estatística', 'negócios',
+]
+
+SYLLABLES = ['ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ru', 'sa', 'te', 'vo', 'ção', 'ên']
+
+
+def vocabulary(size=20000):
+    """
+    Palavras sintéticas para as descrições, de modo que cada termo buscado
+    apareça em poucos cursos, como num catálogo real.
+    """
+    words = {''.join(random.choices(SYLLABLES, k=random.randint(2, 4))) for _ in range(size)}
+    return list(words) + WORDS
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a latência da busca de cursos por icontains com a busca '
+        'pelo índice textual (parâmetro busca). Use --courses 1000000 para '
+        'o cenário de 1M de cursos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def seed(self, size, batch_size):
+        words = vocabulary()
+        courses = []
+        for index in range(size):
+            courses.append(Course(
+                name=' '.join(random.sample(WORDS, 3)).capitalize(),
+                description=' '.join(random.choices(words, k=30)),
+                duration=random.randint(1, 10),
+            ))
+            if len(courses) >= batch_size:
+                Course.objects.bulk_create(courses)
+                courses = []
+        Course.objects.bulk_create(courses)
+
+    def handle(self, *args, **options):
+        with rollback():
+            self.seed(options['courses'], options['batch_size'])
+            analyze()
+
+            for terms in ('calculo', 'programação avançado', 'estatistica dados'):
+                for label, queryset in (
+                    ('icontains', Course.objects.filter(
+                        Q(name__icontains=terms) | Q(description__icontains=terms)
+                    )),
+                    ('busca', search_courses(Course.objects.all(), terms)),
+                ):
+                    median, p95 = measure(
+                        lambda: list(queryset.values_list('id', flat=True)[:10]),
+                        options['repeat']
+                    )
+                    self.stdout.write(
+                        f'"{terms}" ({label}): mediana {median:.2f} ms, p95 {p95:.2f} ms'
+                    )
@@ -0,0 +1,76 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Q
+
+from apps.utils import chunked
+from apps.virtual_education.management.benchmark import analyze, measure, rollback, seed
+from apps.virtual_education.models import Course, CourseStats, Enrollment
+from apps.virtual_education.services.course_stats import CourseStatsService
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a consulta dos totais de matrículas de um curso agregando '
+        'as matrículas e lendo a tabela CourseStats, além do tempo de '
+        'reconstrução dos totais.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--enrollments-per-student', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with rollback():
+            _, courses = seed(
+                options['students'], options['courses'],
+                options['enrollments_per_student']
+            )
+
+            start = time.perf_counter()
+            course_ids = Course.objects.values_list('id', flat=True)
+            for chunk in chunked(course_ids.iterator(), options['chunk_size']):
+                CourseStatsService.rebuild(chunk)
+            self.stdout.write(
+                f'Reconstrução: {len(courses)} cursos em '
+                f'{time.perf_counter() - start:.2f} s'
+            )
+            analyze()
+
+            def aggregate():
+                Enrollment.objects.filter(course=random.choice(courses)).aggregate(
+                    **{
+                        field: Count('pk', filter=Q(status=status))
+                        for status, field in CourseStats.STATUS_FIELDS.items()
+                    },
+                    mean_score=Avg('score'),
+                )
+
+            def stats():
+                CourseStats.objects.get(course=random.choice(courses))
+
+            def ranking_aggregate():
+                list(
+                    Course.objects.annotate(mean_score=Avg('enrollment__score'))
+                    .order_by('-mean_score')
+                    .values_list('id', flat=True)[:10]
+                )
+
+            def ranking_stats():
+                list(
+                    Course.objects.order_by('-stats__mean_score')
+                    .values_list('id', flat=True)[:10]
+                )
+
+            for label, func in (
+                ('totais do curso (agregação)', aggregate),
+                ('totais do curso (CourseStats)', stats),
+                ('10 maiores médias (agregação)', ranking_aggregate),
+                ('10 maiores médias (CourseStats)', ranking_stats),
+            ):
+                median, p95 = measure(func, options['repeat'])
+                self.stdout.write(f'{label}: mediana {median:.2f} ms, p95 {p95:.2f} ms')
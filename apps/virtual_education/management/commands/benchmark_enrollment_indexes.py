@@ -0,0 +1,85 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.virtual_education.management.benchmark import analyze, measure, rollback, seed
+from apps.virtual_education.models import Enrollment
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o plano de execução e a latência das verificações de matrícula '
+        'dos serviços, com e sem os índices compostos de Enrollment.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--enrollments-per-student', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def get_scenarios(self, students, courses):
+        """
+        Consultas equivalentes às executadas pelos serviços e pela tarefa de
+        notificação, parametrizadas com alunos e cursos sorteados.
+        """
+        return {
+            'EnrollmentService.complete_enrollment': lambda: Enrollment.objects.filter(
+                status='Andamento',
+                student=random.choice(students),
+                course=random.choice(courses),
+            ),
+            'CourseService.check_course_with_enrollments': lambda: Enrollment.objects.filter(
+                status='Andamento', course=random.choice(courses)
+            ),
+            'StudentService.check_student_enrollment': lambda: Enrollment.objects.filter(
+                ~Q(status='Desistiu'), student=random.choice(students)
+            ),
+            'tasks.notify_enrollments_near_to_expire': lambda: Enrollment.objects.filter(
+                status='Andamento',
+                date_close__lt=timezone.now() + timedelta(days=7),
+            ).values_list('id', flat=True),
+        }
+
+    def run_scenarios(self, label, scenarios, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        for name, build_queryset in scenarios.items():
+            plan = build_queryset().explain()
+            median, p95 = measure(lambda: list(build_queryset()[:100]), repeat)
+            self.stdout.write(
+                f'{name}: mediana {median:.3f} ms, p95 {p95:.3f} ms'
+            )
+            for line in plan.splitlines():
+                self.stdout.write(f'    {line}')
+
+    def drop_indexes(self):
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in Enrollment._meta.indexes:
+                cursor.execute(str(index.remove_sql(Enrollment, schema_editor)))
+        analyze()
+
+    def handle(self, *args, **options):
+        with rollback():
+            students, courses = seed(
+                options['students'],
+                options['courses'],
+                options['enrollments_per_student'],
+            )
+            analyze()
+            self.stdout.write(
+                f'{Enrollment.objects.count()} matrículas semeadas.'
+            )
+            scenarios = self.get_scenarios(students, courses)
+
+            with transaction.atomic():
+                self.drop_indexes()
+                self.run_scenarios('Sem índices', scenarios, options['repeat'])
+                transaction.set_rollback(True)
+
+            analyze()
+            self.run_scenarios('Com índices', scenarios, options['repeat'])
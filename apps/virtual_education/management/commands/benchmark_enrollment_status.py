@@ -0,0 +1,127 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.virtual_education.management.benchmark import analyze, measure, rollback, seed
+from apps.virtual_education.models import Enrollment
+
+
+# Cópia das matrículas com o status em texto, como antes da migração
+# 0010_enrollment_status_swap, e os mesmos índices sobre o status.
+TEXT_TABLE = 'benchmark_enrollment_text_status'
+TEXT_INDEXES = {
+    f'{TEXT_TABLE}_student_idx': '(student_id, status)',
+    f'{TEXT_TABLE}_course_idx': '(course_id, status)',
+    f'{TEXT_TABLE}_active_idx': "(date_close) WHERE status = 'Andamento'",
+}
+CODE_INDEXES = [
+    'enrollment_student_status_idx',
+    'enrollment_course_status_idx',
+    'enrollment_active_close_idx',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o tamanho dos índices e a latência dos filtros por status '
+        'com o status gravado como código e como texto. Use, por exemplo, '
+        '--students 2000000 --enrollments-per-student 4 para cerca de 10M '
+        'de matrículas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--enrollments-per-student', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def index_size(self, cursor, name):
+        """
+        Tamanho do índice em bytes, ou `None` se o banco não o informa.
+        """
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_relation_size(%s::regclass)', [name])
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [name])
+            except Exception:
+                return None
+        else:
+            return None
+        return cursor.fetchone()[0]
+
+    def create_text_table(self, cursor):
+        table = connection.ops.quote_name(Enrollment._meta.db_table)
+        cases = ' '.join(
+            f"WHEN {code} THEN '{name}'" for name, code in Enrollment.STATUS_CODES.items()
+        )
+        cursor.execute(
+            f'CREATE TABLE {TEXT_TABLE} AS SELECT id, student_id, course_id, '
+            f'date_close, CASE status {cases} END AS status FROM {table}'
+        )
+        for name, definition in TEXT_INDEXES.items():
+            cursor.execute(f'CREATE INDEX {name} ON {TEXT_TABLE} {definition}')
+
+        # Recria os índices da tabela real, inseridos em ordem aleatória,
+        # para comparar índices construídos da mesma forma.
+        reindex = 'REINDEX INDEX' if connection.vendor == 'postgresql' else 'REINDEX'
+        for name in CODE_INDEXES:
+            cursor.execute(f'{reindex} {name}')
+
+    def get_scenarios(self, students, courses):
+        """
+        Filtros por status dos serviços, em SQL, para as duas tabelas.
+        """
+        codes = Enrollment.STATUS_CODES
+        return {
+            'aluno com matrícula em andamento': (
+                'SELECT 1 FROM {table} WHERE student_id = %s AND status = %s LIMIT 1',
+                lambda status: [random.choice(students).pk.hex, status('Andamento')],
+            ),
+            'matrículas em andamento do curso': (
+                'SELECT COUNT(*) FROM {table} WHERE course_id = %s AND status = %s',
+                lambda status: [random.choice(courses).pk.hex, status('Andamento')],
+            ),
+            'matrículas encerradas do curso': (
+                'SELECT COUNT(*) FROM {table} WHERE course_id = %s AND status IN (%s, %s)',
+                lambda status: [
+                    random.choice(courses).pk.hex, status('Aprovado'), status('Reprovado')
+                ],
+            ),
+        }, {
+            'código': (connection.ops.quote_name(Enrollment._meta.db_table), codes.get),
+            'texto': (TEXT_TABLE, lambda name: name),
+        }
+
+    def handle(self, *args, **options):
+        with rollback():
+            students, courses = seed(
+                options['students'],
+                options['courses'],
+                options['enrollments_per_student'],
+            )
+            with connection.cursor() as cursor:
+                self.create_text_table(cursor)
+                analyze()
+                self.stdout.write(f'{Enrollment.objects.count()} matrículas semeadas.')
+
+                self.stdout.write(self.style.MIGRATE_HEADING('Tamanho dos índices'))
+                for before, after in zip(TEXT_INDEXES, CODE_INDEXES):
+                    self.stdout.write(
+                        f'{after}: texto {self.index_size(cursor, before)} bytes, '
+                        f'código {self.index_size(cursor, after)} bytes'
+                    )
+
+                scenarios, tables = self.get_scenarios(students, courses)
+                for name, (sql, params) in scenarios.items():
+                    self.stdout.write(self.style.MIGRATE_HEADING(name))
+                    for label, (table, status) in tables.items():
+                        median, p95 = measure(
+                            lambda: cursor.execute(sql.format(table=table), params(status))
+                            and cursor.fetchall(),
+                            options['repeat']
+                        )
+                        self.stdout.write(
+                            f'{label}: mediana {median:.3f} ms, p95 {p95:.3f} ms'
+                        )
@@ -0,0 +1,111 @@
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.virtual_education.management.benchmark import analyze, rollback, seed
+from apps.virtual_education.models import Enrollment, Notification
+from apps.virtual_education.tasks import notify_enrollments_near_to_expire
+from e_learning.celery import app
+
+
+NOTIFICATIONS_QUEUE = 'notifications'
+
+
+@contextmanager
+def celery_conf(**values):
+    """
+    Altera a configuração do Celery (chaves com o prefixo `CELERY_` das
+    settings) durante o bloco, descartando o pool de conexões do broker
+    para que a nova URL seja usada.
+    """
+    previous = {key: app.conf.get(key) for key in values}
+    app.conf.update(values)
+    app._pool = None
+    try:
+        yield
+    finally:
+        app.conf.update(previous)
+        app._pool = None
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a vazão dos avisos de término de matrículas: com as tarefas '
+        'publicadas num broker em memória e consumidas da fila de '
+        'notificações, como num worker, e executadas localmente (eager).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--courses', type=int, default=50)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def consume(self):
+        """
+        Consome a fila de notificações até esvaziá-la, executando cada tarefa
+        no próprio processo: os dados semeados estão numa transação ainda
+        não confirmada, invisível a um worker separado.
+        """
+        messages = 0
+        with app.connection_for_read() as connection:
+            queue = connection.SimpleQueue(NOTIFICATIONS_QUEUE)
+            while True:
+                try:
+                    message = queue.get(block=False)
+                except queue.Empty:
+                    break
+                args, kwargs, _ = message.payload
+                app.tasks[message.headers['task']].apply(
+                    args, kwargs, task_id=message.headers['id']
+                )
+                message.ack()
+                messages += 1
+            queue.close()
+        return messages
+
+    def run(self, label, func, enrollments, start):
+        began = time.perf_counter()
+        messages = func()
+        seconds = time.perf_counter() - began
+
+        rows = Enrollment.objects.filter(
+            pk__in=enrollments, date_expiry_notified__isnull=False
+        ).count()
+        self.stdout.write(
+            f'{label}: {rows} matrículas, {messages} mensagens em {seconds:.2f} s '
+            f'({rows / seconds:.0f} linhas/s)'
+        )
+
+        # Desfaz os avisos para a próxima execução.
+        Enrollment.objects.filter(pk__in=enrollments).update(date_expiry_notified=None)
+        Notification.objects.filter(date_created__gte=start).delete()
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        with rollback():
+            _, courses = seed(options['students'], options['courses'], 0)
+            start = timezone.now()
+            expiring = Enrollment.objects.filter(course__in=courses, status='Andamento')
+            expiring.update(date_close=start + timedelta(days=3))
+            enrollments = list(expiring.values_list('pk', flat=True))
+            analyze()
+
+            def broker():
+                notify_enrollments_near_to_expire.delay(chunk_size)
+                return self.consume()
+
+            def eager():
+                notify_enrollments_near_to_expire.delay(chunk_size)
+                return 0
+
+            with celery_conf(
+                CELERY_BROKER_URL='memory://',
+                CELERY_RESULT_BACKEND='cache+memory://',
+                CELERY_TASK_ALWAYS_EAGER=False,
+            ):
+                self.run('broker em memória', broker, enrollments, start)
+            with celery_conf(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True):
+                self.run('eager', eager, enrollments, start)
@@ -0,0 +1,77 @@
+from contextlib import nullcontext
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.virtual_education.management.benchmark import measure, rollback, seed
+from apps.virtual_education.mixins.response_cache import ResponseCacheMixin
+from apps.virtual_education.views.courses import CourseViewSet
+from apps.virtual_education.views.enrollments import EnrollmentViewSet
+from apps.virtual_education.views.students import StudentViewSet
+
+
+VIEWSETS = {
+    'courses': CourseViewSet,
+    'enrollments': EnrollmentViewSet,
+    'students': StudentViewSet,
+}
+
+
+def uncached_response(view, handler, request, *args, **kwargs):
+    # Substitui ResponseCacheMixin.get_cached_response: mede a listagem, não
+    # os acertos do cache de respostas.
+    return handler(request, *args, **kwargs)
+
+
+def bypass_response_cache(viewset):
+    if issubclass(viewset, ResponseCacheMixin):
+        return mock.patch.object(viewset, 'get_cached_response', uncached_response)
+    return nullcontext()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a vazão (linhas/s) das listagens pelo serializador com a '
+        'listagem rápida (FastListMixin), por tamanho de página.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=1000)
+        parser.add_argument('--enrollments-per-student', type=int, default=1)
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def list_page(self, viewset, page_size):
+        request = APIRequestFactory().get('/', {'tamanho': page_size})
+        response = viewset.as_view({'get': 'list'})(request)
+        response.render()
+        return len(response.data['results'])
+
+    def handle(self, *args, **options):
+        # As requisições simuladas usam o host 'testserver'.
+        with rollback(), override_settings(ALLOWED_HOSTS=['testserver']):
+            seed(
+                options['students'],
+                options['courses'],
+                options['enrollments_per_student']
+            )
+
+            for name, viewset in VIEWSETS.items():
+                with bypass_response_cache(viewset):
+                    for page_size in options['page_sizes']:
+                        results = []
+                        for label, fast_list in (('serializador', False), ('rápida', True)):
+                            with mock.patch.object(viewset, 'fast_list', fast_list):
+                                rows = self.list_page(viewset, page_size)
+                                median, _ = measure(
+                                    lambda: self.list_page(viewset, page_size),
+                                    options['repeat']
+                                )
+                            results.append(f'{label} {rows / median * 1000:.0f} linhas/s')
+
+                        self.stdout.write(
+                            f'/{name}/ tamanho={page_size}: ' + '; '.join(results)
+                        )
@@ -0,0 +1,73 @@
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.virtual_education.management.benchmark import measure
+from apps.virtual_education.models import Enrollment
+from apps.virtual_education.serializers.enrollments import EnrollmentSerializer
+
+
+class LegacyDateTimeFormatMixin:
+    # Implementação anterior: formata os campos a cada instanciação.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        for field_name, field in self.fields.items():
+            if isinstance(field, serializers.DateTimeField):
+                field.format = '%d/%m/%Y %H:%M:%S'
+
+
+class LegacyEnrollmentSerializer(LegacyDateTimeFormatMixin, serializers.ModelSerializer):
+    serializer_related_field = EnrollmentSerializer.serializer_related_field
+
+    class Meta(EnrollmentSerializer.Meta):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o custo de construção dos serializadores e de renderização '
+        'de listas de matrículas com a formatação de datas anterior.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enrollments', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def build_enrollments(self, size):
+        # Matrículas em memória: mede apenas a serialização, sem o banco.
+        now = timezone.now()
+        return [
+            Enrollment(
+                id=uuid.uuid4(),
+                student_id=uuid.uuid4(),
+                course_id=uuid.uuid4(),
+                date_enroll=now,
+                date_close=now + timedelta(days=30),
+                status='Andamento'
+            )
+            for _ in range(size)
+        ]
+
+    def handle(self, *args, **options):
+        enrollments = self.build_enrollments(options['enrollments'])
+        repeat = options['repeat']
+
+        for label, serializer_class in (
+            ('Anterior', LegacyEnrollmentSerializer),
+            ('Atual', EnrollmentSerializer),
+        ):
+            construction, _ = measure(
+                lambda: [serializer_class().fields for _ in range(1000)], repeat
+            )
+            rendering, p95 = measure(
+                lambda: serializer_class(enrollments, many=True).data, repeat
+            )
+            self.stdout.write(
+                f'{label}: construção de 1000 serializadores {construction:.1f} ms; '
+                f'lista de {len(enrollments)} matrículas {rendering:.1f} ms '
+                f'(p95 {p95:.1f} ms)'
+            )
@@ -0,0 +1,70 @@
+import random
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.virtual_education.management.benchmark import analyze, measure, rollback
+from apps.virtual_education.models import Student, User
+from apps.virtual_education.search import search_students
+
+
+NAMES = [
+    'José', 'João', 'Antônio', 'Conceição', 'Mônica', 'Letícia', 'Márcio',
+    'Sérgio', 'Cláudia', 'Fábio', 'Inês', 'Lúcia', 'Vinícius', 'Tânia',
+]
+SYLLABLES = ['ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ru', 'sa', 'te', 'vo']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a latência do autocomplete de alunos com a busca por '
+        'icontains no usuário. Use --students 5000000 para o cenário de '
+        '5M de alunos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100000)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def seed(self, size, batch_size):
+        token = uuid.uuid4().hex[:8]
+        for start in range(0, size, batch_size):
+            users = []
+            for index in range(start, min(start + batch_size, size)):
+                surname = ''.join(random.choices(SYLLABLES, k=3))
+                users.append(User(
+                    username=f'{surname}.{token}.{index}@example.com',
+                    email=f'{surname}.{token}.{index}@example.com',
+                    nickname=f'{random.choice(NAMES)} {surname.capitalize()}',
+                    phone='0000-0000',
+                ))
+            users = User.objects.bulk_create(users)
+
+            students = [Student(user=user) for user in users]
+            for student in students:
+                student.normalize()
+            Student.objects.bulk_create(students)
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        with rollback():
+            self.seed(options['students'], options['batch_size'])
+            analyze()
+
+            queryset = Student.objects.read_model()
+            for terms in ('jo', 'conceicao', 'lucia me', 'fogu'):
+                icontains = queryset.filter(
+                    Q(user__nickname__icontains=terms) | Q(user__email__icontains=terms)
+                ).order_by('user__nickname')[:limit]
+
+                for label, func in (
+                    ('icontains', lambda: list(icontains.all())),
+                    ('autocomplete', lambda: search_students(queryset, terms, limit)),
+                ):
+                    median, p95 = measure(func, options['repeat'])
+                    self.stdout.write(
+                        f'"{terms}" ({label}): mediana {median:.2f} ms, p95 {p95:.2f} ms'
+                    )
@@ -0,0 +1,51 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.virtual_education.serializers.students import StudentSerializer
+from apps.virtual_education.services.students import StudentService
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa alunos de um arquivo CSV com as colunas nickname, email e '
+        'phone, cadastrando usuários e alunos em lote.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Caminho do arquivo CSV.')
+        parser.add_argument(
+            '--batch-size', type=int, default=StudentService.BULK_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        try:
+            file = open(options['path'], newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'Não foi possível abrir o arquivo: {exc}')
+
+        created = failed = 0
+        with file:
+            rows = csv.DictReader(file)
+            chunks = StudentService.bulk_create_students(
+                StudentSerializer(many=True), rows, options['batch_size']
+            )
+            for results in chunks:
+                for result in results:
+                    if result['created']:
+                        created += 1
+                        continue
+                    failed += 1
+                    # A linha 1 do arquivo é o cabeçalho.
+                    self.stderr.write(
+                        f'Linha {result["index"] + 2}: {dict(result["errors"])}'
+                    )
+
+                self.stdout.write(
+                    f'{created + failed} processados: '
+                    f'{created} cadastrados, {failed} com erro.'
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Importação concluída: {created} cadastrados, {failed} com erro.'
+        ))
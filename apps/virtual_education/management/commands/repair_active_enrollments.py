@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from apps.utils import chunked
+from apps.virtual_education.models import Student
+from apps.virtual_education.services.students import StudentService
+
+
+class Command(BaseCommand):
+    help = (
+        'Confere a matrícula em andamento registrada em cada aluno com as '
+        'matrículas e corrige as divergências, em lotes de alunos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=StudentService.BULK_CHUNK_SIZE)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas informa as divergências, sem corrigi-las.'
+        )
+
+    def handle(self, *args, **options):
+        student_ids = Student.objects.order_by('pk').values_list('pk', flat=True)
+        checked = drifted = 0
+        for chunk in chunked(student_ids.iterator(), options['batch_size']):
+            drifted += StudentService.repair_active_enrollments(chunk, options['dry_run'])
+            checked += len(chunk)
+            self.stdout.write(f'{checked} alunos conferidos: {drifted} divergentes.')
+
+        action = 'encontradas' if options['dry_run'] else 'corrigidas'
+        self.stdout.write(self.style.SUCCESS(
+            f'Conferência concluída: {checked} alunos, {drifted} divergências {action}.'
+        ))
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.2 on 2026-10-18 17:57
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_active_enrollments(apps, schema_editor):
+    """
+    Interrompe a migração se algum aluno tiver mais de uma matrícula em
+    andamento, listando as matrículas a corrigir antes da restrição.
+    """
+    Enrollment = apps.get_model('virtual_education', 'Enrollment')
+    duplicates = list(
+        Enrollment.objects.filter(status='Andamento')
+        .values('student_id')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('student_id', flat=True)
+    )
+    if not duplicates:
+        return
+
+    enrollments = (
+        Enrollment.objects.filter(status='Andamento', student_id__in=duplicates)
+        .order_by('student_id', 'date_enroll')
+        .values_list('student_id', 'id', 'date_enroll')
+    )
+    lines = [
+        f'  aluno {student_id}: matrícula {enrollment_id} ({date_enroll:%Y-%m-%d %H:%M})'
+        for student_id, enrollment_id, date_enroll in enrollments
+    ]
+    raise Exception(
+        f'{len(duplicates)} aluno(s) com mais de uma matrícula em andamento. '
+        'Conclua ou cancele as matrículas excedentes e execute a migração '
+        'novamente:\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0002_enrollment_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_active_enrollments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='enrollment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'Andamento')), fields=('student',), name='unique_active_enrollment_per_student'),
+        ),
+    ]
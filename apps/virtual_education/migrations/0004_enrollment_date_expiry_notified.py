@@ -0,0 +1,18 @@
+# Generated by Django 4.2.2 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0003_unique_active_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='date_expiry_notified',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.2 on 2026-10-18 18:05
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0004_enrollment_date_expiry_notified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('recipient', models.EmailField(max_length=254)),
+                ('message', models.TextField()),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_sent', models.DateTimeField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('date_sent__isnull', True)), fields=['recipient', 'date_created'], name='notification_pending_idx')],
+            },
+        ),
+    ]
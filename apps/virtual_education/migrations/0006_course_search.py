@@ -0,0 +1,107 @@
+from django.db import migrations
+
+
+# Índice textual dos cursos, conforme o banco:
+#
+# - SQLite: tabela FTS5 de conteúdo externo sobre a tabela de cursos,
+#   sincronizada por gatilhos (inclusive em bulk_create e update em massa).
+#   Uma migração que recrie a tabela de cursos no SQLite (AlterField etc.)
+#   descarta os gatilhos e muda os rowids; ela deve recriar o índice. A
+#   migração 0014_course_search_stable_rowid troca o rowid por uma chave
+#   estável.
+# - PostgreSQL: índice GIN sobre a mesma expressão de search_courses, com
+#   uma configuração de busca em português que ignora acentos.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE virtual_education_course_fts USING fts5(
+        name, description,
+        content='virtual_education_course', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER virtual_education_course_fts_insert
+    AFTER INSERT ON virtual_education_course BEGIN
+        INSERT INTO virtual_education_course_fts(rowid, name, description)
+        VALUES (new.rowid, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER virtual_education_course_fts_delete
+    AFTER DELETE ON virtual_education_course BEGIN
+        INSERT INTO virtual_education_course_fts(virtual_education_course_fts, rowid, name, description)
+        VALUES ('delete', old.rowid, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER virtual_education_course_fts_update
+    AFTER UPDATE OF name, description ON virtual_education_course BEGIN
+        INSERT INTO virtual_education_course_fts(virtual_education_course_fts, rowid, name, description)
+        VALUES ('delete', old.rowid, old.name, old.description);
+        INSERT INTO virtual_education_course_fts(rowid, name, description)
+        VALUES (new.rowid, new.name, new.description);
+    END
+    """,
+    "INSERT INTO virtual_education_course_fts(virtual_education_course_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS virtual_education_course_fts_update',
+    'DROP TRIGGER IF EXISTS virtual_education_course_fts_delete',
+    'DROP TRIGGER IF EXISTS virtual_education_course_fts_insert',
+    'DROP TABLE IF EXISTS virtual_education_course_fts',
+]
+
+POSTGRESQL_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    """
+    DO $$ BEGIN
+        CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+    EXCEPTION WHEN unique_violation OR duplicate_object THEN NULL;
+    END $$
+    """,
+    """
+    ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem
+    """,
+]
+
+POSTGRESQL_INDEX = 'course_search_idx'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        from apps.virtual_education.search import course_search_vector
+
+        for sql in POSTGRESQL_FORWARD:
+            schema_editor.execute(sql)
+        schema_editor.add_index(
+            apps.get_model('virtual_education', 'Course'),
+            GinIndex(course_search_vector(), name=POSTGRESQL_INDEX)
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_BACKWARD:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {POSTGRESQL_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0005_notification'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
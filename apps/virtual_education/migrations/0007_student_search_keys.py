@@ -0,0 +1,84 @@
+# Generated by Django 4.2.2 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+from apps.utils import chunked, normalize_search_key
+
+
+# No PostgreSQL, índices GiST de trigramas atendem às buscas por trecho
+# (LIKE '%termo%') e à ordenação por similaridade do autocomplete.
+POSTGRESQL_TRIGRAM_INDEXES = {
+    'student_nickname_key_trgm_idx': 'nickname_key',
+    'student_email_key_trgm_idx': 'email_key',
+}
+
+
+def populate_search_keys(apps, schema_editor):
+    Student = apps.get_model('virtual_education', 'Student')
+    students = Student.objects.values_list(
+        'id', 'user__nickname', 'user__email'
+    ).iterator(chunk_size=2000)
+    for chunk in chunked(students, 2000):
+        Student.objects.bulk_update(
+            [
+                Student(
+                    id=id,
+                    nickname_key=normalize_search_key(nickname),
+                    email_key=normalize_search_key(email)
+                )
+                for id, nickname, email in chunk
+            ],
+            ['nickname_key', 'email_key']
+        )
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    from django.contrib.postgres.indexes import GistIndex
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    Student = apps.get_model('virtual_education', 'Student')
+    for name, field in POSTGRESQL_TRIGRAM_INDEXES.items():
+        schema_editor.add_index(
+            Student, GistIndex(fields=[field], opclasses=['gist_trgm_ops'], name=name)
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name in POSTGRESQL_TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0006_course_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='email_key',
+            field=models.CharField(default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='nickname_key',
+            field=models.CharField(default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(populate_search_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['nickname_key'], name='student_nickname_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['email_key'], name='student_email_key_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
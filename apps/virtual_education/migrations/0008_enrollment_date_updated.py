@@ -0,0 +1,18 @@
+# Generated by Django 4.2.2 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0007_student_search_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='date_updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,117 @@
+from django.db import migrations, models, transaction
+
+import apps.virtual_education.models
+
+
+STATUS_CHOICES = [
+    ('Aprovado', 'Aprovado'),
+    ('Reprovado', 'Reprovado'),
+    ('Andamento', 'Andamento'),
+    ('Desistiu', 'Desistiu'),
+]
+STATUS_CODES = {'Andamento': 1, 'Aprovado': 2, 'Reprovado': 3, 'Desistiu': 4}
+
+BATCH_SIZE = 5000
+
+# Enquanto as duas colunas coexistem, gatilhos mantêm `status_code` em dia
+# com as escritas da aplicação em `status` (inclusive durante a conversão em
+# lotes). A migração 0010 remove os gatilhos ao trocar as colunas.
+TABLE = 'virtual_education_enrollment'
+SYNC_TRIGGER = 'enrollment_status_code_sync'
+STATUS_CODE_CASE = 'CASE NEW.status {} END'.format(
+    ' '.join(f"WHEN '{name}' THEN {code}" for name, code in STATUS_CODES.items())
+)
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER {SYNC_TRIGGER}_insert AFTER INSERT ON {TABLE} BEGIN
+        UPDATE {TABLE} SET status_code = {STATUS_CODE_CASE} WHERE rowid = NEW.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SYNC_TRIGGER}_update AFTER UPDATE OF status ON {TABLE} BEGIN
+        UPDATE {TABLE} SET status_code = {STATUS_CODE_CASE} WHERE rowid = NEW.rowid;
+    END
+    """,
+]
+
+POSTGRESQL_TRIGGERS = [
+    f"""
+    CREATE OR REPLACE FUNCTION {SYNC_TRIGGER}() RETURNS trigger AS $$
+    BEGIN
+        NEW.status_code := {STATUS_CODE_CASE};
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE TRIGGER {SYNC_TRIGGER} BEFORE INSERT OR UPDATE OF status ON {TABLE}
+    FOR EACH ROW EXECUTE FUNCTION {SYNC_TRIGGER}()
+    """,
+]
+
+
+def create_sync_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        for sql in POSTGRESQL_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+def drop_sync_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {SYNC_TRIGGER}_insert')
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {SYNC_TRIGGER}_update')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {SYNC_TRIGGER} ON {TABLE}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {SYNC_TRIGGER}()')
+
+
+def copy_status_codes(apps, schema_editor):
+    # Converte as matrículas em lotes pela chave primária, cada lote na sua
+    # própria transação, sem manter a tabela bloqueada durante a conversão.
+    Enrollment = apps.get_model('virtual_education', 'Enrollment')
+    code = models.Case(
+        *[
+            models.When(status=name, then=models.Value(value))
+            for name, value in STATUS_CODES.items()
+        ],
+        output_field=models.PositiveSmallIntegerField()
+    )
+
+    last = None
+    while True:
+        queryset = Enrollment.objects.order_by('pk')
+        if last is not None:
+            queryset = queryset.filter(pk__gt=last)
+        batch = list(queryset.values_list('pk', flat=True)[:BATCH_SIZE])
+        if not batch:
+            return
+
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Enrollment.objects.filter(pk__in=batch).update(status_code=code)
+        last = batch[-1]
+
+
+class Migration(migrations.Migration):
+    # Os lotes da conversão são confirmados um a um.
+    atomic = False
+
+    dependencies = [
+        ('virtual_education', '0008_enrollment_date_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='status_code',
+            field=apps.virtual_education.models.CodedChoiceField(
+                choices=STATUS_CHOICES, codes=STATUS_CODES, null=True
+            ),
+        ),
+        migrations.RunPython(create_sync_triggers, drop_sync_triggers),
+        migrations.RunPython(copy_status_codes, migrations.RunPython.noop),
+    ]
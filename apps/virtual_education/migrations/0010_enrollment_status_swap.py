@@ -0,0 +1,215 @@
+from django.db import migrations, models, transaction
+
+import apps.virtual_education.models
+
+
+BATCH_SIZE = 5000
+
+TABLE = 'virtual_education_enrollment'
+SYNC_TRIGGER = 'enrollment_status_code_sync'
+
+# No PostgreSQL os índices e a restrição sobre o código são criados antes da
+# troca, sem bloquear escritas, com estes nomes provisórios; a troca só os
+# renomeia.
+POSTGRESQL_INDEXES = {
+    'enrollment_student_status_new': 'enrollment_student_status_idx',
+    'enrollment_course_status_new': 'enrollment_course_status_idx',
+    'enrollment_active_close_new': 'enrollment_active_close_idx',
+    'unique_active_enrollment_new': 'unique_active_enrollment_per_student',
+}
+NOT_NULL_CHECK = 'enrollment_status_code_not_null'
+
+
+def status_code_case(Enrollment):
+    codes = Enrollment._meta.get_field('status_code').codes
+    return models.Case(
+        *[
+            models.When(status=name, then=models.Value(code))
+            for name, code in codes.items()
+        ],
+        output_field=models.PositiveSmallIntegerField()
+    )
+
+
+def resync_status_codes(apps, schema_editor, batch_size=BATCH_SIZE):
+    """
+    Corrige, em lotes pela chave primária, as matrículas cujo código está
+    nulo ou difere do nome: escritas feitas antes dos gatilhos da 0009 ou
+    entre um lote e outro da conversão.
+    """
+    Enrollment = apps.get_model('virtual_education', 'Enrollment')
+    code = status_code_case(Enrollment)
+    divergent = models.Q(status_code__isnull=True) | ~models.Q(status_code=code)
+
+    last = None
+    while True:
+        queryset = Enrollment.objects.order_by('pk')
+        if last is not None:
+            queryset = queryset.filter(pk__gt=last)
+        batch = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return
+
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Enrollment.objects.filter(divergent, pk__in=batch).update(status_code=code)
+        last = batch[-1]
+
+
+def create_postgresql_indexes(apps, schema_editor):
+    # Fora de transação: CREATE INDEX CONCURRENTLY e a validação da checagem
+    # não impedem as escritas da aplicação enquanto percorrem a tabela.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    drop_postgresql_indexes(apps, schema_editor)
+    Enrollment = apps.get_model('virtual_education', 'Enrollment')
+    active = models.Q(status_code='Andamento')
+    for index in [
+        models.Index(fields=['student', 'status_code'], name='enrollment_student_status_new'),
+        models.Index(fields=['course', 'status_code'], name='enrollment_course_status_new'),
+        models.Index(condition=active, fields=['date_close'], name='enrollment_active_close_new'),
+    ]:
+        schema_editor.add_index(Enrollment, index, concurrently=True)
+
+    constraint = models.UniqueConstraint(
+        condition=active, fields=('student',), name='unique_active_enrollment_new'
+    )
+    sql = str(constraint.create_sql(Enrollment, schema_editor))
+    schema_editor.execute(
+        sql.replace('CREATE UNIQUE INDEX', 'CREATE UNIQUE INDEX CONCURRENTLY', 1)
+    )
+
+    # Uma checagem validada permite ao SET NOT NULL da troca dispensar a
+    # varredura da tabela.
+    schema_editor.execute(
+        f'ALTER TABLE {TABLE} ADD CONSTRAINT {NOT_NULL_CHECK} '
+        f'CHECK (status_code IS NOT NULL) NOT VALID'
+    )
+    schema_editor.execute(f'ALTER TABLE {TABLE} VALIDATE CONSTRAINT {NOT_NULL_CHECK}')
+
+
+def drop_postgresql_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(f'ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {NOT_NULL_CHECK}')
+    for name in POSTGRESQL_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def copy_status_names(apps, schema_editor):
+    # Reversão: restaura os nomes na coluna de texto antes de recriar os
+    # índices e a restrição sobre ela.
+    Enrollment = apps.get_model('virtual_education', 'Enrollment')
+    for name, code in Enrollment._meta.get_field('status_code').codes.items():
+        Enrollment.objects.filter(status_code=code).update(status=name)
+
+
+class SwapStatusColumns(migrations.SeparateDatabaseAndState):
+    """
+    Troca a coluna de texto pela de código numa transação curta.
+
+    No PostgreSQL os índices novos já existem: a troca remove a coluna
+    antiga (e com ela os índices antigos), renomeia a nova e os índices
+    provisórios. Nos demais bancos remove os gatilhos, corrige as linhas
+    divergentes e aplica as operações do estado.
+    """
+
+    def __init__(self, operations):
+        super().__init__(database_operations=operations, state_operations=operations)
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.state_operations], {}
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        alias = schema_editor.connection.alias
+        if schema_editor.connection.vendor != 'postgresql':
+            with transaction.atomic(using=alias):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {SYNC_TRIGGER}_insert')
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {SYNC_TRIGGER}_update')
+                resync_status_codes(from_state.apps, schema_editor)
+                super().database_forwards(app_label, schema_editor, from_state, to_state)
+            return
+
+        with transaction.atomic(using=alias):
+            schema_editor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {SYNC_TRIGGER} ON {TABLE}')
+            schema_editor.execute(f'DROP FUNCTION IF EXISTS {SYNC_TRIGGER}()')
+            schema_editor.execute(f'ALTER TABLE {TABLE} DROP COLUMN status')
+            schema_editor.execute(f'ALTER TABLE {TABLE} RENAME COLUMN status_code TO status')
+            schema_editor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN status SET NOT NULL')
+            schema_editor.execute(f'ALTER TABLE {TABLE} DROP CONSTRAINT {NOT_NULL_CHECK}')
+            for name, final in POSTGRESQL_INDEXES.items():
+                schema_editor.execute(f'ALTER INDEX {name} RENAME TO {final}')
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # A correção e a criação concorrente dos índices rodam fora de transação;
+    # só a troca das colunas bloqueia a tabela, e por pouco tempo.
+    atomic = False
+
+    dependencies = [
+        ('virtual_education', '0009_enrollment_status_code'),
+    ]
+
+    operations = [
+        migrations.RunPython(resync_status_codes, migrations.RunPython.noop),
+        migrations.RunPython(create_postgresql_indexes, drop_postgresql_indexes),
+        SwapStatusColumns([
+            migrations.RemoveConstraint(
+                model_name='enrollment',
+                name='unique_active_enrollment_per_student',
+            ),
+            migrations.RemoveIndex(
+                model_name='enrollment',
+                name='enrollment_student_status_idx',
+            ),
+            migrations.RemoveIndex(
+                model_name='enrollment',
+                name='enrollment_course_status_idx',
+            ),
+            migrations.RemoveIndex(
+                model_name='enrollment',
+                name='enrollment_active_close_idx',
+            ),
+            migrations.RunPython(migrations.RunPython.noop, copy_status_names),
+            migrations.RemoveField(
+                model_name='enrollment',
+                name='status',
+            ),
+            migrations.RenameField(
+                model_name='enrollment',
+                old_name='status_code',
+                new_name='status',
+            ),
+            migrations.AlterField(
+                model_name='enrollment',
+                name='status',
+                field=apps.virtual_education.models.CodedChoiceField(
+                    choices=[('Aprovado', 'Aprovado'), ('Reprovado', 'Reprovado'), ('Andamento', 'Andamento'), ('Desistiu', 'Desistiu')],
+                    codes={'Andamento': 1, 'Aprovado': 2, 'Reprovado': 3, 'Desistiu': 4},
+                    default='Andamento'
+                ),
+            ),
+            migrations.AddIndex(
+                model_name='enrollment',
+                index=models.Index(fields=['student', 'status'], name='enrollment_student_status_idx'),
+            ),
+            migrations.AddIndex(
+                model_name='enrollment',
+                index=models.Index(fields=['course', 'status'], name='enrollment_course_status_idx'),
+            ),
+            migrations.AddIndex(
+                model_name='enrollment',
+                index=models.Index(condition=models.Q(('status', 'Andamento')), fields=['date_close'], name='enrollment_active_close_idx'),
+            ),
+            migrations.AddConstraint(
+                model_name='enrollment',
+                constraint=models.UniqueConstraint(condition=models.Q(('status', 'Andamento')), fields=('student',), name='unique_active_enrollment_per_student'),
+            ),
+        ]),
+    ]
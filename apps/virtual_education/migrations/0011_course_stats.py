@@ -0,0 +1,74 @@
+# Generated by Django 4.2.2 on 2026-10-18 18:38
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q, Sum
+import django.db.models.deletion
+
+from apps.utils import chunked
+
+
+STATUS_FIELDS = {
+    'Andamento': 'in_progress',
+    'Aprovado': 'approved',
+    'Reprovado': 'failed',
+    'Desistiu': 'dropped',
+}
+
+
+def populate_course_stats(apps, schema_editor):
+    # Totais iniciais de todos os cursos, agregados em lotes de cursos.
+    Course = apps.get_model('virtual_education', 'Course')
+    CourseStats = apps.get_model('virtual_education', 'CourseStats')
+    Enrollment = apps.get_model('virtual_education', 'Enrollment')
+
+    course_ids = Course.objects.values_list('id', flat=True).iterator(chunk_size=1000)
+    for chunk in chunked(course_ids, 1000):
+        stats = {course_id: CourseStats(course_id=course_id) for course_id in chunk}
+        totals = (
+            Enrollment.objects.filter(course_id__in=chunk)
+            .order_by()
+            .values('course_id')
+            .annotate(
+                **{
+                    field: Count('pk', filter=Q(status=status))
+                    for status, field in STATUS_FIELDS.items()
+                },
+                score_sum=Sum('score'),
+                score_count=Count('score'),
+                mean_score=Avg('score'),
+            )
+        )
+        for row in totals:
+            course_stats = stats[row.pop('course_id')]
+            for field, value in row.items():
+                setattr(course_stats, field, value)
+            course_stats.score_sum = course_stats.score_sum or 0
+        CourseStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0010_enrollment_status_swap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='virtual_education.course')),
+                ('in_progress', models.IntegerField(default=0)),
+                ('approved', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+                ('dropped', models.IntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('score_count', models.IntegerField(default=0)),
+                ('mean_score', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('date_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['in_progress'], name='course_stats_in_progress_idx'), models.Index(fields=['mean_score'], name='course_stats_mean_score_idx')],
+            },
+        ),
+        migrations.RunPython(populate_course_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.2 on 2026-10-18 18:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from apps.utils import chunked
+
+
+def populate_active_enrollments(apps, schema_editor):
+    Enrollment = apps.get_model('virtual_education', 'Enrollment')
+    Student = apps.get_model('virtual_education', 'Student')
+    active = Enrollment.objects.filter(status='Andamento').values_list(
+        'student_id', 'id'
+    ).iterator(chunk_size=2000)
+    for chunk in chunked(active, 2000):
+        Student.objects.bulk_update(
+            [
+                Student(id=student_id, active_enrollment_id=enrollment_id)
+                for student_id, enrollment_id in chunk
+            ],
+            ['active_enrollment']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0011_course_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='active_enrollment',
+            field=models.OneToOneField(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='virtual_education.enrollment'),
+        ),
+        migrations.RunPython(populate_active_enrollments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.2 on 2026-10-18 20:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.utils.timezone
+
+
+def populate_student_date_created(apps, schema_editor):
+    Student = apps.get_model('virtual_education', 'Student')
+    User = apps.get_model('virtual_education', 'User')
+    Student.objects.update(
+        date_created=Subquery(
+            User.objects.filter(pk=OuterRef('user_id')).values('date_created')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0012_student_active_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='date_created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_student_date_created, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['date_created', 'id'], name='student_date_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['date_created', 'id'], name='course_date_created_idx'),
+        ),
+    ]
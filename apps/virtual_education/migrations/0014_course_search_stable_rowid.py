@@ -0,0 +1,101 @@
+from importlib import import_module
+
+from django.db import migrations
+
+
+# No SQLite, o índice textual de 0006_course_search usava o rowid implícito
+# da tabela de cursos, cuja chave primária é um UUID: o VACUUM ou uma
+# migração que recrie a tabela renumeram esse rowid, e a busca passaria a
+# apontar para outros cursos. O índice passa a ter o próprio conteúdo e a
+# ser ligado aos cursos por uma tabela de correspondência, cuja chave
+# inteira (INTEGER PRIMARY KEY) é o rowid do índice e não muda.
+#
+# Uma migração que recrie a tabela de cursos no SQLite ainda descarta os
+# gatilhos; ela deve recriá-los, mas o índice existente continua válido.
+
+FTS_TABLE = 'virtual_education_course_fts'
+MAP_TABLE = 'virtual_education_course_fts_map'
+COURSE_TABLE = 'virtual_education_course'
+
+# Linha do índice do curso, pela chave única da correspondência.
+FTS_ROWID = f'(SELECT id FROM {MAP_TABLE} WHERE course_id = {{}}.id)'
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE TABLE {MAP_TABLE} (
+        id INTEGER PRIMARY KEY,
+        course_id char(32) NOT NULL UNIQUE
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, description,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert
+    AFTER INSERT ON {COURSE_TABLE} BEGIN
+        INSERT INTO {MAP_TABLE}(course_id) VALUES (new.id);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES ({FTS_ROWID.format('new')}, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete
+    AFTER DELETE ON {COURSE_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = {FTS_ROWID.format('old')};
+        DELETE FROM {MAP_TABLE} WHERE course_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update
+    AFTER UPDATE OF name, description ON {COURSE_TABLE} BEGIN
+        UPDATE {FTS_TABLE} SET name = new.name, description = new.description
+        WHERE rowid = {FTS_ROWID.format('new')};
+    END
+    """,
+    f'INSERT INTO {MAP_TABLE}(course_id) SELECT id FROM {COURSE_TABLE}',
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, name, description)
+    SELECT map.id, course.name, course.description
+    FROM {MAP_TABLE} map JOIN {COURSE_TABLE} course ON course.id = map.course_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    f'DROP TABLE IF EXISTS {MAP_TABLE}',
+]
+
+
+def course_search():
+    return import_module('apps.virtual_education.migrations.0006_course_search')
+
+
+def create_stable_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in course_search().SQLITE_BACKWARD + SQLITE_FORWARD:
+        schema_editor.execute(sql)
+
+
+def restore_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SQLITE_BACKWARD + course_search().SQLITE_FORWARD:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('virtual_education', '0013_student_course_date_created'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_stable_search_index, restore_search_index),
+    ]
@@ -0,0 +1,115 @@
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'O recurso foi alterado desde a versão informada em If-Match.'
+    default_code = 'precondition_failed'
+
+
+class ConditionalRequestMixin:
+    """
+    Requisições condicionais no detalhe de um recurso.
+
+    O ETag é derivado das colunas de versão (`version_lookups`), lidas por
+    uma única consulta pela chave primária, sem carregar nem serializar o
+    objeto, e dos parâmetros que alteram a representação
+    (`etag_query_params`): um GET com If-None-Match correspondente recebe
+    304. Sem
+    If-None-Match, as versões são anotadas na própria consulta do detalhe.
+    Atualizações
+    podem exigir, com If-Match, que o recurso não tenha sido alterado desde
+    a versão lida (`check_precondition`), respondendo 412 caso contrário.
+    """
+
+    version_lookups = ('date_updated',)
+    etag_query_params = ('formato_data',)
+
+    def get_version_lookups(self):
+        return self.version_lookups
+
+    def make_etag(self, version):
+        params = [
+            f'{param}={self.request.query_params.get(param, "")}'
+            for param in self.etag_query_params
+        ]
+        digest = hashlib.md5('|'.join([*map(str, version), *params]).encode()).hexdigest()
+        return f'"{digest}"'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.annotate(**{
+                f'etag_version_{index}': F(lookup)
+                for index, lookup in enumerate(self.get_version_lookups())
+            })
+        return queryset
+
+    def get_etag(self, lock=False):
+        """
+        Retorna o ETag da versão atual do objeto, ou `None` se ele não existe.
+        """
+        queryset = self.queryset.model._default_manager.all()
+        if lock:
+            queryset = queryset.select_for_update(of=('self',))
+
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            version = queryset.filter(
+                **{self.lookup_field: lookup}
+            ).values_list(*self.get_version_lookups()).first()
+        except (TypeError, ValueError, DjangoValidationError):
+            return None
+        if version is None:
+            return None
+        return self.make_etag(version)
+
+    def check_precondition(self):
+        """
+        Recusa a atualização (412) se o If-Match não corresponde à versão
+        atual. Deve ser chamado dentro da transação da atualização, que
+        bloqueia a linha até o fim da escrita.
+        """
+        if 'If-Match' not in self.request.headers:
+            return
+
+        response = get_conditional_response(
+            self.request._request, etag=self.get_etag(lock=True)
+        )
+        if response is not None and response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            raise PreconditionFailed()
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'If-None-Match' in request.headers:
+            etag = self.get_etag()
+            response = etag and get_conditional_response(request._request, etag=etag)
+            if response:
+                response['ETag'] = etag
+                return response
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        response = Response(serializer.data)
+        response['ETag'] = self.make_etag([
+            getattr(instance, f'etag_version_{index}')
+            for index in range(len(self.get_version_lookups()))
+        ])
+        return response
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            etag = self.get_etag()
+            if etag is not None:
+                response['ETag'] = etag
+        return response
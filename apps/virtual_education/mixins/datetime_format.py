@@ -1,10 +1,84 @@
+import copy
+
+from drf_yasg import openapi
 from rest_framework import serializers
+from rest_framework.settings import ISO_8601
+
+
+DATETIME_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+
+def clone_field(field):
+    """
+    Cria uma nova instância de um campo com os mesmos argumentos.
+
+    Os argumentos são compartilhados com o original, como já faz o
+    `__deepcopy__` do DRF com os validadores; só campos com outros campos
+    aninhados (serializadores, listas, relações múltiplas) são copiados por
+    inteiro, para não vincular o mesmo campo filho a dois pais.
+    """
+    if isinstance(field, serializers.BaseSerializer) or any(
+        isinstance(value, serializers.Field) for value in field._kwargs.values()
+    ):
+        return copy.deepcopy(field)
+    return field.__class__(*field._args, **field._kwargs)
 
 
 class DateTimeFormatMixin:
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    """
+    Formata os campos de data e hora do serializador.
+
+    Os campos são construídos uma única vez por classe de serializador, a
+    partir dos campos declarados e do `Meta`, e copiados para cada instância
+    apenas quando usados. O formato é aplicado na cópia: `DATETIME_FORMAT`
+    por padrão ou ISO 8601 com o parâmetro `formato_data=iso`.
+    """
+
+    datetime_format = DATETIME_FORMAT
+    datetime_format_query_param = 'formato_data'
+    datetime_formats = {
+        'iso': ISO_8601,
+        'br': DATETIME_FORMAT,
+    }
+
+    datetime_format_parameter = openapi.Parameter(
+        name='formato_data',
+        in_=openapi.IN_QUERY,
+        description=(
+            'Formato das datas da resposta: "br" (dd/mm/aaaa hh:mm:ss, padrão) '
+            'ou "iso" (ISO 8601).'
+        ),
+        type=openapi.TYPE_STRING,
+        enum=list(datetime_formats)
+    )
+
+    def get_datetime_format(self):
+        """
+        Retorna o formato de data e hora solicitado na requisição.
+        """
+        request = self.context.get('request')
+        if request is not None:
+            requested = request.GET.get(self.datetime_format_query_param)
+            if requested in self.datetime_formats:
+                return self.datetime_formats[requested]
+        return self.datetime_format
+
+    def get_fields(self):
+        cls = type(self)
+        cached = cls.__dict__.get('_datetime_format_fields')
+        if cached is None:
+            fields = super().get_fields()
+            datetime_fields = tuple(
+                field_name for field_name, field in fields.items()
+                if isinstance(field, serializers.DateTimeField)
+            )
+            cached = cls._datetime_format_fields = (fields, datetime_fields)
 
-        for field_name, field in self.fields.items():
-            if isinstance(field, serializers.DateTimeField):
-                field.format = '%d/%m/%Y %H:%M:%S'
+        fields, datetime_fields = cached
+        fields = {
+            field_name: clone_field(field) for field_name, field in fields.items()
+        }
+        datetime_format = self.get_datetime_format()
+        for field_name in datetime_fields:
+            fields[field_name].format = datetime_format
+        return fields
@@ -0,0 +1,181 @@
+from django.utils import timezone
+from rest_framework import relations, serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+
+# Campos cuja representação é o próprio valor lido do banco.
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+)
+
+
+class ReadPlan:
+    """
+    Plano de leitura de uma listagem: as colunas buscadas com `.values()` e
+    o conversor de cada uma para a representação do serializador.
+
+    Cada coluna é uma tupla `(nome, lookup, conversor)`; conversor `None`
+    indica que o valor do banco já é a representação final.
+    """
+
+    def __init__(self, columns, extra_lookups=()):
+        self.columns = columns
+        self.lookups = list(dict.fromkeys(
+            [lookup for _, lookup, _ in columns] + list(extra_lookups)
+        ))
+
+    def render(self, rows):
+        """
+        Converte as linhas de `.values()` na lista de representações.
+        """
+        columns = self.columns
+        return [
+            {
+                name: (
+                    row[lookup]
+                    if convert is None or row[lookup] is None
+                    else convert(row[lookup])
+                )
+                for name, lookup, convert in columns
+            }
+            for row in rows
+        ]
+
+    @classmethod
+    def for_serializer(cls, serializer, extra_lookups=()):
+        """
+        Compila o plano a partir dos campos de leitura do serializador.
+
+        Serializadores com representação própria declaram `read_lookups`
+        (`{nome: lookup}`), cujos valores são usados sem conversão. Retorna
+        `None` se algum campo não puder ser lido com `.values()`.
+        """
+        read_lookups = getattr(serializer, 'read_lookups', None)
+        if read_lookups is not None:
+            return cls(
+                [(name, lookup, None) for name, lookup in read_lookups.items()],
+                extra_lookups
+            )
+
+        columns = []
+        for field in serializer._readable_fields:
+            if field.source == '*':
+                return None
+            convert = compile_converter(field, serializer)
+            if convert is False:
+                return None
+            columns.append((field.field_name, '__'.join(field.source_attrs), convert))
+        return cls(columns, extra_lookups)
+
+
+def compile_converter(field, serializer):
+    """
+    Retorna o conversor de um campo, `None` se o valor não precisa de
+    conversão ou `False` se o campo não é suportado.
+    """
+    if isinstance(field, (serializers.BaseSerializer, relations.ManyRelatedField)):
+        return False
+
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        # `.values()` traz a chave primária do objeto relacionado.
+        return field.pk_field.to_representation if field.pk_field else None
+    if isinstance(field, relations.RelatedField):
+        return False
+
+    if isinstance(field, serializers.FileField):
+        return compile_file_converter(field, serializer)
+
+    if isinstance(field, serializers.DateTimeField):
+        return compile_datetime_converter(field)
+
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+
+    if isinstance(field, serializers.ChoiceField) and all(
+        isinstance(key, str) for key in field.choice_strings_to_values
+    ):
+        return None
+
+    if isinstance(field, IDENTITY_FIELDS):
+        return None
+
+    return field.to_representation
+
+
+def compile_datetime_converter(field):
+    # Reproduz DateTimeField.to_representation, com o fuso horário e o
+    # formato resolvidos uma única vez.
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = (
+        field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    )
+    if output_format is None or field_timezone is None:
+        return field.to_representation
+    iso_8601 = output_format.lower() == ISO_8601
+
+    def convert(value):
+        if not value or isinstance(value, str) or not timezone.is_aware(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone)
+        if iso_8601:
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return value.strftime(output_format)
+
+    return convert
+
+
+def compile_file_converter(field, serializer):
+    # Reproduz FileField.to_representation a partir do nome do arquivo.
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return lambda name: name or None
+
+    model = serializer.Meta.model
+    storage = model._meta.get_field(field.source).storage
+    request = serializer.context.get('request')
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return convert
+
+
+class FastListMixin:
+    """
+    Listagem sem instanciar modelos: as linhas são lidas com `.values()` e
+    convertidas por um `ReadPlan` compilado a partir do serializador, com a
+    mesma representação da listagem padrão.
+
+    `get_read_plan` pode retornar `None` para usar a listagem padrão.
+    """
+
+    fast_list = True
+
+    def get_read_plan(self):
+        if not self.fast_list:
+            return None
+
+        ordering = getattr(self, 'cursor_ordering', None) or ()
+        return ReadPlan.for_serializer(
+            self.get_serializer(),
+            extra_lookups=[field.lstrip('-') for field in ordering]
+        )
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = self.filter_queryset(self.get_queryset()).values(*plan.lookups)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+
+        return Response(plan.render(rows))
@@ -0,0 +1,184 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from apps.cache import (
+    get_cache_stats, get_model_version, get_object_versions, record_cache_access
+)
+
+
+class ResponseCacheMixin:
+    """
+    Guarda em cache as respostas da listagem e do detalhe.
+
+    A chave reúne a versão dos dados do modelo (`apps.cache`), a ação, o
+    objeto, o modo da listagem rápida e os parâmetros de filtro, paginação
+    e formatação normalizados;
+    qualquer escrita no modelo invalida todas as respostas de uma vez. Os
+    dados são guardados antes da renderização, de modo que a negociação do
+    formato continua valendo.
+
+    Views cuja representação inclui outros modelos os declaram em
+    `cache_models` (ou em `get_cache_models`, conforme a requisição) e as
+    datas de alteração correspondentes em `last_modified_lookups`. Modelos
+    alterados com frequência, cujas linhas têm a mesma chave primária dos
+    objetos da resposta, são declarados em `cache_object_models`: a
+    resposta guarda a versão de cada um dos seus objetos (`apps.cache`) e
+    deixa de valer apenas quando um deles muda.
+
+    As respostas trazem ETag e Last-Modified (derivado de `date_updated`) e
+    atendem a requisições condicionais com 304. O cabeçalho `X-Cache` e as
+    estatísticas do cache (ação `cache-stats`) indicam acertos e faltas.
+    """
+
+    cache_query_params = ('pagina', 'tamanho', 'paginacao', 'formato_data', 'format')
+    cache_models = ()
+    cache_object_models = ()
+    last_modified_lookups = ('date_updated',)
+
+    @property
+    def cache_name(self):
+        return f'response:{self.queryset.model._meta.label_lower}'
+
+    def get_cache_key(self, request):
+        """
+        Monta a chave da resposta a partir dos parâmetros que a afetam.
+        """
+        accepted = set(self.cache_query_params)
+        if getattr(self, 'filterset_class', None) is not None:
+            accepted.update(self.filterset_class.base_filters)
+
+        params = sorted(
+            (key, value.strip())
+            for key, values in request.query_params.lists()
+            if key in accepted
+            for value in values
+            if value.strip()
+        )
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        # A listagem rápida (`FastListMixin`) e a do serializador são
+        # guardadas separadamente.
+        fast_list = getattr(self, 'fast_list', None)
+        digest = hashlib.md5(
+            json.dumps([self.action, lookup, params, fast_list]).encode()
+        ).hexdigest()
+
+        version = '.'.join(
+            str(get_model_version(model)) for model in self.get_cache_models()
+        )
+        return f'{self.cache_name}:{version}:{digest}'
+
+    def get_cache_models(self):
+        """
+        Retorna os modelos cujas versões compõem a chave da resposta.
+        """
+        return (self.queryset.model, *self.cache_models)
+
+    def get_object_versions(self, data):
+        """
+        Retorna as versões atuais, por modelo de `cache_object_models`, dos
+        objetos representados em `data`.
+        """
+        if not self.cache_object_models:
+            return {}
+
+        pk_name = self.queryset.model._meta.pk.name
+        if self.action == 'retrieve':
+            items = [data]
+        else:
+            items = data['results'] if isinstance(data, dict) else data
+        pks = [str(item[pk_name]) for item in items]
+        return {
+            model._meta.label_lower: get_object_versions(model, pks)
+            for model in self.cache_object_models
+        }
+
+    def is_current(self, entry):
+        """
+        Indica se os objetos de `cache_object_models` da resposta guardada
+        não mudaram desde que ela foi gerada.
+        """
+        for model in self.cache_object_models:
+            versions = entry['object_versions'][model._meta.label_lower]
+            if get_object_versions(model, versions) != versions:
+                return False
+        return True
+
+    def get_last_modified(self):
+        """
+        Retorna a última alteração dos objetos da resposta.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup]})
+        dates = queryset.aggregate(*[
+            Max(lookup) for lookup in self.last_modified_lookups
+        ]).values()
+        return max((date for date in dates if date is not None), default=None)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+        hit = entry is not None and self.is_current(entry)
+        record_cache_access(self.cache_name, hit=hit)
+
+        if not hit:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            last_modified = self.get_last_modified()
+            entry = {
+                'data': response.data,
+                'etag': '"{}"'.format(
+                    hashlib.md5(f'{key}:{last_modified}'.encode()).hexdigest()
+                ),
+                'last_modified': last_modified and int(last_modified.timestamp()),
+                'object_versions': self.get_object_versions(response.data),
+            }
+            cache.set(key, entry, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        else:
+            response = Response(entry['data'])
+
+        # Exclusões não alteram o `date_updated` dos cursos restantes: nas
+        # listagens, apenas o ETag decide se a resposta mudou.
+        response = get_conditional_response(
+            request._request,
+            etag=entry['etag'],
+            last_modified=entry['last_modified'] if self.action == 'retrieve' else None,
+            response=response
+        )
+        response['ETag'] = entry['etag']
+        if entry['last_modified'] is not None:
+            response['Last-Modified'] = http_date(entry['last_modified'])
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Retorna os acertos, as faltas e a taxa de acertos do cache de "
+            "respostas."
+        ),
+    )
+    @action(
+        detail=False, methods=['get'], url_path='cache-stats',
+        pagination_class=None, filter_backends=[]
+    )
+    def cache_stats(self, request, *args, **kwargs):
+        return Response(get_cache_stats(self.cache_name))
@@ -3,6 +3,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from drf_yasg.utils import swagger_auto_schema
 
+from apps.utils import normalize_search_key
+
 
 class User(AbstractUser):
     """
@@ -17,16 +19,75 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
-    @swagger_auto_schema(auto_schema=None)
-    def save(self, *args, **kwargs):
+    def normalize(self):
+        """
+        Deriva o nome de usuário do email e o primeiro nome do apelido.
+        """
         if self.email:
             self.username = self.email
 
         if self.nickname:
             self.first_name = self.nickname
+
+    @swagger_auto_schema(auto_schema=None)
+    def save(self, *args, **kwargs):
+        self.normalize()
         return super().save(*args, **kwargs)
 
 
+class CodedChoiceField(models.Field):
+    """
+    Campo de opções gravado como um código inteiro pequeno.
+
+    Em Python e na API o valor é o nome da opção; `codes` mapeia cada nome
+    para o código gravado no banco, inclusive em filtros, índices e
+    restrições (`status='Andamento'` consulta `status = 1`).
+    """
+
+    def __init__(self, *args, codes=None, **kwargs):
+        self.codes = dict(codes or {})
+        self.names = {code: name for name, code in self.codes.items()}
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['codes'] = self.codes
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        # Mesma coluna de um PositiveSmallIntegerField.
+        return 'PositiveSmallIntegerField'
+
+    def from_db_value(self, value, expression, connection):
+        return self.names.get(value, value)
+
+    def to_python(self, value):
+        return self.names.get(value, value)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return self.codes[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"O campo '{self.name}' não aceita o valor {value!r}.")
+
+
+@CodedChoiceField.register_lookup
+class CodedChoiceIExact(models.lookups.Exact):
+    """
+    `iexact` pelo nome da opção, resolvido para o código em Python.
+    """
+    lookup_name = 'iexact'
+
+    def get_prep_lookup(self):
+        names = {name.lower(): name for name in self.lhs.output_field.codes}
+        # Um nome desconhecido vira um código inexistente: nenhuma linha.
+        self.rhs = names.get(str(self.rhs).lower(), -1)
+        return super().get_prep_lookup()
+
+
 class Profile(models.Model):
     """
     Perfil de usuário.
@@ -38,15 +99,69 @@ class Profile(models.Model):
         abstract = True
 
 
+class StudentQuerySet(models.QuerySet):
+    def read_model(self):
+        """
+        Carrega apenas os dados da representação do aluno: o id e o apelido,
+        o telefone e o email do usuário, anotados na própria consulta.
+        """
+        return self.only('id').annotate(
+            nickname=models.F('user__nickname'),
+            phone=models.F('user__phone'),
+            email=models.F('user__email'),
+        )
+
+
 class Student(Profile):
     """
     Aluno.
     """
     avatar = models.ImageField(upload_to='media/student_avatars/', null=True)
+    # Apelido e email do usuário normalizados (sem acentos, em minúsculas),
+    # indexados para a busca de alunos sem junção com o usuário.
+    nickname_key = models.CharField(max_length=50, default='', editable=False)
+    email_key = models.CharField(max_length=254, default='', editable=False)
+    # Matrícula em andamento do aluno, mantida pelo EnrollmentService nas
+    # transições de matrícula (ver o comando repair_active_enrollments).
+    active_enrollment = models.OneToOneField(
+        'Enrollment', on_delete=models.SET_NULL, null=True, editable=False,
+        related_name='+'
+    )
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    objects = StudentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Paginação por cursor da listagem de alunos.
+            models.Index(fields=['date_created', 'id'], name='student_date_created_idx'),
+            # Busca por prefixo (autocomplete) nos bancos sem trigramas.
+            models.Index(fields=['nickname_key'], name='student_nickname_key_idx'),
+            models.Index(fields=['email_key'], name='student_email_key_idx'),
+        ]
 
     def __str__(self):
         return self.user.email
 
+    def normalize(self):
+        """
+        Deriva as chaves de busca do apelido e do email do usuário.
+        """
+        self.nickname_key = normalize_search_key(self.user.nickname)
+        self.email_key = normalize_search_key(self.user.email)
+
+    @swagger_auto_schema(auto_schema=None)
+    def save(self, *args, **kwargs):
+        self.normalize()
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # A matrícula em andamento é gravada apenas pelas transições de
+            # matrícula; salvar o aluno não sobrescreve um valor mais recente.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'active_enrollment'
+            ]
+        return super().save(*args, **kwargs)
+
 
 class Owner(Profile):
     """
@@ -73,10 +188,54 @@ class Course(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Paginação por cursor da listagem de cursos.
+            models.Index(fields=['date_created', 'id'], name='course_date_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
 
+class CourseStats(models.Model):
+    """
+    Totais das matrículas de um curso por status e média das notas.
+
+    Mantidos a cada transição pelo `CourseStatsService` e reconstruídos
+    periodicamente pela tarefa `reconcile_course_stats`.
+    """
+    # Coluna de cada status das matrículas.
+    STATUS_FIELDS = {
+        'Andamento': 'in_progress',
+        'Aprovado': 'approved',
+        'Reprovado': 'failed',
+        'Desistiu': 'dropped',
+    }
+
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    in_progress = models.IntegerField(default=0)
+    approved = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    dropped = models.IntegerField(default=0)
+    score_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    score_count = models.IntegerField(default=0)
+    mean_score = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Ordenação da listagem de cursos pelos totais.
+            models.Index(fields=['in_progress'], name='course_stats_in_progress_idx'),
+            models.Index(fields=['mean_score'], name='course_stats_mean_score_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.course_id)
+
+
 class Enrollment(models.Model):
     """
     Matrícula de um aluno em um curso.
@@ -87,15 +246,85 @@ class Enrollment(models.Model):
         ('Andamento', 'Andamento'),
         ('Desistiu', 'Desistiu'),
     )
+    # Código gravado de cada status (ver CodedChoiceField).
+    STATUS_CODES = {
+        'Andamento': 1,
+        'Aprovado': 2,
+        'Reprovado': 3,
+        'Desistiu': 4,
+    }
 
     id = models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True)
     student = models.ForeignKey(Student, on_delete=models.DO_NOTHING)
     course = models.ForeignKey(Course, on_delete=models.DO_NOTHING)
     date_enroll = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
     date_close = models.DateTimeField()
     score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Andamento')
+    status = CodedChoiceField(
+        choices=STATUS_CHOICES, codes=STATUS_CODES, default='Andamento'
+    )
     justification = models.TextField(null=True, blank=True)
+    # Momento em que o aluno foi avisado da proximidade do término; evita
+    # avisos repetidos quando a tarefa de notificação é reexecutada.
+    date_expiry_notified = models.DateTimeField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Verificações de matrícula por aluno e por curso nos serviços.
+            models.Index(
+                fields=['student', 'status'],
+                name='enrollment_student_status_idx'
+            ),
+            models.Index(
+                fields=['course', 'status'],
+                name='enrollment_course_status_idx'
+            ),
+            # Busca de matrículas em andamento próximas do vencimento.
+            models.Index(
+                fields=['date_close'],
+                condition=models.Q(status='Andamento'),
+                name='enrollment_active_close_idx'
+            ),
+            # Paginação por cursor da listagem de matrículas.
+            models.Index(
+                fields=['date_enroll', 'id'],
+                name='enrollment_date_enroll_idx'
+            ),
+        ]
+        constraints = [
+            # Um aluno não pode ter mais de uma matrícula em andamento.
+            models.UniqueConstraint(
+                fields=['student'],
+                condition=models.Q(status='Andamento'),
+                name='unique_active_enrollment_per_student'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} - {self.course.name}"
+
+
+class Notification(models.Model):
+    """
+    Notificação na caixa de saída, aguardando entrega.
+    """
+    id = models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True)
+    recipient = models.EmailField()
+    message = models.TextField()
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_sent = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            # Fila de entrega: apenas as notificações pendentes, agrupadas
+            # por destinatário.
+            models.Index(
+                fields=['recipient', 'date_created'],
+                condition=models.Q(date_sent__isnull=True),
+                name='notification_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.message}'
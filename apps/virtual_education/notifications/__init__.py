@@ -0,0 +1,15 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+Message = namedtuple('Message', ['recipient', 'subject', 'body'])
+
+
+def get_backend(backend=None, **kwargs):
+    """
+    Instancia o backend de entrega de notificações configurado em
+    `NOTIFICATION_BACKEND`.
+    """
+    return import_string(backend or settings.NOTIFICATION_BACKEND)(**kwargs)
@@ -0,0 +1,81 @@
+import sys
+import threading
+
+from django.conf import settings
+from django.core import mail
+
+
+class BaseBackend:
+    """
+    Interface dos backends de entrega de notificações.
+    """
+
+    def send_messages(self, messages):
+        """
+        Entrega uma lista de `Message`. Deve levantar uma exceção se a
+        entrega falhar, para que a tarefa seja repetida.
+        """
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+    """
+    Escreve as notificações na saída padrão.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send_messages(self, messages):
+        for message in messages:
+            self.stream.write(
+                f'Para: {message.recipient}\n'
+                f'Assunto: {message.subject}\n\n'
+                f'{message.body}\n'
+                f'{"-" * 79}\n'
+            )
+        self.stream.flush()
+
+
+class FileBackend(ConsoleBackend):
+    """
+    Acrescenta as notificações ao arquivo `NOTIFICATION_FILE_PATH`.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = path or settings.NOTIFICATION_FILE_PATH
+
+    def send_messages(self, messages):
+        with self._lock, open(self.path, 'a', encoding='utf-8') as stream:
+            self.stream = stream
+            super().send_messages(messages)
+
+
+class EmailBackend(BaseBackend):
+    """
+    Envia as notificações por email, pelo `EMAIL_BACKEND` do Django.
+    """
+
+    def send_messages(self, messages):
+        with mail.get_connection(fail_silently=False) as connection:
+            connection.send_messages([
+                mail.EmailMessage(
+                    subject=message.subject,
+                    body=message.body,
+                    to=[message.recipient]
+                )
+                for message in messages
+            ])
+
+
+class MemoryBackend(BaseBackend):
+    """
+    Guarda as notificações em `MemoryBackend.outbox`. Usado nos testes.
+    """
+
+    outbox = []
+
+    def send_messages(self, messages):
+        MemoryBackend.outbox.extend(messages)
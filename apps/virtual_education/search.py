@@ -0,0 +1,133 @@
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from apps.utils import normalize_search_key
+from apps.virtual_education.models import Course
+
+
+# Configuração de busca do PostgreSQL: português, sem acentos.
+SEARCH_CONFIG = 'portuguese_unaccent'
+
+# Tabela FTS5 do SQLite, mantida por gatilhos sobre a tabela de cursos, e a
+# correspondência estável entre as suas linhas e os cursos (migração
+# 0014_course_search_stable_rowid).
+COURSE_FTS_TABLE = 'virtual_education_course_fts'
+COURSE_FTS_MAP_TABLE = 'virtual_education_course_fts_map'
+
+# Chaves de busca normalizadas dos alunos (ver Student.normalize).
+STUDENT_SEARCH_KEYS = ('nickname_key', 'email_key')
+
+
+def course_search_vector():
+    """
+    Vetor de busca dos cursos no PostgreSQL: o nome pesa mais que a descrição.
+
+    A mesma expressão é indexada (GIN) pela migração 0006_course_search.
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def search_courses(queryset, terms):
+    """
+    Filtra os cursos pelos termos buscados no nome e na descrição, ordenando
+    pela relevância (`search_rank`).
+
+    A busca ignora acentos e maiúsculas e usa o índice textual do banco;
+    em bancos sem índice textual, recorre a `icontains`.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, terms)
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(queryset, terms, connection)
+    return queryset.filter(Q(name__icontains=terms) | Q(description__icontains=terms))
+
+
+def _search_postgresql(queryset, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    vector = course_search_vector()
+    query = SearchQuery(terms, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.annotate(
+        search=vector, search_rank=SearchRank(vector, query)
+    ).filter(search=query).order_by('-search_rank')
+
+
+def _search_sqlite(queryset, terms, connection):
+    # Cada palavra vira um prefixo entre aspas, o que evita interpretar a
+    # entrada do usuário como sintaxe do FTS5.
+    words = re.findall(r'\w+', terms)
+    if not words:
+        return queryset.none()
+    match = ' '.join(f'"{word}"*' for word in words)
+
+    table = connection.ops.quote_name(Course._meta.db_table)
+    fts = connection.ops.quote_name(COURSE_FTS_TABLE)
+    fts_map = connection.ops.quote_name(COURSE_FTS_MAP_TABLE)
+    return queryset.extra(
+        tables=[COURSE_FTS_TABLE, COURSE_FTS_MAP_TABLE],
+        where=[
+            f'{fts} MATCH %s',
+            f'{fts_map}.id = {fts}.rowid',
+            f'{fts_map}.course_id = {table}.id',
+        ],
+        params=[match]
+    ).annotate(
+        # bm25 é negativo e menor para os mais relevantes; o nome pesa mais.
+        search_rank=RawSQL(f'-bm25({fts}, 10.0, 1.0)', [], output_field=FloatField())
+    ).order_by('-search_rank')
+
+
+def prefix_range(field, prefix):
+    """
+    Condição de prefixo como intervalo [prefix, próximo prefixo), que
+    percorre apenas o trecho correspondente de um índice B-tree.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
+def search_students(queryset, terms, limit):
+    """
+    Retorna os `limit` alunos mais relevantes cujo apelido ou email
+    corresponde aos termos, para o autocomplete.
+
+    No PostgreSQL a busca é por trecho, atendida pelos índices de trigramas
+    e ordenada pela similaridade; nos demais bancos, por prefixo, atendida
+    pelos índices B-tree. Cada chave é consultada separadamente, já ordenada
+    pelo seu índice, e os resultados são combinados: nenhuma consulta ordena
+    todos os candidatos.
+    """
+    key = normalize_search_key(terms)
+    if not key:
+        return []
+
+    postgresql = connections[queryset.db].vendor == 'postgresql'
+    matches = {}
+    for field in STUDENT_SEARCH_KEYS:
+        if postgresql:
+            from django.contrib.postgres.search import TrigramDistance
+
+            candidates = queryset.filter(**{f'{field}__contains': key}).annotate(
+                search_rank=TrigramDistance(field, key)
+            )
+        else:
+            candidates = queryset.filter(prefix_range(field, key)).annotate(
+                search_rank=F(field)
+            )
+        candidates = candidates.order_by('search_rank')
+
+        for student in candidates[:limit]:
+            current = matches.get(student.pk)
+            if current is None or student.search_rank < current.search_rank:
+                matches[student.pk] = student
+
+    return sorted(matches.values(), key=lambda student: student.search_rank)[:limit]
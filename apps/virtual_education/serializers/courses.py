@@ -1,12 +1,30 @@
 from rest_framework import serializers
 from apps.virtual_education.mixins.datetime_format import DateTimeFormatMixin
-from apps.virtual_education.models import Course
+from apps.virtual_education.models import Course, CourseStats
+
+
+class CourseStatsSerializer(DateTimeFormatMixin, serializers.ModelSerializer):
+    """
+    Serializador para os totais de matrículas de um curso.
+    """
+    class Meta:
+        model = CourseStats
+        exclude = ('score_sum',)
 
 
 class CourseSerializer(DateTimeFormatMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo de Curso.
     """
+    # Totais de matrículas do curso (CourseStats).
+    students_in_progress = serializers.IntegerField(source='stats.in_progress', read_only=True)
+    students_approved = serializers.IntegerField(source='stats.approved', read_only=True)
+    students_failed = serializers.IntegerField(source='stats.failed', read_only=True)
+    students_dropped = serializers.IntegerField(source='stats.dropped', read_only=True)
+    mean_score = serializers.DecimalField(
+        source='stats.mean_score', max_digits=5, decimal_places=2, read_only=True
+    )
+
     class Meta:
         model = Course
         fields = '__all__'
@@ -1,14 +1,79 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from apps.virtual_education.mixins.datetime_format import DateTimeFormatMixin
-from apps.virtual_education.models import Enrollment
+from apps.virtual_education.models import Enrollment, Student
+from apps.virtual_education.serializers.courses import CourseSerializer
+from apps.virtual_education.serializers.fields import PrefetchedPrimaryKeyRelatedField
+from apps.virtual_education.serializers.students import StudentSerializer
+from apps.virtual_education.services.enrollments import MAX_SCORE, MIN_SCORE
 
 
 class EnrollmentSerializer(DateTimeFormatMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo de Matrícula.
+
+    Os campos de `expandable_fields` informados no contexto (`expand`) são
+    representados por completo em vez de apenas pelo identificador.
     """
 
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
+    # campo: (serializador aninhado, relacionamentos carregados na consulta)
+    expandable_fields = {
+        'student': (
+            StudentSerializer,
+            (Prefetch('student', queryset=Student.objects.read_model()),)
+        ),
+        'course': (CourseSerializer, ('course__stats',)),
+    }
+
     class Meta:
         model = Enrollment
-        fields = '__all__'
+        exclude = ('date_expiry_notified',)
         read_only_fields = ('status',)
+        extra_kwargs = {
+            'score': {'min_value': MIN_SCORE, 'max_value': MAX_SCORE},
+        }
+
+    @classmethod
+    def get_related_lookups(cls, expand):
+        """
+        Retorna os relacionamentos a carregar para os campos expandidos:
+        nomes para `select_related` e objetos `Prefetch` para
+        `prefetch_related`.
+        """
+        lookups = []
+        for field_name in expand:
+            lookups.extend(cls.expandable_fields[field_name][1])
+        return lookups
+
+    @property
+    def expanded_serializers(self):
+        """
+        Serializadores aninhados dos campos expandidos, criados uma única vez.
+        """
+        if not hasattr(self, '_expanded_serializers'):
+            self._expanded_serializers = {
+                field_name: self.expandable_fields[field_name][0](context=self.context)
+                for field_name in self.context.get('expand', ())
+            }
+        return self._expanded_serializers
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field_name, serializer in self.expanded_serializers.items():
+            data[field_name] = serializer.to_representation(
+                getattr(instance, field_name)
+            )
+        return data
+
+
+class EnrollmentGradeSerializer(serializers.Serializer):
+    """
+    Serializador de uma linha da planilha de notas de um curso.
+    """
+
+    student = serializers.UUIDField()
+    score = serializers.DecimalField(
+        max_digits=5, decimal_places=2, min_value=MIN_SCORE, max_value=MAX_SCORE
+    )
@@ -0,0 +1,30 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Campo de chave primária que resolve o objeto relacionado a partir de um
+    mapa pré-carregado no contexto (`prefetched[field_name]`), evitando uma
+    consulta por item ao validar listas grandes.
+
+    Sem o mapa no contexto, comporta-se como `PrimaryKeyRelatedField`.
+    """
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get('prefetched', {}).get(self.field_name)
+        if prefetched is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        try:
+            return prefetched[pk]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
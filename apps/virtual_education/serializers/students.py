@@ -12,9 +12,17 @@ class StudentSerializer(DateTimeFormatMixin, serializers.ModelSerializer):
     email = serializers.EmailField()
     phone = serializers.CharField(max_length=20)
 
+    # Colunas da representação, lidas diretamente nas listagens.
+    read_lookups = {
+        'id': 'id',
+        'nickname': 'user__nickname',
+        'phone': 'user__phone',
+        'email': 'user__email',
+    }
+
     class Meta:
         model = Student
-        exclude = ('user',)
+        exclude = ('user', 'active_enrollment', 'date_created')
 
     def get_user_data(self, validated_data):
         """
@@ -45,12 +53,16 @@ class StudentSerializer(DateTimeFormatMixin, serializers.ModelSerializer):
     def to_representation(self, instance):
         """
         Converte a instância em uma representação serializável.
+
+        Usa os dados anotados por `Student.objects.read_model()`, quando
+        presentes, sem carregar o usuário.
         """
+        source = instance if 'email' in instance.__dict__ else instance.user
         return {
             'id': instance.id,
-            'nickname': instance.user.nickname,
-            'phone': instance.user.phone,
-            'email': instance.user.email
+            'nickname': source.nickname,
+            'phone': source.phone,
+            'email': source.email
         }
 
     def create(self, validated_data):
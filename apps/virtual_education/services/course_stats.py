@@ -0,0 +1,129 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, FloatField, Q, Sum, When
+from django.db.models.functions import Cast
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from apps.cache import invalidate_model, invalidate_objects, invalidate_on_commit
+from apps.virtual_education.models import Course, CourseStats, Enrollment
+
+
+class CourseStatsService:
+    @staticmethod
+    def get_state(enrollment):
+        """
+        Retorna o que a matrícula soma aos totais: curso, status e nota.
+        """
+        score = Enrollment._meta.get_field('score').to_python(enrollment.score)
+        return (enrollment.course_id, enrollment.status, score)
+
+    @staticmethod
+    def record(changes):
+        """
+        Aplica aos totais dos cursos as mudanças de matrículas.
+
+        `changes` são pares `(estado anterior, estado novo)` de
+        `get_state`, com `None` para a matrícula que não existia. As
+        diferenças são somadas por curso e gravadas com um único UPDATE por
+        curso (`F()`), sem ler os totais nem as matrículas. Deve ser chamado
+        na mesma transação da escrita das matrículas.
+        """
+        deltas = defaultdict(Counter)
+        for before, after in changes:
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None:
+                    continue
+                course_id, status, score = state
+                delta = deltas[course_id]
+                delta[CourseStats.STATUS_FIELDS[status]] += sign
+                if score is not None:
+                    delta['score_sum'] += sign * score
+                    delta['score_count'] += sign
+
+        changed = []
+        for course_id, delta in deltas.items():
+            delta = {field: value for field, value in delta.items() if value}
+            if delta:
+                CourseStatsService._apply(course_id, delta)
+                changed.append(course_id)
+
+        if changed:
+            invalidate_on_commit(invalidate_objects, CourseStats, changed)
+            invalidate_on_commit(invalidate_model, CourseStats)
+
+    @staticmethod
+    def _apply(course_id, delta):
+        values = {field: F(field) + value for field, value in delta.items()}
+        if 'score_count' in delta or 'score_sum' in delta:
+            # Os valores à direita são os anteriores à atualização.
+            count = F('score_count') + delta.get('score_count', 0)
+            total = Cast(F('score_sum') + delta.get('score_sum', 0), FloatField())
+            values['mean_score'] = Case(
+                When(GreaterThan(count, 0), then=total / count), default=None
+            )
+        values['date_updated'] = timezone.now()
+
+        stats = CourseStats.objects.filter(course_id=course_id)
+        if not stats.update(**values):
+            # Curso sem totais (criado em lote): cria a linha e aplica.
+            CourseStats.objects.bulk_create(
+                [CourseStats(course_id=course_id)], ignore_conflicts=True
+            )
+            stats.update(**values)
+
+    @staticmethod
+    def rebuild(course_ids):
+        """
+        Recalcula a partir das matrículas os totais de um lote de cursos.
+
+        Os totais do lote são bloqueados antes da agregação: transições
+        concorrentes ou já estão nas matrículas lidas ou são aplicadas
+        depois da reconstrução. Retorna a quantidade de cursos.
+        """
+        with transaction.atomic():
+            course_ids = list(
+                Course.objects.filter(pk__in=course_ids).values_list('pk', flat=True)
+            )
+            list(
+                CourseStats.objects.filter(course_id__in=course_ids)
+                .select_for_update()
+                .values_list('pk', flat=True)
+            )
+
+            stats = {course_id: CourseStats(course_id=course_id) for course_id in course_ids}
+            totals = (
+                Enrollment.objects.filter(course_id__in=course_ids)
+                .order_by()
+                .values('course_id')
+                .annotate(
+                    **{
+                        field: Count('pk', filter=Q(status=status))
+                        for status, field in CourseStats.STATUS_FIELDS.items()
+                    },
+                    score_sum=Sum('score'),
+                    score_count=Count('score'),
+                    mean_score=Avg('score'),
+                )
+            )
+            for row in totals:
+                course_stats = stats[row.pop('course_id')]
+                for field, value in row.items():
+                    setattr(course_stats, field, value)
+                course_stats.score_sum = course_stats.score_sum or 0
+
+            fields = [
+                *CourseStats.STATUS_FIELDS.values(),
+                'score_sum', 'score_count', 'mean_score', 'date_updated',
+            ]
+            CourseStats.objects.bulk_create(
+                stats.values(),
+                update_conflicts=True,
+                unique_fields=['course'],
+                update_fields=fields,
+            )
+
+        invalidate_on_commit(invalidate_objects, CourseStats, list(stats))
+        invalidate_on_commit(invalidate_model, CourseStats)
+        return len(stats)
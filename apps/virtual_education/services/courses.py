@@ -1,13 +1,12 @@
 from apps.virtual_education.models import Enrollment
+from apps.virtual_education.services.enrollments import EnrollmentService
 
 
 class CourseService:
     @staticmethod
     def notify_expiring_enrollments(course, days_remaining):
         # Notifica os alunos matriculados no curso sobre a expiração
-        enrolled_students = Enrollment.objects.filter(course=course, date_close__isnull=True)
-        for enrollment in enrolled_students:
-            print(f'O curso {course.name} expirará em {days_remaining} dias. Matrícula: {enrollment.pk}')
+        EnrollmentService.expire_course(course, days_remaining)
 
     @staticmethod
     def notify_course_owner(course, started_enrolls=[], finished_enrolls=[]):
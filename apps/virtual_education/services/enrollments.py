@@ -1,27 +1,181 @@
-from datetime import datetime
-from apps.virtual_education.models import Enrollment
+from collections import Counter
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from apps.cache import invalidate_model
+from apps.utils import chunked
+from apps.virtual_education.models import Course, Enrollment, Student
+from apps.virtual_education.services.course_stats import CourseStatsService
+from apps.virtual_education.services.notifications import NotificationService
+
+
+ACTIVE_ENROLLMENT_ERROR = 'O aluno já está matriculado em um curso.'
+NO_ACTIVE_ENROLLMENT_ERROR = 'O aluno não possui matrícula em andamento no curso.'
+INVALID_TRANSITION_ERROR = 'Não é possível alterar o status da matrícula de {} para {}.'
+
+# Notas vão de MIN_SCORE a MAX_SCORE; o aluno só é aprovado com nota maior
+# ou igual a PASSING_SCORE.
+MIN_SCORE = 0
+MAX_SCORE = 10
+PASSING_SCORE = 6
+
+# Transições de status permitidas: apenas matrículas em andamento são
+# concluídas (Aprovado/Reprovado) ou canceladas (Desistiu).
+STATUS_TRANSITIONS = {
+    'Andamento': {'Aprovado', 'Reprovado', 'Desistiu'},
+}
+
+
+class ActiveEnrollmentError(Exception):
+    """
+    O aluno já possui uma matrícula em andamento.
+    """
 
 
 class EnrollmentService:
+    BULK_CHUNK_SIZE = 1000
+
+    @staticmethod
+    def enroll_student(serializer):
+        # O aluno carregado na validação informa a matrícula em andamento,
+        # sem consultar as matrículas. A restrição
+        # unique_active_enrollment_per_student impede que o aluno tenha duas
+        # matrículas em andamento, inclusive sob requisições concorrentes.
+        if serializer.validated_data['student'].active_enrollment_id:
+            raise ActiveEnrollmentError(ACTIVE_ENROLLMENT_ERROR)
+
+        try:
+            with transaction.atomic():
+                enrollment = serializer.save()
+                EnrollmentService.update_active_enrollment(enrollment, None, False)
+                CourseStatsService.record(
+                    [(None, CourseStatsService.get_state(enrollment))]
+                )
+                return enrollment
+        except IntegrityError:
+            raise ActiveEnrollmentError(ACTIVE_ENROLLMENT_ERROR)
+
+    @staticmethod
+    def bulk_enroll_students(serializer, items):
+        """
+        Matricula alunos em lote a partir de um serializador `many=True`.
+
+        Os itens são processados em lotes de `BULK_CHUNK_SIZE`: alunos e
+        cursos referenciados são carregados de uma vez, as matrículas em
+        andamento são verificadas pelos próprios alunos e as válidas são
+        inseridas com `bulk_create`. Retorna o resultado de cada item, na
+        ordem recebida.
+        """
+        results = []
+        for chunk in chunked(items, EnrollmentService.BULK_CHUNK_SIZE):
+            results.extend(
+                EnrollmentService._bulk_enroll_chunk(serializer, chunk, len(results))
+            )
+
+        invalidate_model(Enrollment)
+        return results
+
     @staticmethod
-    def enroll_student(validated_data):
-        # Verifica se o aluno já está matriculado em algum curso
-        student = validated_data['student']
+    def _bulk_enroll_chunk(serializer, chunk, offset):
+        serializer.context['prefetched'] = {
+            'student': Student.objects.in_bulk(
+                EnrollmentService._get_referenced_pks(chunk, 'student', Student)
+            ),
+            'course': Course.objects.in_bulk(
+                EnrollmentService._get_referenced_pks(chunk, 'course', Course)
+            ),
+        }
+
+        results = [{'index': offset + index} for index in range(len(chunk))]
+        validated = []
+        for index, item in enumerate(chunk):
+            try:
+                validated.append((index, serializer.child.run_validation(item)))
+            except ValidationError as exc:
+                results[index].update(created=False, errors=exc.detail)
+
+        active_students = {
+            data['student'].pk for _, data in validated
+            if data['student'].active_enrollment_id
+        }
+
+        enrollments = []
+        for index, data in validated:
+            if data['student'].pk in active_students:
+                results[index].update(
+                    created=False, errors={'student': [ACTIVE_ENROLLMENT_ERROR]}
+                )
+                continue
+            active_students.add(data['student'].pk)
+            enrollments.append((index, Enrollment(**data)))
+
+        try:
+            with transaction.atomic():
+                Enrollment.objects.bulk_create(
+                    [enrollment for _, enrollment in enrollments]
+                )
+                for _, enrollment in enrollments:
+                    enrollment.student.active_enrollment = enrollment
+                Student.objects.bulk_update(
+                    [enrollment.student for _, enrollment in enrollments],
+                    ['active_enrollment']
+                )
+                CourseStatsService.record(
+                    (None, CourseStatsService.get_state(enrollment))
+                    for _, enrollment in enrollments
+                )
+        except IntegrityError:
+            # Outra requisição matriculou algum dos alunos entre a verificação
+            # e a inserção: insere item a item para isolar os conflitos.
+            for position, (index, enrollment) in enumerate(enrollments):
+                try:
+                    with transaction.atomic():
+                        enrollment.save()
+                        EnrollmentService.update_active_enrollment(
+                            enrollment, None, False
+                        )
+                        CourseStatsService.record(
+                            [(None, CourseStatsService.get_state(enrollment))]
+                        )
+                except IntegrityError:
+                    results[index].update(
+                        created=False, errors={'student': [ACTIVE_ENROLLMENT_ERROR]}
+                    )
+                    enrollments[position] = (index, None)
 
-        if Enrollment.objects.filter(
-            status='Andamento',
-            student=student,
-        ).exists():
-            raise Exception('O aluno já está matriculado em um curso.')
+        created = Counter()
+        for index, enrollment in enrollments:
+            if enrollment is not None:
+                results[index].update(created=True, id=enrollment.pk)
+                created[enrollment.course] += 1
+
+        NotificationService.queue_for_course_owners({
+            course: EnrollmentService.new_enrollments_message(course, count)
+            for course, count in created.items()
+        })
+        return results
+
+    @staticmethod
+    def _get_referenced_pks(chunk, field_name, model):
+        pks = set()
+        for item in chunk:
+            if not isinstance(item, dict):
+                continue
+            try:
+                pks.add(model._meta.pk.to_python(item.get(field_name)))
+            except (DjangoValidationError, TypeError, ValueError):
+                continue
+        pks.discard(None)
+        return pks
 
     @staticmethod
     def cancel_enrollment(id, justification):
         # Verifica se o aluno está matriculado no curso
         enrollment = Enrollment.objects.get(id=str(id))
-        enrollment.justification = justification
-        enrollment.date_close = datetime.now()
-        enrollment.status = 'Desistiu'
-        enrollment.save()
+        EnrollmentService.update_enrollment(
+            enrollment, {'justification': justification}
+        )
 
     @staticmethod
     def complete_enrollment(student, course, score):
@@ -29,31 +183,205 @@ class EnrollmentService:
         enrollment = Enrollment.objects.get(
             student=student, course=course, status='Andamento'
         )
-        enrollment.score = score
-        if score is not None and score < 6:
-            enrollment.status = 'Reprovado'
-        else:
-            enrollment.status = 'Aprovado'
-        enrollment.date_close = datetime.now()
-        enrollment.save()
+        EnrollmentService.update_enrollment(enrollment, {'score': score})
+
+    @staticmethod
+    def get_target_status(enrollment, data):
+        """
+        Retorna o status resultante da atualização: a justificativa cancela
+        a matrícula e a nota a conclui; sem elas, o status não muda.
+        """
+        if data.get('justification'):
+            return 'Desistiu'
+        if data.get('score') is not None:
+            return EnrollmentService.get_final_status(data['score'])
+        return enrollment.status
+
+    @staticmethod
+    def update_enrollment(enrollment, data):
+        """
+        Aplica uma atualização à matrícula como uma única transição de status.
+
+        O estado final é calculado em memória, a transição é validada por
+        `STATUS_TRANSITIONS` e a matrícula é gravada com um único UPDATE das
+        colunas alteradas. Ao ser concluída ou cancelada, a matrícula é
+        encerrada na data atual; com um novo término, o aviso de término é
+        liberado. Os totais dos cursos são atualizados na mesma transação.
+        """
+        before = CourseStatsService.get_state(enrollment)
+        previous_student_id = enrollment.student_id
+        was_active = enrollment.status == 'Andamento'
+        if 'date_close' in data and data['date_close'] != enrollment.date_close:
+            # Novo prazo: o aluno volta a ser avisado da proximidade do término.
+            data = {**data, 'date_expiry_notified': None}
+        target = EnrollmentService.get_target_status(enrollment, data)
+        if target != enrollment.status:
+            if target not in STATUS_TRANSITIONS.get(enrollment.status, ()):
+                raise ValidationError({'status': [
+                    INVALID_TRANSITION_ERROR.format(enrollment.status, target)
+                ]})
+            data = {**data, 'status': target, 'date_close': timezone.now()}
+
+        # Troca de aluno ou de curso equivale a uma nova matrícula no curso.
+        moved = any(
+            field in data and getattr(enrollment, field) != data[field]
+            for field in ('student', 'course')
+        )
+
+        for field, value in data.items():
+            setattr(enrollment, field, value)
+        update_fields = {
+            Enrollment._meta.get_field(field).attname for field in data
+        }
+        update_fields.add('date_updated')
+
+        try:
+            with transaction.atomic():
+                enrollment.save(update_fields=update_fields)
+                EnrollmentService.update_active_enrollment(
+                    enrollment, previous_student_id, was_active
+                )
+                CourseStatsService.record(
+                    [(before, CourseStatsService.get_state(enrollment))]
+                )
+        except IntegrityError:
+            raise ActiveEnrollmentError(ACTIVE_ENROLLMENT_ERROR)
+
+        if moved:
+            EnrollmentService.notify_course_owner(
+                enrollment.course, new_enrollments=[enrollment.pk]
+            )
+        return enrollment
+
+    @staticmethod
+    def delete_enrollment(enrollment):
+        """
+        Exclui a matrícula, descontando-a dos totais do curso na mesma
+        transação.
+        """
+        before = CourseStatsService.get_state(enrollment)
+        with transaction.atomic():
+            enrollment.delete()
+            CourseStatsService.record([(before, None)])
+
+    @staticmethod
+    def update_active_enrollment(enrollment, previous_student_id, was_active):
+        """
+        Mantém `Student.active_enrollment` após a gravação da matrícula:
+        limpa o aluno anterior quando a matrícula deixa de estar em andamento
+        (ou muda de aluno) e aponta o aluno atual quando ela passa a estar.
+        """
+        is_active = enrollment.status == 'Andamento'
+        moved = enrollment.student_id != previous_student_id
+        if was_active and (moved or not is_active):
+            Student.objects.filter(
+                pk=previous_student_id, active_enrollment=enrollment
+            ).update(active_enrollment=None)
+        if is_active and (moved or not was_active):
+            Student.objects.filter(pk=enrollment.student_id).update(
+                active_enrollment=enrollment
+            )
+
+    @staticmethod
+    def get_final_status(score):
+        if score is not None and score < PASSING_SCORE:
+            return 'Reprovado'
+        return 'Aprovado'
+
+    @staticmethod
+    def grade_course(course, scores):
+        """
+        Conclui de uma vez as matrículas em andamento de um curso.
+
+        `scores` é uma lista de dicionários com `student` e `score`. As
+        matrículas são carregadas numa única consulta e gravadas com um único
+        `bulk_update`; alunos sem matrícula em andamento no curso são
+        reportados no resultado do seu item.
+
+        As matrículas ficam bloqueadas (`select_for_update`) da leitura à
+        gravação: um cancelamento ou alteração concorrente espera o
+        lançamento e não é sobrescrito.
+        """
+        with transaction.atomic():
+            enrollments = {
+                enrollment.student_id: enrollment
+                for enrollment in Enrollment.objects.filter(
+                    course=course,
+                    status='Andamento',
+                    student__in=[item['student'] for item in scores],
+                ).select_for_update()
+            }
+
+            date_close = timezone.now()
+            results = []
+            graded = []
+            changes = []
+            for index, item in enumerate(scores):
+                enrollment = enrollments.pop(item['student'], None)
+                if enrollment is None:
+                    results.append({
+                        'index': index,
+                        'graded': False,
+                        'errors': {'student': [NO_ACTIVE_ENROLLMENT_ERROR]},
+                    })
+                    continue
+
+                before = CourseStatsService.get_state(enrollment)
+                enrollment.score = item['score']
+                enrollment.status = EnrollmentService.get_final_status(item['score'])
+                enrollment.date_close = date_close
+                enrollment.date_updated = date_close
+                graded.append(enrollment)
+                changes.append((before, CourseStatsService.get_state(enrollment)))
+                results.append({
+                    'index': index,
+                    'graded': True,
+                    'id': enrollment.pk,
+                    'status': enrollment.status,
+                })
+
+            Enrollment.objects.bulk_update(
+                graded,
+                ['score', 'status', 'date_close', 'date_updated'],
+                batch_size=EnrollmentService.BULK_CHUNK_SIZE
+            )
+            Student.objects.filter(active_enrollment__in=graded).update(
+                active_enrollment=None
+            )
+            CourseStatsService.record(changes)
+
+        invalidate_model(Enrollment)
+        return results
 
     @staticmethod
     def expire_course(course, days_remaining):
         # Notifica os alunos matriculados no curso sobre a expiração
         enrolled_students = Enrollment.objects.filter(
-            course=course, date_close__isnull=True
+            course=course, status='Andamento'
+        ).values_list('pk', 'student__user__email')
+        NotificationService.queue(
+            (email, f'O curso {course.name} expirará em {days_remaining} dias. Matrícula: {pk}')
+            for pk, email in enrolled_students
         )
-        for enrollment in enrolled_students:
-            print(f'O curso {course.name} expirará em {days_remaining} dias. Matrícula: {enrollment.pk}')
 
     @staticmethod
     def notify_course_owner(course, new_enrollments):
         # Notifica o proprietário do curso sobre novas matrículas
-        print(f'O curso {course.name} possui novas matrículas: {new_enrollments}')
+        NotificationService.queue_for_course_owners({
+            course: EnrollmentService.new_enrollments_message(
+                course, len(new_enrollments)
+            )
+        })
+
+    @staticmethod
+    def new_enrollments_message(course, count):
+        if count == 1:
+            return f'O curso {course.name} possui uma nova matrícula.'
+        return f'O curso {course.name} possui {count} novas matrículas.'
 
     @staticmethod
     def notify_students_of_enrollment(enrollment):
-        days_left = (enrollment.date_close - datetime.datetime.now().date()).days
+        days_left = (enrollment.date_close - timezone.now()).days
 
         message = f"Faltam {days_left} dias para o término do curso {enrollment.course.name}"
 
@@ -0,0 +1,95 @@
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.virtual_education.models import Notification, Owner
+from apps.virtual_education.notifications import Message, get_backend
+
+
+class NotificationService:
+    @staticmethod
+    def queue(notifications):
+        """
+        Grava na caixa de saída uma sequência de pares
+        `(destinatário, mensagem)`, com um único INSERT em lote.
+
+        A entrega é feita depois, pela tarefa `deliver_notifications`.
+        """
+        return Notification.objects.bulk_create(
+            [
+                Notification(recipient=recipient, message=message)
+                for recipient, message in notifications
+                if recipient
+            ],
+            batch_size=settings.NOTIFICATION_BATCH_SIZE
+        )
+
+    @staticmethod
+    def queue_for_course_owners(messages):
+        """
+        Grava as mensagens de um dicionário `{curso: mensagem}` para os
+        proprietários de cada curso, com uma consulta e um INSERT em lote.
+        """
+        if not messages:
+            return []
+
+        messages = {course.pk: message for course, message in messages.items()}
+        owners = Owner.objects.filter(courses__in=list(messages)).values_list(
+            'courses_id', 'user__email'
+        )
+        return NotificationService.queue(
+            (email, messages[course_id]) for course_id, email in owners
+        )
+
+    @staticmethod
+    def deliver_pending(batch_size=None, backend=None):
+        """
+        Entrega as notificações pendentes, em lotes de `batch_size`.
+
+        As notificações de um mesmo destinatário num lote são reunidas numa
+        única mensagem. O lote só é marcado como enviado se o backend não
+        falhar; em caso de erro a transação é desfeita e as notificações
+        continuam pendentes para a próxima tentativa.
+        """
+        batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        backend = backend or get_backend()
+        delivered = 0
+
+        while True:
+            with transaction.atomic():
+                pending = list(
+                    Notification.objects
+                    .filter(date_sent__isnull=True)
+                    .order_by('recipient', 'date_created')
+                    .select_for_update(skip_locked=True)
+                    .values_list('id', 'recipient', 'message')[:batch_size]
+                )
+                if not pending:
+                    break
+
+                backend.send_messages(NotificationService.digest(pending))
+                Notification.objects.filter(
+                    id__in=[notification_id for notification_id, _, _ in pending]
+                ).update(date_sent=timezone.now())
+
+            delivered += len(pending)
+            if len(pending) < batch_size:
+                break
+
+        return delivered
+
+    @staticmethod
+    def digest(pending):
+        # Agrupa as notificações por destinatário numa única mensagem
+        messages = []
+        for recipient, group in groupby(pending, key=lambda row: row[1]):
+            lines = [message for _, _, message in group]
+            subject = (
+                'Você tem uma nova notificação'
+                if len(lines) == 1
+                else f'Você tem {len(lines)} novas notificações'
+            )
+            messages.append(Message(recipient, subject, '\n'.join(lines)))
+        return messages
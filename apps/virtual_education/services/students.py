@@ -1,13 +1,140 @@
-from apps.virtual_education.models import Enrollment
+from apps.cache import invalidate_model
+from apps.utils import chunked
+from apps.virtual_education.models import Enrollment, Student, User
+from django.db import IntegrityError, transaction
 from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+DUPLICATE_EMAIL_ERROR = 'Já existe um usuário com este email.'
+ENROLLED_STUDENT_ERROR = 'O aluno está matriculado em um curso. Impossível apagar.'
 
 
 class StudentService:
+    BULK_CHUNK_SIZE = 1000
+
     @staticmethod
     def check_student_enrollment(student):
-        # Verifica se o aluno já está matriculado em algum curso
-        if Enrollment.objects.filter(
+        # Verifica se o aluno já está matriculado em algum curso: a matrícula
+        # em andamento vem do próprio aluno; as concluídas, que também
+        # referenciam o aluno, exigem a consulta às matrículas.
+        if student.active_enrollment_id or Enrollment.objects.filter(
             ~Q(status='Desistiu'),
             student=student
         ).exists():
-            raise Exception('O aluno está matriculado em um curso. Impossível apagar.')
+            raise Exception(ENROLLED_STUDENT_ERROR)
+
+    @staticmethod
+    def repair_active_enrollments(student_ids, dry_run=False):
+        """
+        Confere `Student.active_enrollment` de um lote de alunos com as
+        matrículas em andamento e corrige as divergências com um único
+        `bulk_update`. Retorna a quantidade de alunos divergentes.
+        """
+        with transaction.atomic():
+            pointers = dict(
+                Student.objects.filter(pk__in=student_ids)
+                .select_for_update()
+                .values_list('pk', 'active_enrollment_id')
+            )
+            active = dict(
+                Enrollment.objects.filter(
+                    student__in=list(pointers), status='Andamento'
+                ).values_list('student_id', 'pk')
+            )
+            drifted = [
+                Student(pk=pk, active_enrollment_id=active.get(pk))
+                for pk, enrollment_id in pointers.items()
+                if enrollment_id != active.get(pk)
+            ]
+            if drifted and not dry_run:
+                Student.objects.bulk_update(drifted, ['active_enrollment'])
+        return len(drifted)
+
+    @staticmethod
+    def bulk_create_students(serializer, items, chunk_size=None):
+        """
+        Cadastra alunos e seus usuários em lote a partir de um serializador
+        `many=True`.
+
+        Gera, a cada lote processado, a lista de resultados dos seus itens, o
+        que permite acompanhar o progresso de importações grandes. Emails já
+        cadastrados ou repetidos na carga são rejeitados item a item, sem
+        interromper o lote.
+        """
+        offset = 0
+        for chunk in chunked(items, chunk_size or StudentService.BULK_CHUNK_SIZE):
+            results = StudentService._bulk_create_chunk(serializer, chunk, offset)
+            offset += len(chunk)
+            invalidate_model(Student)
+            yield results
+
+    @staticmethod
+    def _bulk_create_chunk(serializer, chunk, offset):
+        results = [{'index': offset + index} for index in range(len(chunk))]
+        validated = []
+        for index, item in enumerate(chunk):
+            try:
+                validated.append((index, serializer.child.run_validation(item)))
+            except ValidationError as exc:
+                results[index].update(created=False, errors=exc.detail)
+
+        taken_emails = set(
+            User.objects.filter(
+                email__in=[data['email'] for _, data in validated]
+            ).values_list('email', flat=True)
+        )
+
+        pending = []
+        for index, data in validated:
+            if data['email'] in taken_emails:
+                results[index].update(
+                    created=False, errors={'email': [DUPLICATE_EMAIL_ERROR]}
+                )
+                continue
+            taken_emails.add(data['email'])
+
+            # A normalização de User.save não é executada pelo bulk_create.
+            user = User(**serializer.child.get_user_data(data))
+            user.normalize()
+            student = Student(**serializer.child.clean_validated_data(data))
+            pending.append((index, user, student))
+
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create(
+                    [user for _, user, _ in pending]
+                )
+                for (_, _, student), user in zip(pending, users):
+                    student.user = user
+                    student.normalize()
+                Student.objects.bulk_create(
+                    [student for _, _, student in pending]
+                )
+        except IntegrityError:
+            # Algum email foi cadastrado por outra requisição após a
+            # verificação: cadastra item a item para isolar os conflitos.
+            pending = StudentService._create_one_by_one(pending, results)
+
+        for index, _, student in pending:
+            results[index].update(created=True, id=student.pk)
+
+        return results
+
+    @staticmethod
+    def _create_one_by_one(pending, results):
+        created = []
+        for index, user, student in pending:
+            try:
+                with transaction.atomic():
+                    user.pk = None
+                    user.save()
+                    student.user = user
+                    student.save()
+            except IntegrityError:
+                results[index].update(
+                    created=False, errors={'email': [DUPLICATE_EMAIL_ERROR]}
+                )
+                continue
+            created.append((index, user, student))
+        return created
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.cache import invalidate_model, invalidate_on_commit
+from apps.utils import normalize_search_key
+from apps.virtual_education.models import Course, CourseStats, Enrollment, Student, User
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_cached_counts(sender, **kwargs):
+    # Totais em cache das listagens deixam de valer após qualquer escrita.
+    invalidate_on_commit(invalidate_model, sender)
+
+
+@receiver(post_save, sender=Course)
+def create_course_stats(sender, instance, created, raw=False, **kwargs):
+    # Todo curso começa com os totais zerados.
+    if created and not raw:
+        CourseStats.objects.get_or_create(course=instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_student_cached_counts(sender, **kwargs):
+    # Os filtros de alunos consultam os dados do usuário.
+    invalidate_on_commit(invalidate_model, Student)
+
+
+@receiver(post_save, sender=User)
+def update_student_search_keys(sender, instance, created, **kwargs):
+    # Mantém as chaves de busca do aluno em dia com o apelido e o email.
+    if created:
+        return
+    Student.objects.filter(user=instance).update(
+        nickname_key=normalize_search_key(instance.nickname),
+        email_key=normalize_search_key(instance.email)
+    )
@@ -1,16 +1,143 @@
-from datetime import datetime, timedelta
-from apps.virtual_education.models import Enrollment
+import logging
+import time
+from datetime import timedelta
+
+from celery import group
+from django.db import transaction
+from django.utils import timezone
+
+from apps.utils import chunked
+from apps.virtual_education.models import Course, Enrollment
+from .services.course_stats import CourseStatsService
 from .services.enrollments import EnrollmentService
+from .services.notifications import NotificationService
 from e_learning.celery import app
 
 
+logger = logging.getLogger(__name__)
+
+EXPIRY_NOTICE_DAYS = 7
+EXPIRY_NOTIFICATION_CHUNK_SIZE = 500
+COURSE_STATS_CHUNK_SIZE = 500
+
+
+def get_expiring_enrollments():
+    # Matrículas em andamento que terminam nos próximos dias e cujos alunos
+    # ainda não foram avisados.
+    return Enrollment.objects.filter(
+        date_close__lt=timezone.now() + timedelta(days=EXPIRY_NOTICE_DAYS),
+        status='Andamento',
+        date_expiry_notified__isnull=True
+    )
+
+
 @app.task
-def notify_enrollments_near_to_expire():
+def notify_enrollments_near_to_expire(chunk_size=EXPIRY_NOTIFICATION_CHUNK_SIZE):
+    """
+    Agenda os avisos de matrículas próximas do término.
 
-    enrollments_expiring = Enrollment.objects.filter(
-        date_close__lt=datetime.now() + timedelta(days=7),
-        status='Andamento'
+    Percorre apenas os ids das matrículas, sem carregá-las em memória, e
+    despacha uma subtarefa `notify_expiring_enrollments_chunk` por lote.
+    """
+    enrollment_ids = (
+        str(enrollment_id)
+        for enrollment_id in get_expiring_enrollments()
+        .order_by()
+        .values_list('id', flat=True)
+        .iterator(chunk_size=chunk_size)
     )
+    group(
+        notify_expiring_enrollments_chunk.s(batch)
+        for batch in chunked(enrollment_ids, chunk_size)
+    ).apply_async()
+
+
+@app.task
+def notify_expiring_enrollments_chunk(enrollment_ids):
+    """
+    Avisa os alunos de um lote de matrículas próximas do término.
+
+    Cada matrícula é marcada em `date_expiry_notified` na mesma transação do
+    aviso; matrículas já avisadas ou bloqueadas por outro processo são
+    ignoradas, de modo que reexecutar a tarefa não repete avisos.
+    """
+    start = time.perf_counter()
+    with transaction.atomic():
+        enrollments = list(
+            get_expiring_enrollments()
+            .filter(id__in=enrollment_ids)
+            .select_related('course', 'student__user')
+            .select_for_update(skip_locked=True, of=('self',))
+        )
+        NotificationService.queue(
+            (
+                enrollment.student.user.email,
+                EnrollmentService.notify_students_of_enrollment(enrollment)
+            )
+            for enrollment in enrollments
+        )
+        Enrollment.objects.filter(
+            id__in=[enrollment.id for enrollment in enrollments]
+        ).update(date_expiry_notified=timezone.now())
+
+    seconds = time.perf_counter() - start
+    logger.info(
+        'Avisos de término: %d matrículas em %.3fs (%.0f linhas/s).',
+        len(enrollments), seconds, len(enrollments) / seconds if seconds else 0
+    )
+    return {'rows': len(enrollments), 'seconds': seconds}
+
+
+@app.task(
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    max_retries=8
+)
+def deliver_notifications(batch_size=None):
+    """
+    Entrega as notificações pendentes da caixa de saída, reunidas por
+    destinatário. Falhas do backend são repetidas com espera exponencial.
+    """
+    start = time.perf_counter()
+    delivered = NotificationService.deliver_pending(batch_size)
+    seconds = time.perf_counter() - start
+    if delivered:
+        logger.info('Notificações entregues: %d em %.3fs.', delivered, seconds)
+    return {'rows': delivered, 'seconds': seconds}
+
+
+@app.task
+def reconcile_course_stats(chunk_size=COURSE_STATS_CHUNK_SIZE):
+    """
+    Agenda a reconstrução dos totais de matrículas de todos os cursos.
+
+    Corrige desvios dos totais incrementais (por exemplo, matrículas
+    gravadas fora do `EnrollmentService`), com uma subtarefa
+    `rebuild_course_stats_chunk` por lote de cursos.
+    """
+    course_ids = (
+        str(course_id)
+        for course_id in Course.objects.order_by()
+        .values_list('id', flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+    group(
+        rebuild_course_stats_chunk.s(batch)
+        for batch in chunked(course_ids, chunk_size)
+    ).apply_async()
+
+
+@app.task(ignore_result=False)
+def rebuild_course_stats_chunk(course_ids):
+    """
+    Reconstrói os totais de matrículas de um lote de cursos.
 
-    for enrollment in enrollments_expiring:
-        EnrollmentService.notify_students_of_enrollment(enrollment)
+    Ao contrário das demais tarefas, grava o resultado (cursos e tempo),
+    para acompanhar a reconciliação.
+    """
+    start = time.perf_counter()
+    rows = CourseStatsService.rebuild(course_ids)
+    seconds = time.perf_counter() - start
+    logger.info('Totais dos cursos: %d cursos em %.3fs.', rows, seconds)
+    return {'rows': rows, 'seconds': seconds}
@@ -1,9 +1,10 @@
 import faker
-from factory import lazy_attribute
+from factory import SubFactory, lazy_attribute
 from factory.django import DjangoModelFactory
 from factory.faker import Faker
 from factory.fuzzy import FuzzyText
-from apps.virtual_education.models import Course
+from apps.virtual_education.models import Course, Owner
+from apps.virtual_education.tests.factories.students import UserFactory
 
 
 fake = faker.Faker('pt_BR')
@@ -17,3 +18,11 @@ class CourseFactory(DjangoModelFactory):
     description = FuzzyText(length=200)
     holder_image = Faker('image_url')
     duration = Faker('random_int', min=1, max=10)
+
+
+class OwnerFactory(DjangoModelFactory):
+    class Meta:
+        model = Owner
+
+    user = SubFactory(UserFactory)
+    courses = SubFactory(CourseFactory)
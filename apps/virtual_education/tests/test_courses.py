@@ -1,11 +1,26 @@
 import uuid
+from unittest import mock
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 
-from apps.virtual_education.models import Course
+from apps.virtual_education.models import Course, CourseStats, Enrollment
+from apps.virtual_education.search import search_courses
+from apps.virtual_education.serializers.courses import CourseSerializer
+from apps.virtual_education.services.enrollments import EnrollmentService
+from apps.virtual_education.tasks import reconcile_course_stats
 from apps.virtual_education.tests.factories.courses import CourseFactory
 from apps.virtual_education.tests.factories.enrollments import EnrollmentFactory
 from apps.virtual_education.tests.factories.students import StudentFactory
 from apps.virtual_education.tests.test_main import TestVirtualEducation
+from apps.virtual_education.views.courses import CourseViewSet
 
 
 class TestCourse(TestVirtualEducation):
@@ -65,6 +80,31 @@ class TestCourse(TestVirtualEducation):
         self.assertEqual(response.data["id"], str(self.course.id))
         self.assertEqual(response.data["name"], self.course.name)
 
+    def test_retrieve_course_datetime_format(self):
+        """
+        Testa o formato das datas da resposta, padrão e ISO 8601.
+        """
+        self.course.refresh_from_db()
+        date_created = timezone.localtime(self.course.date_created)
+
+        response = self.client.get(f"{self.url}{self.course.id}/")
+        self.assertEqual(
+            response.data["date_created"], date_created.strftime('%d/%m/%Y %H:%M:%S')
+        )
+
+        response = self.client.get(f"{self.url}{self.course.id}/", {"formato_data": "iso"})
+        self.assertEqual(
+            response.data["date_created"], date_created.isoformat()
+        )
+
+    def test_course_serializer_fields_not_shared(self):
+        # Os campos construídos uma vez por classe são copiados para cada instância
+        first, second = CourseSerializer().fields, CourseSerializer().fields
+
+        self.assertEqual(list(first), list(second))
+        self.assertIsNot(first['date_created'], second['date_created'])
+        self.assertIs(first['date_created'].parent.__class__, CourseSerializer)
+
     def test_retrieve_course_not_found(self):
         """
         Testa a recuperação de um curso inexistente.
@@ -85,6 +125,259 @@ class TestCourse(TestVirtualEducation):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Course.objects.count(), response.data['count'])
 
+    def test_list_course_fast_path(self):
+        """
+        Testa se a listagem rápida de cursos é idêntica à do serializador.
+        """
+        CourseFactory.create_batch(size=5)
+        Course.objects.filter(pk=self.course.pk).update(holder_image='')
+
+        self.assertFastListIdentical(CourseViewSet, self.url)
+        self.assertFastListIdentical(CourseViewSet, self.url, {'formato_data': 'iso'})
+        self.assertFastListIdentical(CourseViewSet, self.url, {'paginacao': 'cursor', 'tamanho': 3})
+
+        # Sem URLs de arquivos, a imagem é representada pelo nome.
+        with override_settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK, 'UPLOADED_FILES_USE_URL': False
+        }):
+            self.assertFastListIdentical(CourseViewSet, self.url)
+
+    def test_search_courses(self):
+        """
+        Testa a busca de cursos por nome e descrição, sem acentos e por relevância.
+        """
+        by_name = CourseFactory(name="Programação em Python", description="Curso introdutório.")
+        by_description = CourseFactory(name="Lógica", description="Exercícios de programação.")
+        CourseFactory(name="Culinária", description="Receitas de pão.")
+
+        response = self.client.get(self.url, {"busca": "PROGRAMACAO"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [course["id"] for course in response.data["results"]],
+            [str(by_name.id), str(by_description.id)]
+        )
+
+        response = self.client.get(self.url, {"busca": "pao receita"})
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(self.url, {"busca": '"*'})
+        self.assertEqual(response.data["count"], 0)
+
+    def test_search_courses_index_sync(self):
+        """
+        Testa se o índice de busca acompanha inserções em lote, alterações e exclusões.
+        """
+        Course.objects.bulk_create([
+            Course(name="Astronomia", description="Estrelas.", duration=1),
+        ])
+        self.course.name = "Cálculo"
+        self.course.save()
+
+        def search(terms):
+            return list(search_courses(Course.objects.all(), terms).values_list('name', flat=True))
+
+        self.assertEqual(search("astronomia"), ["Astronomia"])
+        self.assertEqual(search("calculo"), ["Cálculo"])
+        self.assertEqual(search("python"), [])
+
+        # O rowid implícito dos cursos muda com o VACUUM; a busca não depende dele.
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {Course._meta.db_table} SET rowid = 1000 - rowid'
+                )
+            self.assertEqual(search("astronomia"), ["Astronomia"])
+            self.assertEqual(search("calculo"), ["Cálculo"])
+
+        self.course.delete()
+        self.assertEqual(search("calculo"), [])
+
+    def test_benchmark_course_search(self):
+        """
+        Testa o benchmark da busca de cursos, que não deve manter os dados semeados.
+        """
+        courses = Course.objects.count()
+        out = StringIO()
+
+        call_command('benchmark_course_search', courses=20, repeat=1, stdout=out)
+
+        self.assertIn('(icontains): mediana', out.getvalue())
+        self.assertIn('(busca): mediana', out.getvalue())
+        self.assertEqual(Course.objects.count(), courses)
+
+    def test_benchmark_course_stats(self):
+        """
+        Testa o benchmark dos totais dos cursos, que não deve manter os dados semeados.
+        """
+        courses = Course.objects.count()
+        out = StringIO()
+
+        call_command('benchmark_course_stats', students=10, courses=2, repeat=1, stdout=out)
+
+        self.assertIn('totais do curso (CourseStats): mediana', out.getvalue())
+        self.assertEqual(Course.objects.count(), courses)
+        self.assertEqual(CourseStats.objects.count(), courses)
+
+    def test_benchmark_course_analytics(self):
+        """
+        Testa o benchmark da análise das notas, que não deve manter os dados semeados.
+        """
+        courses = Course.objects.count()
+        out = StringIO()
+
+        call_command(
+            'benchmark_course_analytics', students=10, courses=2, repeat=1, stdout=out
+        )
+
+        self.assertIn('distribuição: mediana', out.getvalue())
+        self.assertEqual(Course.objects.count(), courses)
+
+    def test_course_response_cache(self):
+        """
+        Testa o cache das respostas de cursos: acertos sem consultas ao banco,
+        parâmetros normalizados e invalidação após escritas.
+        """
+        response = self.client.get(self.url, {"duration__gte": 1})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"duration__gte": " 1", "ignorado": "x"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(self.url, {"duration__gte": 1, "tamanho": 1})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        with mock.patch.object(CourseViewSet, 'fast_list', False):
+            response = self.client.get(self.url, {"duration__gte": 1})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        CourseFactory(duration=2)
+        response = self.client.get(self.url, {"duration__gte": 1})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 2)
+
+        stats = self.client.get(f"{self.url}cache-stats/").data
+        self.assertGreaterEqual(stats["hits"], 1)
+        self.assertGreaterEqual(stats["misses"], 3)
+        self.assertEqual(stats["hit_ratio"], stats["hits"] / (stats["hits"] + stats["misses"]))
+
+    def test_course_response_cache_stats_scope(self):
+        """
+        Testa que matrículas invalidam apenas as respostas em cache dos seus
+        cursos, e que listagens filtradas pelos totais acompanham as matrículas.
+        """
+        other = CourseFactory(name="Rust Avançado")
+        detail = f"{self.url}{self.course.id}/"
+        date_close = (timezone.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+
+        def enroll(course):
+            response = self.client.post('/enrollments/', {
+                "student": str(StudentFactory().id),
+                "course": str(course.id),
+                "date_close": date_close,
+            })
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        by_stats = {"stats__in_progress__gte": 1}
+        self.assertEqual(self.client.get(self.url, by_stats).data["count"], 0)
+        self.client.get(detail)
+        self.client.get(self.url, {"name__icontains": "Python"})
+
+        enroll(other)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(detail)
+        self.assertEqual(response["X-Cache"], "HIT")
+        response = self.client.get(self.url, {"name__icontains": "Python"})
+        self.assertEqual(response["X-Cache"], "HIT")
+
+        response = self.client.get(self.url, by_stats)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        enroll(self.course)
+
+        response = self.client.get(detail)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["students_in_progress"], 1)
+        response = self.client.get(self.url, {"name__icontains": "Python"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["students_in_progress"], 1)
+        self.assertEqual(self.client.get(self.url, by_stats).data["count"], 2)
+
+    def test_course_response_cache_invalidated_on_commit(self):
+        """
+        Testa que as respostas guardadas durante a transação de uma matrícula
+        são descartadas após a confirmação.
+        """
+        detail = f"{self.url}{self.course.id}/"
+        with self.captureOnCommitCallbacks(execute=True):
+            EnrollmentService.delete_enrollment(EnrollmentFactory(course=self.course))
+            self.assertEqual(self.client.get(detail)["X-Cache"], "MISS")
+            self.assertEqual(self.client.get(detail)["X-Cache"], "HIT")
+
+        self.assertEqual(self.client.get(detail)["X-Cache"], "MISS")
+
+    def test_course_conditional_get(self):
+        """
+        Testa as requisições condicionais (ETag e Last-Modified) de cursos.
+        """
+        url = f"{self.url}{self.course.id}/"
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        list_etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(url, {"name": "Python Avançado"}, format="json")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Python Avançado")
+
+        CourseFactory().delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_course_cursor_pagination(self):
+        """
+        Testa a listagem de cursos com paginação por cursor.
+        """
+        CourseFactory.create_batch(size=4)
+
+        response = self.client.get(f"{self.url}?paginacao=cursor&tamanho=2")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+
+        ids = [course['id'] for course in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            ids.extend(course['id'] for course in response.data['results'])
+            next_url = response.data['next']
+
+        expected = Course.objects.order_by('date_created', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, [str(id) for id in expected])
+
+        # A página seguinte percorre o índice (date_created, id), sem ordenar.
+        last = Course.objects.order_by('date_created', 'id').last()
+        plan = Course.objects.filter(
+            date_created__gte=last.date_created
+        ).order_by('date_created', 'id')[:2].explain()
+        self.assertIn('course_date_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
     def test_update_course_name(self):
         # Testando a atualização do nome de um curso existente
         data = {
@@ -179,3 +472,216 @@ class TestCourse(TestVirtualEducation):
         self.assertTrue(
             Course.objects.filter(id=self.course.id).exists()
         )
+
+    def test_grade_course(self):
+        """
+        Testa o lançamento das notas de todos os alunos de um curso numa única requisição.
+        """
+        enrollments = EnrollmentFactory.create_batch(size=4, course=self.course)
+        other_course_enrollment = EnrollmentFactory()
+        data = [
+            {"student": str(enrollments[0].student.id), "score": "9.5"},
+            {"student": str(enrollments[1].student.id), "score": "5.99"},
+            {"student": str(enrollments[2].student.id), "score": "6"},
+            {"student": str(enrollments[3].student.id), "score": "3"},
+            {"student": str(other_course_enrollment.student.id), "score": "10"},
+        ]
+
+        # Inclui os UPDATEs das matrículas em andamento dos alunos e dos
+        # totais do curso.
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                f'{self.url}{self.course.id}/grades/', data, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['graded'], 4)
+        self.assertFalse(response.data['results'][4]['graded'])
+
+        statuses = dict(
+            Enrollment.objects.filter(course=self.course).values_list('student_id', 'status')
+        )
+        self.assertEqual(
+            [statuses[enrollment.student.id] for enrollment in enrollments],
+            ['Aprovado', 'Reprovado', 'Aprovado', 'Reprovado']
+        )
+        other_course_enrollment.refresh_from_db()
+        self.assertEqual(other_course_enrollment.status, 'Andamento')
+
+    def test_grade_course_reads_inside_transaction(self):
+        """
+        Testa que as matrículas são lidas na transação do lançamento, e não
+        antes dela, para que alterações concorrentes não sejam sobrescritas.
+        """
+        enrollment = EnrollmentFactory(course=self.course)
+
+        with CaptureQueriesContext(connection) as context:
+            EnrollmentService.grade_course(
+                self.course, [{'student': enrollment.student.id, 'score': Decimal('8')}]
+            )
+
+        queries = [query['sql'] for query in context.captured_queries]
+        savepoint = next(
+            index for index, sql in enumerate(queries) if sql.startswith('SAVEPOINT')
+        )
+        read = next(
+            index for index, sql in enumerate(queries)
+            if sql.startswith('SELECT') and 'virtual_education_enrollment' in sql
+        )
+        self.assertLess(savepoint, read)
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.status, 'Aprovado')
+
+    def test_grade_course_invalid_score(self):
+        """
+        Testa o lançamento de notas com uma planilha inválida.
+        """
+        enrollment = EnrollmentFactory(course=self.course)
+        data = [{"student": str(enrollment.student.id), "score": "nota"}]
+
+        response = self.client.post(
+            f'{self.url}{self.course.id}/grades/', data, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.status, 'Andamento')
+
+    def test_grade_course_score_out_of_range(self):
+        """
+        Testa o lançamento de notas fora do intervalo de 0 a 10.
+        """
+        enrollment = EnrollmentFactory(course=self.course, score=None)
+        url = f'{self.url}{self.course.id}/grades/'
+
+        for score in ("-1", "10.01"):
+            data = [{"student": str(enrollment.student.id), "score": score}]
+            response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.status, 'Andamento')
+        self.assertIsNone(enrollment.score)
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual(stats.score_count, 0)
+
+    def test_course_stats(self):
+        """
+        Testa os totais de matrículas do curso, mantidos a cada transição.
+        """
+        date_close = (timezone.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        enrollment_ids = []
+        for student in StudentFactory.create_batch(size=4):
+            response = self.client.post('/enrollments/', {
+                "student": str(student.id),
+                "course": str(self.course.id),
+                "date_close": date_close,
+            })
+            enrollment_ids.append(response.data['id'])
+
+        self.client.patch(f'/enrollments/{enrollment_ids[0]}/', {"score": "9"})
+        self.client.patch(f'/enrollments/{enrollment_ids[1]}/', {"score": "4.5"})
+        self.client.patch(f'/enrollments/{enrollment_ids[2]}/', {"justification": "Mudança"})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.url}{self.course.id}/stats/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['in_progress'], 1)
+        self.assertEqual(response.data['approved'], 1)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['dropped'], 1)
+        self.assertEqual(response.data['score_count'], 2)
+        self.assertEqual(response.data['mean_score'], '6.75')
+
+        # As escritas nas matrículas invalidam as respostas em cache.
+        other_course = CourseFactory()
+        CourseStats.objects.filter(course=other_course).update(mean_score=5)
+        response = self.client.get(self.url, {"ordenar": "-mean_score"})
+        self.assertEqual(
+            [course['id'] for course in response.data['results']],
+            [str(self.course.id), str(other_course.id)]
+        )
+        self.assertEqual(response.data['results'][0]['students_approved'], 1)
+        self.assertEqual(response.data['results'][0]['mean_score'], '6.75')
+
+        response = self.client.get(self.url, {"stats__in_progress__gte": 1})
+        self.assertEqual(response.data['count'], 1)
+
+        self.client.patch(f'/enrollments/{enrollment_ids[3]}/', {"score": "10"})
+        response = self.client.get(self.url, {"stats__in_progress__gte": 1})
+        self.assertEqual(response.data['count'], 0)
+
+        self.assertFastListIdentical(CourseViewSet, self.url, {"ordenar": "-mean_score"})
+
+    def test_reconcile_course_stats(self):
+        """
+        Testa a reconstrução dos totais a partir das matrículas, inclusive
+        de cursos sem totais e de matrículas gravadas fora do serviço.
+        """
+        self.use_eager_celery()
+
+        EnrollmentFactory(course=self.course, score=None)
+        EnrollmentFactory(course=self.course, score=8, status='Aprovado')
+        EnrollmentFactory(course=self.course, score=5, status='Reprovado')
+        course = Course.objects.bulk_create([
+            Course(name='Sem totais', description='Criado em lote', duration=1)
+        ])[0]
+        EnrollmentFactory(course=course, score=None, status='Desistiu')
+
+        reconcile_course_stats.delay(chunk_size=1)
+
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual(
+            (stats.in_progress, stats.approved, stats.failed, stats.dropped),
+            (1, 1, 1, 0)
+        )
+        self.assertEqual(stats.score_count, 2)
+        self.assertEqual(stats.mean_score, Decimal('6.50'))
+
+        stats = CourseStats.objects.get(course=course)
+        self.assertEqual(stats.dropped, 1)
+        self.assertIsNone(stats.mean_score)
+
+    def test_course_analytics(self):
+        """
+        Testa a análise das notas do curso e sua invalidação ao lançar notas.
+        """
+        for score in (2, '5.5', 6, 8, '9.5'):
+            EnrollmentFactory(course=self.course, score=score, status='Aprovado')
+        ungraded = EnrollmentFactory(course=self.course, score=None)
+        url = f'{self.url}{self.course.id}/analytics/'
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        overall = response.data['overall']
+        self.assertEqual(overall['scores'], 5)
+        self.assertEqual((overall['passed'], overall['failed']), (3, 2))
+        self.assertEqual(overall['pass_rate'], 0.6)
+        self.assertEqual(overall['mean'], 6.2)
+        self.assertEqual(
+            overall['percentiles'], {'p25': 5.5, 'p50': 6.0, 'p75': 8.0, 'p90': 8.9}
+        )
+        self.assertEqual(
+            [bin['count'] for bin in overall['histogram']],
+            [0, 0, 1, 0, 0, 1, 1, 0, 1, 1]
+        )
+        self.assertEqual(
+            [cohort['month'] for cohort in response.data['cohorts']],
+            [timezone.localtime().strftime('%Y-%m')]
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).data, response.data)
+
+        self.client.post(
+            f'{self.url}{self.course.id}/grades/',
+            [{"student": str(ungraded.student.id), "score": "10"}],
+            format='json'
+        )
+
+        overall = self.client.get(url).data['overall']
+        self.assertEqual(overall['scores'], 6)
+        self.assertEqual(overall['histogram'][-1]['count'], 2)
+
@@ -1,16 +1,38 @@
 from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+import csv
+import gzip
+import io
+import json
+from unittest import mock
 import uuid
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 
-from apps.virtual_education.models import Enrollment
-from apps.virtual_education.services.enrollments import EnrollmentService
+from apps.virtual_education.models import Enrollment, Notification
+from apps.virtual_education.notifications.backends import MemoryBackend
+from apps.virtual_education.services.notifications import NotificationService
+from apps.virtual_education.services.enrollments import (
+    ACTIVE_ENROLLMENT_ERROR, EnrollmentService
+)
+from apps.virtual_education.tasks import (
+    deliver_notifications, notify_enrollments_near_to_expire,
+    notify_expiring_enrollments_chunk, rebuild_course_stats_chunk, reconcile_course_stats
+)
 
 from apps.virtual_education.tests.factories.enrollments import EnrollmentFactory
 from apps.virtual_education.tests.factories.students import StudentFactory, UserFactory
-from apps.virtual_education.tests.factories.courses import CourseFactory
+from apps.virtual_education.tests.factories.courses import CourseFactory, OwnerFactory
 
 from apps.virtual_education.tests.test_main import TestVirtualEducation
+from apps.virtual_education.views.enrollments import EnrollmentViewSet
 from factory.fuzzy import FuzzyChoice
+from e_learning.celery import app
 
 
 class TestEnrollment(TestVirtualEducation):
@@ -79,6 +101,7 @@ class TestEnrollment(TestVirtualEducation):
         response = self.client.post(self.url, data)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['student'], ACTIVE_ENROLLMENT_ERROR)
         self.assertEqual(
             Enrollment.objects.filter(
                 status='Andamento', student=self.student
@@ -86,6 +109,149 @@ class TestEnrollment(TestVirtualEducation):
             1
         )
 
+    def test_unique_active_enrollment_constraint(self):
+        """
+        Testa se o banco recusa uma segunda matrícula em andamento do mesmo aluno.
+        """
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            EnrollmentFactory(student=self.student, course=CourseFactory())
+
+        EnrollmentFactory(
+            student=self.student, course=CourseFactory(), status='Aprovado'
+        )
+        self.assertEqual(
+            Enrollment.objects.filter(
+                status='Andamento', student=self.student
+            ).count(),
+            1
+        )
+
+    def test_update_enrollment_student_enrolled(self):
+        """
+        Testa a troca do aluno de uma matrícula para um aluno com matrícula em andamento.
+        """
+        other = EnrollmentFactory()
+
+        response = self.client.patch(
+            f"{self.url}{other.id}/", {"student": str(self.student.id)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['student'], ACTIVE_ENROLLMENT_ERROR)
+        other.refresh_from_db()
+        self.assertNotEqual(other.student_id, self.student.id)
+
+    def test_create_enrollment_unexpected_error(self):
+        """
+        Testa que erros inesperados na criação não viram respostas 400.
+        """
+        data = {
+            "student": str(StudentFactory().id),
+            "course": str(self.course.id),
+            "date_close": (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        }
+        with mock.patch.object(
+            EnrollmentService, 'enroll_student', side_effect=RuntimeError('falha')
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(self.url, data)
+
+    def test_update_enrollment_unexpected_error(self):
+        """
+        Testa que erros inesperados na atualização não viram respostas 400.
+        """
+        with mock.patch.object(
+            EnrollmentService, 'update_enrollment', side_effect=RuntimeError('falha')
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.patch(f"{self.url}{self.enrollment.id}/", {"score": "7"})
+
+    def test_bulk_create_enrollments(self):
+        """
+        Testa a matrícula em lote, com resultados individuais por item.
+        """
+        students = StudentFactory.create_batch(size=3)
+        date_close = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        data = [
+            {"student": str(student.id), "course": str(self.course.id), "date_close": date_close}
+            for student in students
+        ] + [
+            {"student": str(self.student.id), "course": str(self.course.id), "date_close": date_close},
+            {"student": str(uuid.uuid4()), "course": str(self.course.id), "date_close": date_close},
+            {"student": str(students[0].id), "course": str(self.course.id), "date_close": date_close},
+        ]
+
+        enrollments = Enrollment.objects.count()
+
+        response = self.client.post(f"{self.url}bulk/", data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['failed'], 3)
+        self.assertEqual(Enrollment.objects.count(), enrollments + 3)
+        self.assertEqual(
+            [result['created'] for result in response.data['results']],
+            [True, True, True, False, False, False]
+        )
+        self.assertEqual(
+            str(response.data['results'][4]['errors']['student'][0]),
+            f'Pk inválido "{data[4]["student"]}" - objeto não existe.'
+        )
+        self.assertIn('student', response.data['results'][5]['errors'])
+
+    def test_bulk_create_enrollments_ndjson(self):
+        """
+        Testa a matrícula em lote enviada como NDJSON.
+        """
+        students = StudentFactory.create_batch(size=2)
+        date_close = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        lines = [
+            json.dumps({"student": str(student.id), "course": str(self.course.id), "date_close": date_close})
+            for student in students
+        ] + ['{invalido']
+
+        response = self.client.post(
+            f"{self.url}bulk/",
+            '\n'.join(lines),
+            content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 2)
+        self.assertFalse(response.data['results'][2]['created'])
+        self.assertEqual(
+            Enrollment.objects.filter(student__in=students, status='Andamento').count(),
+            2
+        )
+
+    def test_bulk_create_enrollments_queries(self):
+        """
+        Testa se a quantidade de consultas da matrícula em lote independe do tamanho do lote.
+        """
+        date_close = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        data = [
+            {"student": str(student.id), "course": str(self.course.id), "date_close": date_close}
+            for student in StudentFactory.create_batch(size=20)
+        ]
+
+        # Um UPDATE dos totais do curso; a última consulta busca os
+        # proprietários a notificar.
+        with self.assertNumQueries(8):
+            response = self.client.post(f"{self.url}bulk/", data[:5], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(8):
+            response = self.client.post(f"{self.url}bulk/", data[5:], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_create_enrollments_not_a_list(self):
+        """
+        Testa a matrícula em lote com um corpo que não é uma lista.
+        """
+        response = self.client.post(f"{self.url}bulk/", {"student": str(self.student.id)}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_create_enrollment_invalid_student(self):
         """
         Testa a criação de uma nova matrícula com um aluno inválido.
@@ -160,6 +326,137 @@ class TestEnrollment(TestVirtualEducation):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Enrollment.objects.count(), response.data['count'])
 
+    def test_list_enrollment_fast_path(self):
+        """
+        Testa se a listagem rápida de matrículas é idêntica à do serializador.
+        """
+        EnrollmentFactory.create_batch(size=4)
+        EnrollmentFactory(score=None, justification='Mudou de cidade', status='Desistiu')
+
+        self.assertFastListIdentical(EnrollmentViewSet, self.url)
+        self.assertFastListIdentical(EnrollmentViewSet, self.url, {'formato_data': 'iso'})
+        self.assertFastListIdentical(EnrollmentViewSet, self.url, {'paginacao': 'cursor', 'tamanho': 3})
+
+    def test_list_enrollment_cursor_pagination(self):
+        """
+        Testa a listagem de matrículas com paginação por cursor.
+        """
+        EnrollmentFactory.create_batch(size=11)
+
+        response = self.client.get(f"{self.url}?paginacao=cursor&tamanho=5")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+
+        ids = [enrollment['id'] for enrollment in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(enrollment['id'] for enrollment in response.data['results'])
+            next_url = response.data['next']
+
+        expected = Enrollment.objects.order_by('date_enroll', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, [str(id) for id in expected])
+
+    def test_list_enrollment_swagger_schema(self):
+        """
+        Testa se o esquema do swagger descreve a resposta paginada, cujo
+        total é ausente na paginação por cursor.
+        """
+        response = self.client.get('/swagger/', {'format': 'openapi'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        schema = json.loads(response.content)['paths'][self.url]['get']['responses']['200']['schema']
+        self.assertIn('count_is_estimate', schema['properties'])
+        self.assertEqual(schema['required'], ['results'])
+
+    def test_list_enrollment_exact_count(self):
+        """
+        Testa se listagens pequenas informam o total exato.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['count_is_estimate'])
+
+    @override_settings(
+        PAGINATION_EXACT_COUNT_THRESHOLD=2,
+        PAGINATION_ESTIMATE_COUNT_THRESHOLD=3
+    )
+    def test_list_enrollment_estimated_count(self):
+        """
+        Testa se listagens acima dos limites informam um total aproximado.
+        """
+        EnrollmentFactory.create_batch(size=5)
+
+        response = self.client.get(f"{self.url}?tamanho=2")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['count_is_estimate'])
+        self.assertGreaterEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(f"{self.url}?status=Andamento&tamanho=2")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['count_is_estimate'])
+        self.assertEqual(len(response.data['results']), 2)
+
+    @override_settings(
+        PAGINATION_EXACT_COUNT_THRESHOLD=1,
+        PAGINATION_ESTIMATE_COUNT_THRESHOLD=1000
+    )
+    def test_list_enrollment_cached_count_invalidation(self):
+        """
+        Testa se o total guardado em cache é invalidado ao criar uma matrícula.
+        """
+        EnrollmentFactory.create_batch(size=3)
+
+        response = self.client.get(f"{self.url}?status=Andamento")
+        self.assertFalse(response.data['count_is_estimate'])
+        self.assertEqual(response.data['count'], 4)
+
+        EnrollmentFactory()
+
+        response = self.client.get(f"{self.url}?status=Andamento")
+        self.assertEqual(response.data['count'], 5)
+
+    def test_retrieve_enrollment_expanded(self):
+        """
+        Testa a recuperação de uma matrícula com aluno e curso expandidos.
+        """
+        response = self.client.get(
+            f"{self.url}{self.enrollment.id}/?expandir=student,course"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["student"]["id"], self.student.id)
+        self.assertEqual(response.data["student"]["nickname"], self.user.nickname)
+        self.assertEqual(response.data["course"]["id"], str(self.course.id))
+        self.assertEqual(response.data["course"]["name"], self.course.name)
+
+    def test_retrieve_enrollment_expanded_student_queries(self):
+        """
+        Testa se o aluno expandido é carregado numa única consulta, sem o usuário completo.
+        """
+        with self.assertNumQueries(2) as context:
+            response = self.client.get(f"{self.url}{self.enrollment.id}/?expandir=student")
+
+        self.assertEqual(response.data["student"]["email"], self.user.email)
+        self.assertNotIn('password', context.captured_queries[1]['sql'])
+
+    def test_list_enrollment_expanded_constant_queries(self):
+        """
+        Testa se a listagem expandida não executa consultas por matrícula.
+        """
+        EnrollmentFactory.create_batch(size=10)
+
+        self.assertConstantQueries(self.url)
+        self.assertConstantQueries(self.url, {'expandir': 'student'})
+        self.assertConstantQueries(self.url, {'expandir': 'student,course'})
+
     def test_complete_enrollment_aprovado(self):
 
         # Call the method from EnrollmentService to test
@@ -194,6 +491,66 @@ class TestEnrollment(TestVirtualEducation):
             data['status']
         )
 
+    def test_retrieve_enrollment_conditional(self):
+        """
+        Testa o GET condicional da matrícula: com o ETag atual, a resposta é
+        304 após uma única consulta; alterações na matrícula ou nos objetos
+        expandidos geram um novo ETag.
+        """
+        url = f"{self.url}{self.enrollment.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(url, {"formato_data": "iso"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        iso_etag = response["ETag"]
+        self.assertNotEqual(iso_etag, etag)
+        response = self.client.get(url, {"formato_data": "iso"}, HTTP_IF_NONE_MATCH=iso_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        expanded_etag =self.client.get(url, {"expandir": "student"})["ETag"]
+        self.assertNotEqual(expanded_etag, etag)
+        self.user.nickname = "Jaden Yuki"
+        self.user.save()
+        response = self.client.get(url, {"expandir": "student"}, HTTP_IF_NONE_MATCH=expanded_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["student"]["nickname"], "Jaden Yuki")
+
+        self.client.patch(url, {"score": "9.5"})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.get(f"{self.url}{uuid.uuid4()}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_enrollment_if_match(self):
+        """
+        Testa a atualização com If-Match: recusada com 412 se a matrícula foi
+        alterada desde a versão lida.
+        """
+        url = f"{self.url}{self.enrollment.id}/"
+        etag = self.client.get(url)["ETag"]
+        score = self.enrollment.score
+
+        response = self.client.patch(url, {"score": "9.5"}, HTTP_IF_MATCH='"outra"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.score, score)
+
+        response = self.client.patch(url, {"score": "9.5"}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.patch(url, {"score": "3"}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.score, Decimal("9.5"))
+
     def test_update_enrollment_score(self):
         # Testando a atualização da nota de uma matrícula existente
         data = {
@@ -234,6 +591,140 @@ class TestEnrollment(TestVirtualEducation):
             'Desistiu'
         )
 
+    def test_update_enrollment_date_close_resets_expiry_notice(self):
+        """
+        Testa que um novo término libera o aviso de término já enviado.
+        """
+        notified = timezone.now()
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(date_expiry_notified=notified)
+        url = f"{self.url}{self.enrollment.id}/"
+
+        response = self.client.patch(url, {"justification": ""})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.date_expiry_notified, notified)
+
+        date_close = timezone.now() + timedelta(days=60)
+        response = self.client.patch(url, {"date_close": date_close.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.enrollment.refresh_from_db()
+        self.assertIsNone(self.enrollment.date_expiry_notified)
+        self.assertEqual(self.enrollment.status, 'Andamento')
+
+    def test_update_enrollment_queries(self):
+        """
+        Testa se a atualização da matrícula lê e grava a linha uma única vez.
+        """
+        url = f"{self.url}{self.enrollment.id}/"
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(url, {"score": "4"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [
+            query['sql'].split()[0] for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]
+        # Leitura da matrícula, UPDATE único, UPDATEs da matrícula em
+        # andamento do aluno e dos totais do curso e leitura da versão para
+        # o ETag.
+        self.assertEqual(
+            statements, ['SELECT', 'UPDATE', 'UPDATE', 'UPDATE', 'SELECT']
+        )
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.status, 'Reprovado')
+        self.assertEqual(response.data['status'], 'Reprovado')
+
+    def test_student_active_enrollment(self):
+        """
+        Testa a matrícula em andamento registrada no aluno ao matricular,
+        concluir e cancelar, e a verificação sem consultar as matrículas.
+        """
+        student = StudentFactory()
+        date_close = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        data = {
+            "student": str(student.id),
+            "course": str(self.course.id),
+            "date_close": date_close,
+        }
+
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        student.refresh_from_db()
+        self.assertEqual(str(student.active_enrollment_id), response.data['id'])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, {**data, "course": str(CourseFactory().id)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse([
+            query for query in context.captured_queries
+            if Enrollment._meta.db_table in query['sql']
+        ])
+
+        response = self.client.delete(f'/students/{student.id}/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.patch(f"{self.url}{student.active_enrollment_id}/", {"score": "7"})
+        student.refresh_from_db()
+        self.assertIsNone(student.active_enrollment_id)
+
+        response = self.client.post(f"{self.url}bulk/", [data], format='json')
+        student.refresh_from_db()
+        self.assertEqual(student.active_enrollment_id, response.data['results'][0]['id'])
+
+        EnrollmentService.cancel_enrollment(student.active_enrollment_id, 'Mudança')
+        student.refresh_from_db()
+        self.assertIsNone(student.active_enrollment_id)
+
+    def test_repair_active_enrollments(self):
+        """
+        Testa a correção das matrículas em andamento registradas nos alunos.
+        """
+        # A matrícula do setUp foi gravada sem passar pelo serviço.
+        completed = EnrollmentFactory(status='Aprovado')
+        completed.student.active_enrollment = completed
+        completed.student.save(update_fields=['active_enrollment'])
+
+        out = StringIO()
+        call_command('repair_active_enrollments', dry_run=True, stdout=out)
+        self.assertIn('2 divergências encontradas', out.getvalue())
+        self.student.refresh_from_db()
+        self.assertIsNone(self.student.active_enrollment_id)
+
+        call_command('repair_active_enrollments', batch_size=1, stdout=out)
+        self.student.refresh_from_db()
+        completed.student.refresh_from_db()
+        self.assertEqual(self.student.active_enrollment_id, self.enrollment.id)
+        self.assertIsNone(completed.student.active_enrollment_id)
+
+        out = StringIO()
+        call_command('repair_active_enrollments', stdout=out)
+        self.assertIn('0 divergências corrigidas', out.getvalue())
+
+    def test_update_enrollment_invalid_transition(self):
+        """
+        Testa se uma matrícula concluída não pode ser cancelada nem ter o
+        resultado alterado.
+        """
+        url = f"{self.url}{self.enrollment.id}/"
+        self.client.patch(url, {"score": "9"})
+
+        response = self.client.patch(url, {"justification": "Desisti"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data)
+
+        response = self.client.patch(url, {"score": "2"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.patch(url, {"score": "8"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.status, 'Aprovado')
+        self.assertEqual(self.enrollment.score, 8)
+        self.assertIsNone(self.enrollment.justification)
+
     def test_update_enrollment_data(self):
         # Testando a atualização dos dados de uma matrícula existente
 
@@ -436,9 +927,297 @@ class TestEnrollment(TestVirtualEducation):
         self.assertEqual(response.data['count'], date_enrollments)
 
     def test_apagar_enrollment(self):
-        # Testa a filtragem de matrículas encerradas a partir de uma data
+        # Testa a exclusão da matrícula, descontada dos totais do curso
+        stats = self.enrollment.course.stats
+        stats.refresh_from_db()
+        in_progress = stats.in_progress
 
         response = self.client.delete(f"{self.url}{self.enrollment.id}/")
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Enrollment.objects.filter(id=self.enrollment.id))
+        stats.refresh_from_db()
+        self.assertEqual(stats.in_progress, in_progress - 1)
+
+    def test_enrollment_status_code(self):
+        """
+        Testa se o status é gravado como código e exposto pelo nome.
+        """
+        self.enrollment.status = 'Reprovado'
+        self.enrollment.save()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT status FROM virtual_education_enrollment WHERE id = %s',
+                [self.enrollment.id.hex]
+            )
+            self.assertEqual(cursor.fetchone()[0], Enrollment.STATUS_CODES['Reprovado'])
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.status, 'Reprovado')
+        self.assertTrue(Enrollment.objects.filter(status__iexact='reprovado').exists())
+        self.assertFalse(Enrollment.objects.filter(status__iexact='outro').exists())
+        self.assertEqual(
+            list(Enrollment.objects.values_list('status', flat=True)), ['Reprovado']
+        )
+
+        response = self.client.get(self.url, {'status': 'REPROVADO'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['status'], 'Reprovado')
+
+        with self.assertRaises(ValueError):
+            Enrollment.objects.filter(status='Outro').exists()
+
+    def test_benchmark_enrollment_status(self):
+        """
+        Testa o benchmark do status como código, que não deve manter os dados semeados.
+        """
+        enrollments = Enrollment.objects.count()
+        out = StringIO()
+
+        call_command(
+            'benchmark_enrollment_status',
+            students=10, courses=2, repeat=1, stdout=out
+        )
+
+        self.assertIn('enrollment_course_status_idx: texto', out.getvalue())
+        self.assertIn('código: mediana', out.getvalue())
+        self.assertEqual(Enrollment.objects.count(), enrollments)
+
+    def test_benchmark_enrollment_indexes(self):
+        # Testa o benchmark dos índices de matrícula, que não deve manter os dados semeados
+        enrollments = Enrollment.objects.count()
+        out = StringIO()
+
+        call_command(
+            'benchmark_enrollment_indexes',
+            students=10, courses=2, repeat=1, stdout=out
+        )
+
+        self.assertIn('Sem índices', out.getvalue())
+        self.assertIn('enrollment_student_status_idx', out.getvalue())
+        self.assertEqual(Enrollment.objects.count(), enrollments)
+
+    def test_benchmark_bulk_enrollment(self):
+        # Testa o benchmark da matrícula em lote, que não deve manter os dados semeados
+        enrollments = Enrollment.objects.count()
+        out = StringIO()
+
+        call_command('benchmark_bulk_enrollment', enrollments=5, courses=2, stdout=out)
+
+        self.assertIn('Em lote: 5 matrículas', out.getvalue())
+        self.assertEqual(Enrollment.objects.count(), enrollments)
+
+    def test_notify_enrollments_near_to_expire(self):
+        """
+        Testa os avisos de término, que não devem se repetir ao reexecutar a tarefa.
+        """
+        self.use_eager_celery()
+
+        expiring = [
+            EnrollmentFactory(date_close=datetime.now() + timedelta(days=3))
+            for _ in range(5)
+        ]
+        EnrollmentFactory(
+            date_close=datetime.now() + timedelta(days=3), status='Aprovado'
+        )
+
+        notify_enrollments_near_to_expire.delay(chunk_size=2)
+        notify_enrollments_near_to_expire.delay(chunk_size=2)
+
+        self.assertCountEqual(
+            Notification.objects.values_list('recipient', flat=True),
+            [enrollment.student.user.email for enrollment in expiring]
+        )
+        self.assertEqual(
+            Enrollment.objects.filter(date_expiry_notified__isnull=False).count(),
+            len(expiring)
+        )
+
+    def test_celery_task_routes(self):
+        """
+        Testa as filas das tarefas e a agenda do celery beat.
+        """
+        for task, queue in (
+            (notify_enrollments_near_to_expire, 'notifications'),
+            (notify_expiring_enrollments_chunk, 'notifications'),
+            (deliver_notifications, 'notifications'),
+            (reconcile_course_stats, 'maintenance'),
+            (rebuild_course_stats_chunk, 'maintenance'),
+        ):
+            self.assertEqual(app.amqp.router.route({}, task.name)['queue'].name, queue)
+
+        scheduled = {entry['task'] for entry in app.conf.beat_schedule.values()}
+        self.assertIn(notify_enrollments_near_to_expire.name, scheduled)
+        self.assertIn(deliver_notifications.name, scheduled)
+        self.assertEqual(app.conf.worker_prefetch_multiplier, 1)
+        self.assertTrue(app.conf.task_acks_late)
+
+    def test_celery_task_results(self):
+        """
+        Testa que apenas as tarefas de reconstrução gravam resultados, que
+        expiram e são removidos pela tarefa de limpeza.
+        """
+        for task in (
+            notify_enrollments_near_to_expire,
+            notify_expiring_enrollments_chunk,
+            deliver_notifications,
+            reconcile_course_stats,
+        ):
+            self.assertTrue(task.ignore_result)
+        self.assertFalse(rebuild_course_stats_chunk.ignore_result)
+        self.assertNotEqual(app.conf.result_backend, 'django-db')
+        self.assertTrue(app.conf.result_expires)
+
+        self.assertEqual(
+            app.conf.beat_schedule['celery.backend_cleanup']['task'], 'celery.backend_cleanup'
+        )
+        self.assertEqual(
+            app.amqp.router.route({}, 'celery.backend_cleanup')['queue'].name, 'maintenance'
+        )
+
+    def test_benchmark_expiry_pipeline(self):
+        # Testa o benchmark dos avisos de término, que não deve manter os dados semeados
+        enrollments = Enrollment.objects.count()
+        out = StringIO()
+
+        call_command('benchmark_expiry_pipeline', students=4, courses=2, chunk_size=1, stdout=out)
+
+        self.assertIn('broker em memória: 2 matrículas, 3 mensagens', out.getvalue())
+        self.assertIn('eager: 2 matrículas', out.getvalue())
+        self.assertEqual(Enrollment.objects.count(), enrollments)
+        self.assertFalse(app.conf.task_always_eager)
+
+    def test_notify_students_of_enrollment(self):
+        # Testa a mensagem de aviso de término da matrícula
+        self.enrollment.date_close = timezone.now() + timedelta(days=5, hours=1)
+
+        message = EnrollmentService.notify_students_of_enrollment(self.enrollment)
+
+        self.assertEqual(
+            message,
+            f'Faltam 5 dias para o término do curso {self.course.name}'
+        )
+
+    def test_bulk_create_enrollments_notifies_owner(self):
+        """
+        Testa se o proprietário recebe uma única mensagem pelas matrículas em lote.
+        """
+        owner = OwnerFactory(courses=self.course)
+        date_close = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        data = [
+            {"student": str(student.id), "course": str(self.course.id), "date_close": date_close}
+            for student in StudentFactory.create_batch(size=5)
+        ]
+
+        self.client.post(f"{self.url}bulk/", data[:3], format='json')
+        self.client.post(f"{self.url}bulk/", data[3:], format='json')
+
+        self.assertEqual(
+            list(Notification.objects.values_list('recipient', flat=True)),
+            [owner.user.email] * 2
+        )
+
+        MemoryBackend.outbox = []
+        with override_settings(
+            NOTIFICATION_BACKEND='apps.virtual_education.notifications.backends.MemoryBackend'
+        ):
+            self.assertEqual(deliver_notifications()['rows'], 2)
+            self.assertEqual(deliver_notifications()['rows'], 0)
+
+        self.assertEqual(len(MemoryBackend.outbox), 1)
+        message = MemoryBackend.outbox[0]
+        self.assertEqual(message.recipient, owner.user.email)
+        self.assertEqual(message.subject, 'Você tem 2 novas notificações')
+        self.assertIn(f'O curso {self.course.name} possui 3 novas matrículas.', message.body)
+
+    def test_deliver_notifications_failure(self):
+        """
+        Testa se as notificações continuam pendentes quando a entrega falha.
+        """
+        NotificationService.queue([('a@exemplo.com', 'Um'), ('b@exemplo.com', 'Dois')])
+
+        class FailingBackend(MemoryBackend):
+            def send_messages(self, messages):
+                raise ConnectionError('Servidor indisponível')
+
+        with self.assertRaises(ConnectionError):
+            NotificationService.deliver_pending(backend=FailingBackend())
+        self.assertEqual(Notification.objects.filter(date_sent__isnull=True).count(), 2)
+
+        MemoryBackend.outbox = []
+        self.assertEqual(
+            NotificationService.deliver_pending(batch_size=1, backend=MemoryBackend()),
+            2
+        )
+        self.assertEqual(
+            [message.recipient for message in MemoryBackend.outbox],
+            ['a@exemplo.com', 'b@exemplo.com']
+        )
+
+    def test_benchmark_serializer_formatting(self):
+        # Testa o benchmark da formatação de datas dos serializadores
+        out = StringIO()
+
+        call_command('benchmark_serializer_formatting', enrollments=10, repeat=1, stdout=out)
+
+        self.assertIn('Anterior:', out.getvalue())
+        self.assertIn('Atual: construção de 1000 serializadores', out.getvalue())
+
+    def test_benchmark_list_serializers(self):
+        # Testa o benchmark das listagens, que não deve manter os dados semeados
+        enrollments = Enrollment.objects.count()
+        out = StringIO()
+
+        call_command(
+            'benchmark_list_serializers',
+            students=5, courses=2, page_sizes=[2], repeat=1, stdout=out
+        )
+
+        self.assertIn('/enrollments/ tamanho=2: serializador', out.getvalue())
+        self.assertEqual(Enrollment.objects.count(), enrollments)
+
+    def test_export_enrollments(self):
+        """
+        Testa a exportação das matrículas filtradas em CSV, NDJSON e gzip.
+        """
+        EnrollmentFactory.create_batch(size=4, status='Aprovado')
+        EnrollmentFactory.create_batch(size=2, status='Desistiu')
+        listed = self.client.get(
+            self.url, {'status': 'Aprovado', 'tamanho': 100}, format='json'
+        ).json()['results']
+
+        with override_settings(EXPORT_CHUNK_SIZE=3), self.assertNumQueries(1):
+            response = self.client.get(f"{self.url}export/", {'status': 'Aprovado'})
+            content = b''.join(response.streaming_content)
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('matriculas.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertCountEqual(
+            [row['id'] for row in rows], [enrollment['id'] for enrollment in listed]
+        )
+
+        response = self.client.get(
+            f"{self.url}export/", {'status': 'Aprovado', 'formato': 'ndjson'}
+        )
+        content = b''.join(response.streaming_content)
+        self.assertCountEqual(
+            [json.loads(line) for line in content.decode().splitlines()], listed
+        )
+
+        response = self.client.get(
+            f"{self.url}export/",
+            {'status': 'Aprovado', 'formato': 'ndjson', 'compactar': 'true'}
+        )
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), content)
+
+    def test_export_enrollments_invalid_format(self):
+        """
+        Testa a exportação das matrículas num formato não suportado.
+        """
+        response = self.client.get(f"{self.url}export/", {'formato': 'xlsx'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('formato', response.data)
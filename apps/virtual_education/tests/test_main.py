@@ -1,6 +1,13 @@
+from unittest import mock
+
 import faker
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from e_learning.celery import app
+
 
 class TestVirtualEducation(APITestCase):
 
@@ -9,3 +16,50 @@ class TestVirtualEducation(APITestCase):
         cls.fake = faker.Faker('pt_BR')
         cls.client = APIClient()
         return super().setUpTestData()
+
+    def use_eager_celery(self):
+        """
+        Executa as tarefas do Celery localmente, com broker e resultados em
+        memória, até o fim do teste.
+        """
+        for key, value in (
+            ('CELERY_TASK_ALWAYS_EAGER', True),
+            ('CELERY_BROKER_URL', 'memory://'),
+            ('CELERY_RESULT_BACKEND', 'cache+memory://'),
+        ):
+            self.addCleanup(app.conf.__setitem__, key, app.conf.get(key))
+            app.conf[key] = value
+
+    def assertConstantQueries(self, url, params=None, page_sizes=(1, 5, 10)):
+        """
+        Verifica se a listagem executa a mesma quantidade de consultas
+        independente do tamanho da página.
+        """
+        queries = {}
+        for page_size in page_sizes:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(
+                    url, {**(params or {}), 'tamanho': page_size}
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), page_size)
+            queries[page_size] = len(context)
+
+        self.assertEqual(
+            len(set(queries.values())), 1,
+            f'Consultas por tamanho de página: {queries}'
+        )
+
+    def assertFastListIdentical(self, viewset, url, params=None):
+        """
+        Verifica se a listagem rápida (`FastListMixin`) gera exatamente o
+        mesmo JSON da listagem pelo serializador.
+        """
+        responses = []
+        for fast_list in (True, False):
+            with mock.patch.object(viewset, 'fast_list', fast_list):
+                response = self.client.get(url, params or {}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            responses.append(response.content)
+
+        self.assertEqual(responses[0], responses[1])
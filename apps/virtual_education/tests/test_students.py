@@ -1,13 +1,22 @@
 from datetime import datetime, timedelta
+from io import StringIO
+import json
+import os
+import tempfile
+from unittest import mock
 import uuid
+from django.core.management import call_command
 from rest_framework import status
 from apps.virtual_education.filters.students import StudentFilter
 
 from apps.virtual_education.models import Enrollment, Student, User
+from apps.virtual_education.serializers.students import StudentSerializer
+from apps.virtual_education.services.students import StudentService
 from apps.virtual_education.tests.factories.enrollments import EnrollmentFactory
 from apps.virtual_education.tests.factories.students import StudentFactory, UserFactory
 from apps.virtual_education.tests.factories.courses import CourseFactory
 from apps.virtual_education.tests.test_main import TestVirtualEducation
+from apps.virtual_education.views.students import StudentViewSet
 
 
 class TestStudent(TestVirtualEducation):
@@ -35,6 +44,90 @@ class TestStudent(TestVirtualEducation):
         self.assertEqual(Student.objects.count(), students + 1)
         self.assertTrue(Student.objects.filter(user__nickname=data["nickname"]))
 
+    def test_bulk_create_students(self):
+        """
+        Testa o cadastro de alunos em lote.
+        Verifica se os usuários recebem o nome de usuário e o primeiro nome
+        derivados do email e do apelido, e se emails repetidos são rejeitados
+        individualmente sem interromper o lote.
+        """
+        data = [
+            {"nickname": "Nezuko", "phone": self.fake.phone_number(), "email": "nezuko@example.com"},
+            {"nickname": "Zenitsu", "phone": self.fake.phone_number(), "email": "zenitsu@example.com"},
+            {"nickname": "Inosuke", "phone": self.fake.phone_number(), "email": self.user.email},
+            {"nickname": "Nezuko", "phone": self.fake.phone_number(), "email": "nezuko@example.com"},
+            {"nickname": "Kanao", "phone": self.fake.phone_number()},
+        ]
+
+        students = Student.objects.count()
+
+        response = self.client.post(f"{self.url}bulk/", data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(Student.objects.count(), students + 2)
+        self.assertEqual(
+            [result['created'] for result in response.data['results']],
+            [True, True, False, False, False]
+        )
+        self.assertIn('email', response.data['results'][2]['errors'])
+        self.assertIn('email', response.data['results'][3]['errors'])
+
+        user = User.objects.get(email='nezuko@example.com')
+        self.assertEqual(user.username, user.email)
+        self.assertEqual(user.first_name, 'Nezuko')
+        self.assertEqual(str(user.student.id), str(response.data['results'][0]['id']))
+
+    def test_bulk_create_students_streaming(self):
+        """
+        Testa o cadastro de alunos em lote com a resposta transmitida em
+        NDJSON a cada lote, seguida dos totais.
+        """
+        data = [
+            {"nickname": "Tanjiro", "phone": self.fake.phone_number(), "email": "tanjiro@example.com"},
+            {"nickname": "Inosuke", "phone": self.fake.phone_number(), "email": self.user.email},
+            {"nickname": "Genya", "phone": self.fake.phone_number(), "email": "genya@example.com"},
+        ]
+
+        with mock.patch.object(StudentService, 'BULK_CHUNK_SIZE', 2):
+            response = self.client.post(
+                f"{self.url}bulk/?formato=ndjson", data, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            chunks = list(response.streaming_content)
+
+        # Um trecho por lote e um com os totais.
+        self.assertEqual(len(chunks), 3)
+        lines = [json.loads(line) for line in b''.join(chunks).decode().splitlines()]
+        self.assertEqual(
+            [line['created'] for line in lines[:3]], [True, False, True]
+        )
+        self.assertIn('email', lines[1]['errors'])
+        self.assertEqual(lines[3], {'created': 2, 'failed': 1})
+        self.assertTrue(User.objects.filter(email='genya@example.com').exists())
+
+    def test_import_students_command(self):
+        """
+        Testa a importação de alunos a partir de um arquivo CSV.
+        Verifica se o progresso é informado a cada lote e se as linhas com
+        erro são reportadas sem interromper a importação.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('nickname,email,phone\n')
+            file.write('Rengoku,rengoku@example.com,1111-1111\n')
+            file.write(f'Uzui,{self.user.email},2222-2222\n')
+            file.write('Gyomei,gyomei@example.com,3333-3333\n')
+        self.addCleanup(os.remove, file.name)
+
+        out, err = StringIO(), StringIO()
+        call_command('import_students', file.name, batch_size=2, stdout=out, stderr=err)
+
+        self.assertIn('2 processados', out.getvalue())
+        self.assertIn('Importação concluída: 2 cadastrados, 1 com erro.', out.getvalue())
+        self.assertIn('Linha 3', err.getvalue())
+        self.assertTrue(Student.objects.filter(user__email='gyomei@example.com').exists())
+
     def test_create_student_without_nickname(self):
         """
         Testa a criação de um novo aluno sem o campo nickname.
@@ -112,6 +205,58 @@ class TestStudent(TestVirtualEducation):
         self.assertEqual(response.data["id"], self.student.id)
         self.assertEqual(response.data["nickname"], self.student.user.nickname)
 
+    def test_retrieve_student_queries(self):
+        """
+        Testa se a recuperação de um aluno lê os dados do usuário na mesma consulta.
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(f"{self.url}{self.student.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertEqual(response.data["phone"], self.user.phone)
+
+    def test_retrieve_student_conditional(self):
+        """
+        Testa o GET condicional do aluno, cujo ETag acompanha o usuário.
+        """
+        url = f"{self.url}{self.student.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(url, {"phone": "9999-9999"}, format="json")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["phone"], "9999-9999")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_student_read_model_representation(self):
+        """
+        Testa se a representação dos alunos do read model não consulta os usuários.
+        """
+        StudentFactory.create_batch(size=5)
+        students = list(Student.objects.read_model().order_by('user__email'))
+
+        with self.assertNumQueries(0):
+            data = StudentSerializer(students, many=True).data
+
+        self.assertEqual(
+            [student['email'] for student in data],
+            list(User.objects.order_by('email').values_list('email', flat=True))
+        )
+
+    def test_list_student_serializer_constant_queries(self):
+        """
+        Testa se a listagem pelo serializador não executa consultas por aluno.
+        """
+        StudentFactory.create_batch(size=10)
+
+        with mock.patch.object(StudentViewSet, 'fast_list', False):
+            self.assertConstantQueries(self.url)
+
     def test_retrieve_student_not_found(self):
         """
         Testa a recuperação de um aluno inexistente.
@@ -136,6 +281,46 @@ class TestStudent(TestVirtualEducation):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Student.objects.count(), response.data['count'])
 
+    def test_list_student_fast_path(self):
+        """
+        Testa se a listagem rápida de alunos é idêntica à do serializador.
+        """
+        StudentFactory.create_batch(size=5)
+
+        self.assertFastListIdentical(StudentViewSet, self.url)
+        self.assertFastListIdentical(StudentViewSet, self.url, {'paginacao': 'cursor', 'tamanho': 3})
+
+    def test_list_student_cursor_pagination(self):
+        """
+        Testa a listagem de alunos com paginação por cursor.
+        Verifica se a resposta não possui contagem total
+        e se a navegação pelos cursores percorre todos os alunos uma única vez.
+        """
+        StudentFactory.create_batch(size=6)
+
+        response = self.client.get(f"{self.url}?paginacao=cursor&tamanho=4")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+
+        ids = [student['id'] for student in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            ids.extend(student['id'] for student in response.data['results'])
+            next_url = response.data['next']
+
+        expected = Student.objects.order_by('date_created', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+        # A página seguinte percorre o índice (date_created, id), sem ordenar.
+        last = Student.objects.order_by('date_created', 'id').last()
+        plan = Student.objects.filter(
+            date_created__gte=last.date_created
+        ).order_by('date_created', 'id')[:4].explain()
+        self.assertIn('student_date_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
     def test_update_student_nickname(self):
         """
         Testa a atualização do apelido (nickname) de um aluno existente.
@@ -362,3 +547,88 @@ class TestStudent(TestVirtualEducation):
 
         for student in response.data['results']:
             self.assertIn(filter_params['email'], student['email'])
+
+    def test_export_students(self):
+        """
+        Testa a exportação dos alunos filtrados pelo apelido em CSV.
+        """
+        StudentFactory.create_batch(size=3)
+
+        response = self.client.get(f"{self.url}export/", {'nickname': 'tanjiro'})
+        content = b''.join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            content,
+            'id,nickname,phone,email\n'
+            f'{self.student.id},{self.user.nickname},{self.user.phone},{self.user.email}\n'
+        )
+
+    def test_autocomplete_students(self):
+        """
+        Testa o autocomplete de alunos pelo apelido e pelo email,
+        sem distinguir acentos e maiúsculas.
+        """
+        for nickname, email in [
+            ('Conceição Lima', 'lima@example.com'),
+            ('Conrado', 'conrado@example.com'),
+            ('Zélia', 'concurso@example.com'),
+            ('Muzan', 'muzan@example.com'),
+        ]:
+            StudentFactory(user=UserFactory(nickname=nickname, email=email))
+
+        response = self.client.get(f'{self.url}autocomplete/', {'busca': 'CON'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [student['nickname'] for student in response.data],
+            ['Conceição Lima', 'Zélia', 'Conrado']
+        )
+
+        response = self.client.get(f'{self.url}autocomplete/', {'busca': 'conceicao'})
+        self.assertEqual([student['email'] for student in response.data], ['lima@example.com'])
+
+        response = self.client.get(f'{self.url}autocomplete/', {'busca': 'con', 'limite': 1})
+        self.assertEqual(len(response.data), 1)
+
+        response = self.client.get(f'{self.url}autocomplete/', {'busca': ' '})
+        self.assertEqual(response.data, [])
+
+        response = self.client.get(f'{self.url}autocomplete/', {'busca': 'con', 'limite': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_student_search_keys_sync(self):
+        """
+        Testa se as chaves de busca do aluno acompanham o cadastro em lote e
+        as alterações do usuário.
+        """
+        response = self.client.post(
+            f'{self.url}bulk/', [{"nickname": "Gyōmei", "phone": "1", "email": "Gyomei@Example.com"}],
+            format='json'
+        )
+        student = Student.objects.get(id=response.data['results'][0]['id'])
+        self.assertEqual(student.nickname_key, 'gyomei')
+        self.assertEqual(student.email_key, 'gyomei@example.com')
+
+        self.user.nickname = 'Kamado Tanjirô'
+        self.user.save()
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.nickname_key, 'kamado tanjiro')
+
+        response = self.client.patch(
+            f'{self.url}{self.student.id}/', {'email': 'kamado@example.com'}, format='json'
+        )
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.email_key, 'kamado@example.com')
+
+    def test_benchmark_student_autocomplete(self):
+        """
+        Testa o benchmark do autocomplete, que não deve manter os dados semeados.
+        """
+        students = Student.objects.count()
+        out = StringIO()
+
+        call_command('benchmark_student_autocomplete', students=20, repeat=1, stdout=out)
+
+        self.assertIn('(autocomplete): mediana', out.getvalue())
+        self.assertEqual(Student.objects.count(), students)
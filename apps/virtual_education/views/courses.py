@@ -1,22 +1,65 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 
+from apps.virtual_education.analytics import get_course_analytics
+from apps.virtual_education.mixins.fast_list import FastListMixin
+from apps.virtual_education.mixins.response_cache import ResponseCacheMixin
 from apps.virtual_education.filters.courses import CourseFilter
-from apps.virtual_education.models import Course
-from apps.virtual_education.serializers.courses import CourseSerializer
+from apps.virtual_education.models import Course, CourseStats
+from apps.virtual_education.serializers.courses import CourseSerializer, CourseStatsSerializer
+from apps.virtual_education.serializers.enrollments import EnrollmentGradeSerializer
 from apps.virtual_education.services.courses import CourseService
+from apps.virtual_education.services.enrollments import EnrollmentService
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ResponseCacheMixin, FastListMixin, viewsets.ModelViewSet):
     """
     API para gerenciamento de cursos.
     """
-    queryset = Course.objects.all()
+    queryset = Course.objects.select_related('stats').all()
     serializer_class = CourseSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = CourseFilter
+    cursor_ordering = ('date_created', 'id')
+    # A representação do curso inclui os totais de matrículas, que mudam a
+    # cada matrícula: cada resposta depende apenas dos totais dos seus
+    # cursos, salvo quando filtrada ou ordenada por eles.
+    cache_object_models = (CourseStats,)
+    last_modified_lookups = ('date_updated', 'stats__date_updated')
+
+    def get_cache_models(self):
+        models = super().get_cache_models()
+        if self.request is not None and self.filters_by_stats():
+            models += (CourseStats,)
+        return models
+
+    def filters_by_stats(self):
+        """
+        Indica se a requisição filtra ou ordena os cursos pelos totais.
+        """
+        params = self.request.query_params
+        ordering = CourseFilter.base_filters['ordenar'].param_map
+        return any(key.startswith('stats__') for key in params) or any(
+            ordering.get(value.strip().lstrip('-'), '').startswith('stats__')
+            for value in params.get('ordenar', '').split(',')
+        )
+
+    @swagger_auto_schema(
+        operation_description="Lista os cursos.",
+        manual_parameters=[CourseSerializer.datetime_format_parameter],
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description="Recupera um curso.",
+        manual_parameters=[CourseSerializer.datetime_format_parameter],
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_description="Exclui um curso, verificando se possui matrículas associadas.",
@@ -54,3 +97,63 @@ class CourseViewSet(viewsets.ModelViewSet):
         days_remaining = request.data.get('days_remaining')
         CourseService.notify_expiring_enrollments(instance, days_remaining)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Lança as notas dos alunos do curso, concluindo as matrículas em "
+            "andamento numa única operação."
+        ),
+        request_body=EnrollmentGradeSerializer(many=True),
+        responses={
+            status.HTTP_200_OK: "Todas as matrículas foram concluídas.",
+            status.HTTP_207_MULTI_STATUS: "Algumas matrículas não foram concluídas.",
+            status.HTTP_400_BAD_REQUEST: "Planilha de notas inválida.",
+        },
+    )
+    @action(detail=True, methods=['post'], url_path='grades')
+    def grade(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = EnrollmentGradeSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        results = EnrollmentService.grade_course(instance, serializer.validated_data)
+
+        failed = sum(1 for result in results if not result['graded'])
+        data = {
+            'graded': len(results) - failed,
+            'failed': failed,
+            'results': results,
+        }
+        return Response(
+            data=data,
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK
+        )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Retorna os totais de matrículas do curso por status e a média "
+            "das notas, sem agregar as matrículas."
+        ),
+        responses={status.HTTP_200_OK: CourseStatsSerializer},
+    )
+    @action(detail=True, methods=['get'], filter_backends=[])
+    def stats(self, request, *args, **kwargs):
+        instance = self.get_object()
+        try:
+            stats = instance.stats
+        except CourseStats.DoesNotExist:
+            # Curso criado em lote, ainda sem totais reconstruídos.
+            stats = CourseStats(course=instance)
+        serializer = CourseStatsSerializer(stats, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Retorna a análise das notas do curso, no total e por mês de "
+            "matrícula: taxa de aprovação, média, percentis e histograma."
+        ),
+        responses={status.HTTP_200_OK: "Análise das notas do curso."},
+    )
+    @action(detail=True, methods=['get'], filter_backends=[])
+    def analytics(self, request, *args, **kwargs):
+        return Response(get_course_analytics(self.get_object()))
@@ -1,15 +1,26 @@
+from collections.abc import Iterator
+
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
+from apps.parsers import NDJSONParser
+from apps.virtual_education.mixins.conditional import ConditionalRequestMixin
+from apps.virtual_education.mixins.export import ExportMixin
+from apps.virtual_education.mixins.fast_list import FastListMixin
 from apps.virtual_education.models import Enrollment
 from apps.virtual_education.filters.enrollments import EnrollmentFilter
 from apps.virtual_education.serializers.enrollments import EnrollmentSerializer
-from apps.virtual_education.services.enrollments import EnrollmentService
+from apps.virtual_education.services.enrollments import ActiveEnrollmentError, EnrollmentService
 
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+class EnrollmentViewSet(ConditionalRequestMixin, ExportMixin, FastListMixin, viewsets.ModelViewSet):
     """
     API para gerenciamento de matrículas.
     """
@@ -17,6 +28,89 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     serializer_class = EnrollmentSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = EnrollmentFilter
+    export_filename = 'matriculas'
+    cursor_ordering = ('date_enroll', 'id')
+    expand_query_param = 'expandir'
+    etag_query_params = ('formato_data', 'expandir')
+    # Versões dos objetos expandidos, que também compõem o ETag.
+    expand_version_lookups = {
+        'student': ('student__user__date_updated',),
+        'course': ('course__date_updated', 'course__stats__date_updated'),
+    }
+
+    expand_parameter = openapi.Parameter(
+        name='expandir',
+        in_=openapi.IN_QUERY,
+        description=(
+            'Campos representados por completo, separados por vírgula: '
+            'student, course.'
+        ),
+        type=openapi.TYPE_STRING
+    )
+
+    def get_expand(self):
+        """
+        Retorna os campos expandidos solicitados na requisição.
+        """
+        if self.request is None:
+            return []
+
+        requested = self.request.query_params.get(self.expand_query_param, '')
+        return [
+            field_name for field_name in EnrollmentSerializer.expandable_fields
+            if field_name in requested.split(',')
+        ]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        related_lookups = EnrollmentSerializer.get_related_lookups(self.get_expand())
+        select_related = [
+            lookup for lookup in related_lookups if isinstance(lookup, str)
+        ]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetch_related = [
+            lookup for lookup in related_lookups if isinstance(lookup, Prefetch)
+        ]
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    def get_version_lookups(self):
+        return super().get_version_lookups() + tuple(
+            lookup
+            for field_name in self.get_expand()
+            for lookup in self.expand_version_lookups[field_name]
+        )
+
+    def get_read_plan(self):
+        # Campos expandidos usam a representação dos serializadores aninhados.
+        if self.get_expand():
+            return None
+        return super().get_read_plan()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+    @swagger_auto_schema(
+        operation_description="Lista as matrículas.",
+        manual_parameters=[
+            expand_parameter, EnrollmentSerializer.datetime_format_parameter
+        ],
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description="Recupera uma matrícula.",
+        manual_parameters=[
+            expand_parameter, EnrollmentSerializer.datetime_format_parameter
+        ],
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_description="Cria uma nova matrícula de um aluno em um curso.",
@@ -32,39 +126,68 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.validated_data)
 
         try:
-            EnrollmentService.enroll_student(
-                validated_data=serializer.validated_data
-            )
-        except Exception as exc:
-            data = {'student': str(exc.args)}
+            EnrollmentService.enroll_student(serializer)
+        except ActiveEnrollmentError as exc:
+            data = {'student': str(exc)}
             return Response(
                 data=data, status=status.HTTP_400_BAD_REQUEST, headers=headers
             )
-        self.perform_create(serializer)
 
         return Response(
             data=serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
 
     @swagger_auto_schema(
-        operation_description="Atualiza uma matrícula existente.",
+        operation_description=(
+            "Matricula alunos em lote. Aceita uma lista JSON ou NDJSON "
+            "(application/x-ndjson), uma matrícula por linha."
+        ),
+        request_body=EnrollmentSerializer(many=True),
+        responses={
+            status.HTTP_201_CREATED: "Todas as matrículas foram criadas.",
+            status.HTTP_207_MULTI_STATUS: "Algumas matrículas não foram criadas.",
+            status.HTTP_400_BAD_REQUEST: "O corpo da requisição não é uma lista.",
+        },
     )
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        if 'score' in serializer.validated_data:
-            EnrollmentService.complete_enrollment(
-                instance.student, instance.course, instance.score
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, (list, Iterator)):
+            return Response(
+                data={'non_field_errors': ['Esperada uma lista de matrículas.']},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        if 'student' in serializer.validated_data or 'course' in serializer.validated_data:
-            EnrollmentService.enroll_student(serializer.validated_data)
-        EnrollmentService.notify_course_owner(
-            instance.course, new_enrollments=[instance.pk]
+
+        serializer = self.get_serializer(many=True)
+        results = EnrollmentService.bulk_enroll_students(serializer, request.data)
+
+        failed = sum(1 for result in results if not result['created'])
+        data = {
+            'created': len(results) - failed,
+            'failed': failed,
+            'results': results,
+        }
+        return Response(
+            data=data,
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED
         )
 
-        if 'justification' in serializer.validated_data:
-            EnrollmentService.cancel_enrollment(
-                instance.id, serializer.validated_data['justification']
+    @swagger_auto_schema(
+        operation_description=(
+            "Atualiza uma matrícula existente. Com If-Match, a atualização só "
+            "é aplicada se a matrícula não foi alterada desde a versão lida."
+        ),
+    )
+    def perform_update(self, serializer):
+        self.check_precondition()
+        try:
+            EnrollmentService.update_enrollment(
+                serializer.instance, serializer.validated_data
             )
+        except ActiveEnrollmentError as exc:
+            raise ValidationError({'student': str(exc)})
+
+    def perform_destroy(self, instance):
+        EnrollmentService.delete_enrollment(instance)
 
     @swagger_auto_schema(
         operation_description="Cancela uma matrícula existente.",
@@ -72,7 +195,7 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     def cancel_enrollment(self, request, *args, **kwargs):
         instance = self.get_object()
         justification = request.data.get('justification')
-        EnrollmentService.cancel_enrollment(instance.student, instance.course, justification)
+        EnrollmentService.cancel_enrollment(instance.id, justification)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @swagger_auto_schema(
@@ -1,16 +1,28 @@
+from collections.abc import Iterator
+
+from django.http import StreamingHttpResponse
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.viewsets import ModelViewSet
 
+from apps.parsers import NDJSONParser
+from apps.streaming import ndjson_stream
+from apps.virtual_education.mixins.conditional import ConditionalRequestMixin
+from apps.virtual_education.mixins.export import ExportMixin
+from apps.virtual_education.mixins.fast_list import FastListMixin
 from apps.virtual_education.models import Student
 from apps.virtual_education.serializers.students import StudentSerializer
 from apps.virtual_education.filters.students import StudentFilter
+from apps.virtual_education.search import search_students
 from apps.virtual_education.services.students import StudentService
 
 
-class StudentViewSet(ModelViewSet):
+class StudentViewSet(ConditionalRequestMixin, ExportMixin, FastListMixin, ModelViewSet):
     """
     API para gerenciamento de alunos.
     """
@@ -18,6 +30,19 @@ class StudentViewSet(ModelViewSet):
     serializer_class = StudentSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = StudentFilter
+    export_filename = 'alunos'
+    cursor_ordering = ('date_created', 'id')
+    # A representação do aluno vem do usuário.
+    version_lookups = ('user__date_updated',)
+    autocomplete_limit = 10
+    autocomplete_max_limit = 50
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'export', 'autocomplete'):
+            # A leitura não precisa do usuário completo.
+            queryset = queryset.select_related(None).read_model()
+        return queryset
 
     @swagger_auto_schema(
         operation_description="Exclui um aluno.",
@@ -43,3 +68,116 @@ class StudentViewSet(ModelViewSet):
                 data=str(exc)
             )
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Cadastra alunos em lote. Aceita uma lista JSON ou NDJSON "
+            "(application/x-ndjson), um aluno por linha. Com formato=ndjson, "
+            "a resposta é transmitida em NDJSON a cada lote processado: um "
+            "resultado por linha e, ao final, uma linha com os totais."
+        ),
+        request_body=StudentSerializer(many=True),
+        manual_parameters=[
+            openapi.Parameter(
+                name='formato',
+                in_=openapi.IN_QUERY,
+                description='Formato da resposta.',
+                type=openapi.TYPE_STRING,
+                enum=['json', 'ndjson'],
+                default='json'
+            ),
+        ],
+        responses={
+            status.HTTP_200_OK: "Resultados transmitidos em NDJSON.",
+            status.HTTP_201_CREATED: "Todos os alunos foram cadastrados.",
+            status.HTTP_207_MULTI_STATUS: "Alguns alunos não foram cadastrados.",
+            status.HTTP_400_BAD_REQUEST: "O corpo da requisição não é uma lista.",
+        },
+    )
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, (list, Iterator)):
+            return Response(
+                data={'non_field_errors': ['Esperada uma lista de alunos.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = self.get_serializer(many=True)
+        chunks = StudentService.bulk_create_students(serializer, request.data)
+        if request.query_params.get('formato') == 'ndjson':
+            return StreamingHttpResponse(
+                ndjson_stream(self.get_bulk_stream(chunks)),
+                content_type='application/x-ndjson'
+            )
+
+        results = [result for chunk in chunks for result in chunk]
+
+        failed = sum(1 for result in results if not result['created'])
+        data = {
+            'created': len(results) - failed,
+            'failed': failed,
+            'results': results,
+        }
+        return Response(
+            data=data,
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED
+        )
+
+    def get_bulk_stream(self, chunks):
+        """
+        Repassa os resultados de cada lote do cadastro assim que o lote é
+        gravado, seguidos de uma linha com os totais.
+        """
+        created = failed = 0
+        for results in chunks:
+            for result in results:
+                if result['created']:
+                    created += 1
+                else:
+                    failed += 1
+            yield results
+        yield [{'created': created, 'failed': failed}]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Sugere os alunos cujo apelido ou email corresponde ao termo "
+            "buscado, sem distinguir acentos e maiúsculas."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                name='busca',
+                in_=openapi.IN_QUERY,
+                description='Termo buscado.',
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                name='limite',
+                in_=openapi.IN_QUERY,
+                description=f'Quantidade máxima de sugestões (até {autocomplete_max_limit}).',
+                type=openapi.TYPE_INTEGER,
+                default=autocomplete_limit
+            ),
+        ],
+        responses={
+            status.HTTP_200_OK: StudentSerializer(many=True),
+            status.HTTP_400_BAD_REQUEST: "Limite inválido.",
+        },
+    )
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def autocomplete(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get('limite', self.autocomplete_limit))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.autocomplete_max_limit:
+            return Response(
+                data={'limite': [f'Informe um número entre 1 e {self.autocomplete_max_limit}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        students = search_students(
+            self.get_queryset(), request.query_params.get('busca', ''), limit
+        )
+        serializer = self.get_serializer(students, many=True)
+        return Response(serializer.data)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
+from celery.schedules import crontab
 from decouple import config
 
 
@@ -63,6 +64,49 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'apps.pagination.CustomPagination',
 }
 
+SWAGGER_SETTINGS = {
+    'DEFAULT_PAGINATOR_INSPECTORS': [
+        'apps.inspectors.CustomPaginationInspector',
+        'drf_yasg.inspectors.DjangoRestResponsePagination',
+        'drf_yasg.inspectors.CoreAPICompatInspector',
+    ],
+}
+
+# Contagem de resultados paginados (apps.counting.CountStrategy)
+PAGINATION_EXACT_COUNT_THRESHOLD = config(
+    'PAGINATION_EXACT_COUNT_THRESHOLD', default=10000, cast=int
+)
+PAGINATION_ESTIMATE_COUNT_THRESHOLD = config(
+    'PAGINATION_ESTIMATE_COUNT_THRESHOLD', default=100000, cast=int
+)
+PAGINATION_COUNT_CACHE_TIMEOUT = config(
+    'PAGINATION_COUNT_CACHE_TIMEOUT', default=300, cast=int
+)
+
+# Linhas lidas por lote nas exportações (apps.virtual_education.mixins.export)
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Cache (contagens, respostas). Exemplos de CACHE_BACKEND:
+# - django.core.cache.backends.locmem.LocMemCache (padrão, por processo)
+# - django.core.cache.backends.filebased.FileBasedCache, com CACHE_LOCATION
+#   apontando para um diretório
+# - django.core.cache.backends.redis.RedisCache, com CACHE_LOCATION
+#   redis://redis:6379/1 (requer o pacote redis)
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': config('CACHE_LOCATION', default='e-learning'),
+    }
+}
+
+# Validade das respostas em cache (apps.virtual_education.mixins.response_cache)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Validade das análises de notas em cache (apps.virtual_education.analytics)
+ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=3600, cast=int)
+
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -105,12 +149,85 @@ DATABASES = {
     }
 }
 
-CELERY_BROKER_URL = 'redis://redis:6379/0'
-CELERY_RESULT_BACKEND = 'django-db'
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://redis:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# Resultados das tarefas: ignorados por padrão, pois os avisos e entregas
+# não são consultados. Só as tarefas com `ignore_result=False` gravam
+# resultado, fora do banco da aplicação: no Redis (padrão), em arquivos
+# (file:///caminho/existente) ou em cache (cache+memcached://host:11211/).
+# Os resultados expiram em CELERY_RESULT_EXPIRES segundos; nos backends sem
+# expiração própria (arquivos), a tarefa celery.backend_cleanup os remove.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://redis:6379/1')
+CELERY_RESULT_EXPIRES = config('CELERY_RESULT_EXPIRES', default=24 * 60 * 60, cast=int)
+
+# Executa as tarefas no próprio processo, sem broker nem worker (testes e
+# desenvolvimento offline).
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_TASK_EAGER_PROPAGATES = CELERY_TASK_ALWAYS_EAGER
+
+# Filas: avisos e entrega de notificações separados das tarefas de
+# manutenção, para que reconstruções longas não atrasem os avisos. Um
+# worker por fila: celery -A e_learning worker -Q notifications
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'apps.virtual_education.tasks.notify_enrollments_near_to_expire': {'queue': 'notifications'},
+    'apps.virtual_education.tasks.notify_expiring_enrollments_chunk': {'queue': 'notifications'},
+    'apps.virtual_education.tasks.deliver_notifications': {'queue': 'notifications'},
+    'apps.virtual_education.tasks.reconcile_course_stats': {'queue': 'maintenance'},
+    'apps.virtual_education.tasks.rebuild_course_stats_chunk': {'queue': 'maintenance'},
+    'celery.backend_cleanup': {'queue': 'maintenance'},
+}
+# Lotes de avisos por worker, por minuto, para não sobrecarregar o envio.
+CELERY_TASK_ANNOTATIONS = {
+    'apps.virtual_education.tasks.notify_expiring_enrollments_chunk': {
+        'rate_limit': config('EXPIRY_NOTIFICATION_RATE_LIMIT', default='120/m'),
+    },
+}
+
+# Tarefas longas: cada worker reserva uma mensagem por vez e só a confirma
+# ao terminar, de modo que a queda do worker devolve a tarefa à fila. As
+# tarefas são idempotentes (ver notify_expiring_enrollments_chunk).
+CELERY_WORKER_PREFETCH_MULTIPLIER = config(
+    'CELERY_WORKER_PREFETCH_MULTIPLIER', default=1, cast=int
+)
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+
+# Agenda do celery beat: celery -A e_learning beat
+CELERY_BEAT_SCHEDULE = {
+    'notify-enrollments-near-to-expire': {
+        'task': 'apps.virtual_education.tasks.notify_enrollments_near_to_expire',
+        'schedule': crontab(hour=8, minute=0),
+    },
+    'deliver-notifications': {
+        'task': 'apps.virtual_education.tasks.deliver_notifications',
+        'schedule': 60.0,
+    },
+    'reconcile-course-stats': {
+        'task': 'apps.virtual_education.tasks.reconcile_course_stats',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    # Mesmo nome da entrada que o beat criaria, para não duplicá-la.
+    'celery.backend_cleanup': {
+        'task': 'celery.backend_cleanup',
+        'schedule': crontab(hour=4, minute=0),
+    },
+}
+
+# Entrega de notificações (apps.virtual_education.notifications)
+NOTIFICATION_BACKEND = config(
+    'NOTIFICATION_BACKEND',
+    default='apps.virtual_education.notifications.backends.ConsoleBackend'
+)
+NOTIFICATION_FILE_PATH = config(
+    'NOTIFICATION_FILE_PATH', default=str(BASE_DIR / 'notifications.log')
+)
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=500, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators